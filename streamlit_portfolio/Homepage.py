@@ -1,13 +1,43 @@
 # Homepage.py
 import base64
+import bisect
+import csv
+import gzip
+import hashlib
+import html
+import io
+import json
 import math
+import mimetypes
+import os
+import queue
 import re
 import random
+import shutil
+import threading
+import time
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
-
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib.parse import quote
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import streamlit as st
 import streamlit.components.v1 as components
+from PIL import Image, features
+
+from granger import granger_task
+from oee_sim import LOSS_BUCKETS, SIM_CHUNK, OeeScenario, chunk_plan, compute_oee_batch, histogram_percentiles, simulate_chunk
+from site_assets import GOOGLE_FONTS_CSS, SITE_CSS, build_stylesheet
 
 # Try to use BeautifulSoup if available (for parsing your existing HTML projects index)
 try:
@@ -15,19 +45,66 @@ try:
 except Exception:
     BeautifulSoup = None  # type: ignore
 
+# Optional: pypdfium2 rasterizes project PDFs into page images for quick browsing
+try:
+    import pypdfium2 as pdfium  # type: ignore
+except Exception:
+    pdfium = None  # type: ignore
+
+# Optional: brotli adds .br siblings to the precompressed static embeds (.gz is always written)
+try:
+    import brotli  # type: ignore
+except Exception:
+    brotli = None  # type: ignore
+
+# Optional: openpyxl reads project workbooks for the data preview (CSV works without it)
+try:
+    import openpyxl  # type: ignore
+except Exception:
+    openpyxl = None  # type: ignore
+
 
 # ---------------------------
 # Config
 # ---------------------------
-st.set_page_config(
-    page_title="Sujash Bharadwaj's Portfolio",
-    layout="wide",
-)
-
 ROOT = Path(__file__).parent
 ASSETS = ROOT / "assets"
 POSTS_DIR = ROOT / "posts"
 PROJECTS_DIR = ROOT / "projects_static"
+ICON_SPRITE = ASSETS / "img" / "icons.svg"
+STATIC_DIR = ROOT / "static"  # served at app/static/ when server.enableStaticServing is on
+PDF_PAGES_DIR = ROOT / ".cache" / "pdf_pages"  # <sha256 of pdf>/{thumb,page}-NNN.webp
+TABLE_CACHE_DIR = ROOT / ".cache" / "tables"  # <name>-<path hash>/{meta.json, N.arrow}
+# Machine event log for the live OEE view: set OEE_EVENT_LOG to tail a real one,
+# otherwise the demo feed writes here
+OEE_EVENT_LOG = os.environ.get("OEE_EVENT_LOG", "")
+OEE_DEMO_LOG = ROOT / ".cache" / "oee_events.jsonl"
+# Daily closes for the rolling-beta view: a directory holding equities and
+# commodities files (.parquet or .csv, a "date" column plus one column per
+# symbol). Set PRICE_STORE to use a real one, otherwise a synthetic store is written here
+PRICE_STORE = os.environ.get("PRICE_STORE", "")
+PRICE_DEMO_STORE = ROOT / ".cache" / "prices"
+GRANGER_CACHE_DIR = ROOT / ".cache" / "granger"  # <sha256 of one window's returns>.parquet
+IMAGE_CACHE_DIR = ROOT / ".cache" / "img"  # <sha256 of source image>/<width>.{avif,webp}
+
+EMBED_VERSIONS_KEPT = 16  # content-hashed embed pages kept per project in static/
+
+PDF_PREVIEW_PAGES = 12
+PDF_THUMB_WIDTH = 180
+PDF_PAGE_WIDTH = 1100
+
+# st.download_button accepts a callable (read on click, off the script thread) from 1.52
+DEFERRED_DOWNLOADS = tuple(int(x) for x in st.__version__.split(".")[:2]) >= (1, 52)
+# app/static sends every file with its real Content-Type from 1.56. Before that only JPEG, PNG,
+# GIF, WebP, fonts, PDF, XML and JSON do; HTML, CSS, SVG and AVIF go out as text/plain with nosniff
+TYPED_STATIC_FILES = tuple(int(x) for x in st.__version__.split(".")[:2]) >= (1, 56)
+mimetypes.add_type("image/avif", ".avif")  # not in every system's mime.types
+
+# Resized variants for profile and post images; widths above the source's are skipped
+IMAGE_WIDTHS = (320, 640, 960, 1280)
+# AVIF first: browsers take the first <source> they support, and don't fall through to the next
+# one when it arrives as text/plain. Pillow builds without libavif get WebP only
+IMAGE_FORMATS = tuple(fmt for fmt in ("avif", "webp") if features.check(fmt) and (fmt != "avif" or TYPED_STATIC_FILES))
 
 # Marker heading that exists in your OEE MD and should be replaced by the interactive demo
 OEE_MARKER = "## A simple OEE calculation snippet (Python)"
@@ -50,191 +127,35 @@ PROJECT_META: Dict[str, Dict[str, Any]] = {
     },
 }
 
-
-# ---------------------------
-# Theme + fonts (Crimson Text + Oswald) + UI polish
-# ---------------------------
-st.markdown(
-    """
-    <style>
-      @import url('https://fonts.googleapis.com/css2?family=Crimson+Text:wght@400;600;700&family=Oswald:wght@400;600;700&display=swap');
-
-      :root{
-        --bg:#071A14;
-        --surface:#0B1411;
-        --card:#0E1F18;
-        --text:#E5E7EB;
-        --muted:rgba(229,231,235,.78);
-        --border:rgba(229,231,235,.10);
-        --primary:#10B981;
-        --primary2:#34D399;
-        --accent:#A3E635;
-        --shadow:0 10px 30px rgba(0,0,0,.45);
-      }
-
-      html, body, [class*="css"]  {
-        font-family: 'Crimson Text', serif !important;
-        color: var(--text) !important;
-      }
-
-      h1, h2, h3, h4, h5, h6,
-      .stRadio label, .stButton button, .stDownloadButton button,
-      [data-testid="stSidebar"] * {
-        font-family: 'Oswald', sans-serif !important;
-        letter-spacing: 0.2px;
-      }
-
-      .block-container { padding-top: 1.8rem; max-width: 1120px; }
-      .stApp { background: var(--bg); }
-
-      a { color: var(--accent) !important; text-decoration: none; }
-      a:hover { text-decoration: underline; }
-
-      .card {
-        border: 1px solid var(--border);
-        background: linear-gradient(180deg, rgba(14,31,24,.98), rgba(11,20,17,.98));
-        padding: 18px 18px;
-        border-radius: 16px;
-        box-shadow: var(--shadow);
-        margin-bottom: 14px;
-      }
-      .card:hover { border-color: rgba(163,230,53,.22); }
-
-      .muted { color: var(--muted); }
-      .tiny { color: rgba(229,231,235,.70); font-size: 0.95rem; }
-
-      .pill {
-        display: inline-block;
-        padding: 4px 10px;
-        border-radius: 999px;
-        border: 1px solid rgba(229,231,235,.12);
-        background: rgba(229,231,235,.06);
-        margin-right: 6px;
-        margin-top: 6px;
-        font-size: 0.95rem;
-      }
-
-      .stButton button, .stDownloadButton button {
-        border-radius: 12px !important;
-        border: 1px solid rgba(229,231,235,.14) !important;
-        background: rgba(229,231,235,.06) !important;
-        color: rgba(229,231,235,.92) !important;
-      }
-      .stButton button:hover, .stDownloadButton button:hover {
-        border-color: rgba(163,230,53,.28) !important;
-        color: var(--accent) !important;
-        transform: translateY(-1px);
-      }
-
-      [data-testid="stSidebar"] {
-        background: rgba(11,20,17,.92);
-        border-right: 1px solid rgba(229,231,235,.10);
-      }
-      [data-testid="stSidebar"] .block-container { padding-top: 1.6rem; }
-
-      p, li { font-size: 1.08rem; line-height: 1.7; }
-      code { background: rgba(229,231,235,.06) !important; }
-
-      .oee-box{
-        border:1px solid rgba(229,231,235,.10);
-        background: rgba(229,231,235,.04);
-        border-radius: 14px;
-        padding: 14px 14px;
-        margin-top: 10px;
-      }
-
-      .project-card{
-        border: 1px solid var(--border);
-        background: linear-gradient(180deg, rgba(14,31,24,.98), rgba(11,20,17,.98));
-        border-radius: 16px;
-        padding: 14px 16px;
-        min-height: 160px;
-        margin-bottom: 8px;
-      }
-
-      .project-eyebrow{
-        color: rgba(163,230,53,.92);
-        font-size: .88rem;
-        text-transform: uppercase;
-        letter-spacing: .08em;
-        margin-bottom: 4px;
-      }
-
-      .project-title{
-        font-size: 1.25rem;
-        font-weight: 800;
-        margin-bottom: 6px;
-      }
-
-      .project-chips{
-        margin-top: 10px;
-      }
-
-      .project-chip{
-        display: inline-block;
-        padding: 2px 8px;
-        margin-right: 6px;
-        margin-bottom: 6px;
-        border-radius: 999px;
-        border: 1px solid rgba(229,231,235,.16);
-        background: rgba(229,231,235,.05);
-        font-size: .82rem;
-      }
-
-      @media (max-width: 900px){
-        .block-container{
-          padding-top: 1.15rem !important;
-          padding-left: 0.9rem !important;
-          padding-right: 0.9rem !important;
-        }
-
-        h1{ font-size: 1.9rem !important; line-height: 1.15 !important; }
-        h2{ font-size: 1.5rem !important; line-height: 1.2 !important; }
-        h3{ font-size: 1.2rem !important; line-height: 1.25 !important; }
-
-        p, li{
-          font-size: 1rem !important;
-          line-height: 1.55 !important;
-        }
-
-        .card{
-          padding: 14px 14px;
-          border-radius: 14px;
-          margin-bottom: 10px;
-        }
-
-        .project-card{
-          min-height: 0;
-          padding: 12px 12px;
-          border-radius: 14px;
-        }
-
-        .project-title{
-          font-size: 1.12rem;
-          line-height: 1.25;
-        }
-
-        .project-chip{
-          font-size: .76rem;
-          padding: 2px 7px;
-          margin-right: 5px;
-          margin-bottom: 5px;
-        }
-
-        .stButton button, .stDownloadButton button{
-          min-height: 2.55rem !important;
-          padding: 0.45rem 0.7rem !important;
-          font-size: 0.95rem !important;
-        }
-
-        [data-testid="stMetricValue"]{
-          font-size: 1.3rem !important;
-        }
-      }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+# Declarative data-QA rules per project, run over every sheet of its CSV/XLSX
+# files. "sheets" is a list of sheet names or "*" (every sheet that has the
+# rule's columns), minus "exclude". See qa_check() for the checks.
+QA_RULES: Dict[str, List[Dict[str, Any]]] = {
+    "EnergyEquitiesMI": [
+        {"id": "prices-present", "check": "not_null", "sheets": "*", "columns": ["Date", "Open", "High", "Low", "Close", "Volume"]},
+        {"id": "company-present", "check": "not_null", "sheets": ["Master Sheet"], "columns": ["Company"]},
+        {"id": "date-is-date", "check": "type", "sheets": "*", "columns": ["Date"], "type": "timestamp"},
+        {"id": "volume-is-integer", "check": "type", "sheets": "*", "columns": ["Volume"], "type": "integer"},
+        {"id": "prices-positive", "check": "range", "sheets": "*", "columns": ["Open", "High", "Low", "Close"], "min": 0.01},
+        {"id": "volume-non-negative", "check": "range", "sheets": "*", "columns": ["Volume"], "min": 0},
+        {"id": "open-within-range", "check": "order", "sheets": "*", "columns": ["Low", "Open", "High"]},
+        {"id": "close-within-range", "check": "order", "sheets": "*", "columns": ["Low", "Close", "High"]},
+        {"id": "one-row-per-company-day", "check": "unique", "sheets": ["Master Sheet"], "columns": ["Company", "Date"], "normalize": {"Date": "day"}},
+        {"id": "one-row-per-day", "check": "unique", "sheets": "*", "exclude": ["Master Sheet"], "columns": ["Date"], "normalize": {"Date": "day"}},
+        {
+            "id": "master-rows-in-company-sheets",
+            "check": "foreign_key",
+            "sheets": ["Master Sheet"],
+            "columns": ["Company", "Date"],
+            "ref_sheets": "*",
+            "ref_exclude": ["Master Sheet"],
+            "ref_columns": ["__sheet__", "Date"],
+            "normalize": {"Company": "ticker", "__sheet__": "ticker", "Date": "day"},
+        },
+        {"id": "close-daily-jump", "check": "jump", "sheets": ["Master Sheet"], "column": "Close", "group_by": "Company", "order_by": "Date", "max_pct": 10},
+        {"id": "exception-flag-matches-move", "check": "flagged_when", "sheets": ["Master Sheet"], "flag": "ExceptionFlag", "source": "Abs % Change", "op": ">=", "value": 0.05},
+    ],
+}
 
 
 # ---------------------------
@@ -244,45 +165,89 @@ def read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8", errors="ignore")
 
 
-def load_posts() -> List[Dict]:
-    posts: List[Dict] = []
-    if POSTS_DIR.exists():
-        for p in sorted(POSTS_DIR.glob("*.md"), reverse=True):
-            text = read_text(p)
-            title = None
-            date_ = None
-            tags: List[str] = []
-            content = text
-
-            # Simple frontmatter (optional)
-            if text.startswith("---"):
-                parts = text.split("---", 2)
-                if len(parts) >= 3:
-                    fm = parts[1].strip()
-                    content = parts[2].lstrip()
-                    for line in fm.splitlines():
-                        if ":" not in line:
-                            continue
-                        k, v = line.split(":", 1)
-                        k = k.strip().lower()
-                        v = v.strip()
-                        if k == "title":
-                            title = v
-                        elif k == "date":
-                            date_ = v
-                        elif k == "tags":
-                            tags = [t.strip() for t in v.split(",") if t.strip()]
-
-            title = title or p.stem.replace("-", " ").title()
-            excerpt = re.sub(r"\s+", " ", content.strip())
-            excerpt = excerpt[:190] + ("..." if len(excerpt) > 190 else "")
-            posts.append(
-                {"title": title, "date": date_ or "", "tags": tags, "path": p, "content": content, "excerpt": excerpt}
-            )
-    return posts
+def file_signature(path: Path) -> Tuple[int, int]:
+    st_ = path.stat()
+    return st_.st_mtime_ns, st_.st_size
 
 
-def load_projects() -> List[Dict]:
+@st.cache_resource(show_spinner=False)
+def content_index() -> Dict[str, Any]:
+    """
+    Process-wide store of parsed posts/projects, shared by every session.
+    Entries are keyed on file path and validated against (mtime, size), so a
+    rerun only re-parses files that were added or changed since the last scan.
+    """
+    return {"lock": threading.Lock(), "posts": {}, "posts_key": None, "posts_list": [], "projects_key": None, "projects_list": []}
+
+
+def parse_post(p: Path) -> Dict:
+    text = read_text(p)
+    title = None
+    date_ = None
+    tags: List[str] = []
+    content = text
+
+    # Simple frontmatter (optional)
+    if text.startswith("---"):
+        parts = text.split("---", 2)
+        if len(parts) >= 3:
+            fm = parts[1].strip()
+            content = parts[2].lstrip()
+            for line in fm.splitlines():
+                if ":" not in line:
+                    continue
+                k, v = line.split(":", 1)
+                k = k.strip().lower()
+                v = v.strip()
+                if k == "title":
+                    title = v
+                elif k == "date":
+                    date_ = v
+                elif k == "tags":
+                    tags = [t.strip() for t in v.split(",") if t.strip()]
+
+    title = title or p.stem.replace("-", " ").title()
+    excerpt = re.sub(r"\s+", " ", content.strip())
+    excerpt = excerpt[:190] + ("..." if len(excerpt) > 190 else "")
+    return {"title": title, "date": date_ or "", "tags": tags, "path": p, "content": content, "excerpt": excerpt}
+
+
+def load_posts() -> List[Dict]:
+    """
+    Returns posts newest-first. Only stats the files on each call; the
+    Markdown is re-read and re-parsed just for new or modified posts.
+    The returned dicts are shared across sessions, so treat them as read-only.
+    """
+    idx = content_index()
+    if not POSTS_DIR.exists():
+        return []
+
+    sigs: Dict[Path, Tuple[int, int]] = {}
+    for entry in os.scandir(POSTS_DIR):
+        if entry.name.endswith(".md") and entry.is_file():
+            st_ = entry.stat()
+            sigs[POSTS_DIR / entry.name] = (st_.st_mtime_ns, st_.st_size)
+    key = tuple(sorted(sigs.items()))
+
+    with idx["lock"]:
+        if key == idx["posts_key"]:
+            return idx["posts_list"]
+
+        cache: Dict[Path, Tuple[Tuple[int, int], Dict]] = idx["posts"]
+        for p in list(cache):
+            if p not in sigs:
+                del cache[p]
+        for p, sig in sigs.items():
+            hit = cache.get(p)
+            if hit is None or hit[0] != sig:
+                cache[p] = (sig, parse_post(p))
+
+        idx["posts_list"] = [cache[p][1] for p in sorted(sigs, reverse=True)]
+        idx["posts_key"] = key
+        return idx["posts_list"]
+
+
+def parse_projects() -> List[Dict]:
     """
     Reads your existing HTML projects index if present:
     projects_static/index.html with <a class="tile"> ... </a>
@@ -312,6 +277,215 @@ def load_projects() -> List[Dict]:
     return projects
 
 
+def load_projects() -> List[Dict]:
+    # The index page and the folder listing are the only inputs, so their
+    # signatures decide whether the cached parse is still valid.
+    idx = content_index()
+    index_html = PROJECTS_DIR / "index.html"
+    key = (
+        file_signature(index_html) if index_html.exists() else None,
+        file_signature(PROJECTS_DIR) if PROJECTS_DIR.exists() else None,
+    )
+    with idx["lock"]:
+        if key != idx["projects_key"]:
+            idx["projects_list"] = parse_projects()
+            idx["projects_key"] = key
+        return idx["projects_list"]
+
+
+# ---------------------------
+# Blog search (positional inverted index + BM25)
+# ---------------------------
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+BM25_K1 = 1.5
+BM25_B = 0.75
+TITLE_BOOST = 2  # title tokens are indexed this many times
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def build_search_index(posts: List[Dict]) -> Dict[str, Any]:
+    """
+    Per term: sorted doc ids, precomputed BM25 weights, and sorted global
+    positions (doc id << 32 | position) for phrase queries. Title, tags and
+    body share one position space with gaps between them, so a phrase can't
+    match across fields.
+    """
+    postings: Dict[str, Dict[int, List[int]]] = {}
+    doc_len: List[int] = []
+    for doc_id, post in enumerate(posts):
+        fields = [post["title"]] * TITLE_BOOST + [" ".join(post.get("tags", [])), post["content"]]
+        pos = 0
+        length = 0
+        for field in fields:
+            for tok in tokenize(field):
+                postings.setdefault(tok, {}).setdefault(doc_id, []).append(pos)
+                pos += 1
+                length += 1
+            pos += 16
+        doc_len.append(length)
+
+    # BM25 term weights are query-independent, so they are computed once here
+    # and a query only has to add up a few arrays.
+    n_docs = len(posts)
+    lens = np.asarray(doc_len, dtype=np.float64)
+    avg_len = float(lens.mean()) if n_docs else 0.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * (lens / avg_len if avg_len else lens))
+    idf: Dict[str, float] = {}
+    doc_ids: Dict[str, np.ndarray] = {}
+    weights: Dict[str, np.ndarray] = {}
+    positions: Dict[str, np.ndarray] = {}
+    for t, d in postings.items():
+        ids = np.fromiter(d.keys(), dtype=np.int32, count=len(d))
+        tf = np.fromiter((len(v) for v in d.values()), dtype=np.float64, count=len(d))
+        idf[t] = math.log(1 + (n_docs - len(d) + 0.5) / (len(d) + 0.5))
+        doc_ids[t] = ids
+        weights[t] = (idf[t] * tf * (BM25_K1 + 1) / (tf + norm[ids])).astype(np.float32)
+        positions[t] = np.fromiter(
+            ((doc << 32) | pos for doc, plist in d.items() for pos in plist), dtype=np.int64, count=int(tf.sum())
+        )
+    return {"idf": idf, "doc_ids": doc_ids, "weights": weights, "positions": positions, "vocab": sorted(postings), "n_docs": n_docs}
+
+
+def search_index_for(posts: List[Dict]) -> Dict[str, Any]:
+    # load_posts() hands back the same list object until the corpus changes,
+    # so identity is enough to know the index is current.
+    idx = content_index()
+    with idx["lock"]:
+        if idx.get("search_src") is not posts:
+            idx["search"] = build_search_index(posts)
+            idx["search_src"] = posts
+        return idx["search"]
+
+
+def parse_query(query: str) -> Tuple[List[List[str]], List[str]]:
+    if query.count('"') % 2:
+        # An unclosed quote is still being typed; search its words as bare
+        # terms so the last one keeps matching as a prefix.
+        i = query.rindex('"')
+        query = query[:i] + " " + query[i + 1:]
+    phrases = [tokenize(m) for m in re.findall(r'"([^"]+)"', query)]
+    phrases = [ph for ph in phrases if ph]
+    terms = tokenize(re.sub(r'"[^"]*"?', " ", query))
+    return phrases, terms
+
+
+def expand_prefix(index: Dict[str, Any], prefix: str, limit: int = 50) -> List[str]:
+    vocab: List[str] = index["vocab"]
+    i = bisect.bisect_left(vocab, prefix)
+    out: List[str] = []
+    while i < len(vocab) and vocab[i].startswith(prefix) and len(out) < limit:
+        out.append(vocab[i])
+        i += 1
+    return out
+
+
+def search_posts(index: Dict[str, Any], query: str, limit: int = 50) -> Tuple[List[Tuple[int, float]], int]:
+    """
+    Returns up to `limit` (doc id, score) pairs, best first, and the number
+    of matching docs before that cap. Every bare term and every
+    "quoted phrase" must match. The last bare term also matches as a prefix
+    while it is still being typed and is not a complete word in the index.
+    """
+    doc_ids = index["doc_ids"]
+    n_docs = index["n_docs"]
+    phrases, terms = parse_query(query)
+
+    # Each group is a set of alternative terms; a doc must hit every group.
+    groups: List[List[str]] = []
+    for i, t in enumerate(terms):
+        if t in doc_ids:
+            groups.append([t])
+        elif i == len(terms) - 1 and not query.rstrip().endswith('"'):
+            groups.append(expand_prefix(index, t))
+        else:
+            groups.append([])
+    for ph in phrases:
+        groups.extend([[t] if t in doc_ids else [] for t in ph])
+    if not groups or any(not g for g in groups):
+        return [], 0
+
+    scores = np.zeros(n_docs, dtype=np.float32)
+    matched = np.zeros(n_docs, dtype=np.int16)
+    for g in groups:
+        if len(g) == 1:
+            ids = doc_ids[g[0]]
+            scores[ids] += index["weights"][g[0]]
+            matched[ids] += 1
+            continue
+        in_group = np.zeros(n_docs, dtype=bool)
+        for t in g:
+            ids = doc_ids[t]
+            scores[ids] += index["weights"][t]
+            in_group[ids] = True
+        matched += in_group
+
+    multi = [ph for ph in phrases if len(ph) > 1]
+    for ph in multi:
+        matched[phrase_docs(index, ph)] += 1
+    candidates = np.flatnonzero(matched == len(groups) + len(multi))
+    if candidates.size == 0:
+        return [], 0
+    scores[candidates] += sum(index["idf"][t] for ph in multi for t in ph)
+
+    total = int(candidates.size)
+    if total > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(d), float(scores[d])) for d in order], total
+
+
+def phrase_docs(index: Dict[str, Any], phrase: List[str]) -> np.ndarray:
+    # Shift each term's positions back by its offset in the phrase; a doc
+    # holds the phrase wherever all shifted position sets intersect.
+    hits = index["positions"][phrase[0]]
+    for i, t in enumerate(phrase[1:], start=1):
+        hits = np.intersect1d(hits, index["positions"][t] - i, assume_unique=True)
+        if hits.size == 0:
+            break
+    return np.unique(hits >> 32)
+
+
+def highlight_snippet(text: str, query: str, width: int = 190) -> str:
+    """
+    HTML snippet of ~width chars around the densest cluster of query hits,
+    with hits wrapped in <mark>.
+    """
+    phrases, terms = parse_query(query)
+    flat = re.sub(r"\s+", " ", text.strip())
+    pats = [r"\W+".join(map(re.escape, ph)) for ph in phrases] + [re.escape(t) + (r"\w*" if i == len(terms) - 1 else "") for i, t in enumerate(terms)]
+    if not pats:
+        return html.escape(flat[:width]) + ("..." if len(flat) > width else "")
+    pat = re.compile(r"(?<![A-Za-z0-9])(?:" + "|".join(pats) + r")(?![A-Za-z0-9])", re.IGNORECASE)
+
+    hits = [m.start() for m in pat.finditer(flat)]
+    start = 0
+    if hits:
+        best = 0
+        j = 0
+        for i, h in enumerate(hits):
+            while hits[j] < h - width // 2:
+                j += 1
+            if i - j + 1 > best:
+                best = i - j + 1
+                start = hits[j]
+        start = max(0, start - width // 4)
+        space = flat.rfind(" ", 0, start)
+        start = space + 1 if start and space >= 0 else 0
+    window = flat[start : start + width]
+
+    out: List[str] = []
+    last = 0
+    for m in pat.finditer(window):
+        out.append(html.escape(window[last : m.start()]))
+        out.append(f"<mark>{html.escape(m.group(0))}</mark>")
+        last = m.end()
+    out.append(html.escape(window[last:]))
+    return ("..." if start else "") + "".join(out) + ("..." if start + width < len(flat) else "")
+
+
 def list_project_files(slug: str) -> Tuple[List[Path], List[Path]]:
     pdir = PROJECTS_DIR / slug
     if not pdir.exists():
@@ -325,17 +499,422 @@ def list_project_files(slug: str) -> Tuple[List[Path], List[Path]]:
 
 
 
+def mime_for(p: Path) -> str:
+    ext = p.suffix.lower()
+    if ext == ".pdf":
+        return "application/pdf"
+    if ext == ".xlsx":
+        return "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    if ext == ".csv":
+        return "text/csv"
+    if ext == ".html":
+        return "text/html"
+    if ext in [".png", ".jpg", ".jpeg"]:
+        return f"image/{ext.lstrip('.')}"
+    return "application/octet-stream"
+
+
+def static_serving_enabled() -> bool:
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def typed_static_enabled() -> bool:
+    # Static serving the browser will also take pages, stylesheets and SVG from
+    return TYPED_STATIC_FILES and static_serving_enabled()
+
+
+def static_path_url(rel: str) -> str:
+    # Root-relative app/static path for every link, src and iframe the app builds: it resolves the
+    # same from any page URL, honours server.baseUrlPath, and st.iframe only treats "/..." as a URL
+    base = (st.get_option("server.baseUrlPath") or "").strip("/")
+    url = "app/static/" + quote(rel)
+    return f"/{base}/{url}" if base else f"/{url}"
+
+
+def publish_static(src: Path, rel: str) -> str:
+    """
+    Mirrors src into static/<rel> (a hard link when the filesystem allows it,
+    a copy otherwise) and returns its static_path_url(). Streamlit serves that
+    folder straight from disk, so the bytes never pass through the script.
+    """
+    dst = STATIC_DIR / rel
+    s_ = src.stat()
+    try:
+        d_ = dst.stat()
+        fresh = (d_.st_ino, d_.st_dev) == (s_.st_ino, s_.st_dev) or (
+            d_.st_size == s_.st_size and d_.st_mtime_ns >= s_.st_mtime_ns
+        )
+    except FileNotFoundError:
+        fresh = False
+
+    if not fresh:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    return static_path_url(rel)
+
+
+def static_rel(p: Path) -> str:
+    # Mirror path for a file under projects_static/ (shared by downloads and previews)
+    return "projects/" + p.relative_to(PROJECTS_DIR).as_posix()
+
+
+# Hidden column in cached sheets: the row number in the source file. The name is
+# reserved: a source column called that is renamed like any other duplicate.
+SOURCE_ROW = "__row__"
+TABLE_CACHE_VERSION = 3
+
+
+def unique_column_name(name: str, taken: Any) -> str:
+    # "name (2)", "name (3)", ... past the names already taken and SOURCE_ROW
+    base, n = name, 2
+    while name in taken or name == SOURCE_ROW:
+        name, n = f"{base} ({n})", n + 1
+    return name
+
+
+def column_array(values: List[Any]) -> pa.Array:
+    # Arrow infers the type; columns that mix types (text in a number column) fall back to text
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, OverflowError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def rows_to_table(rows: Iterator[Tuple[Any, ...]]) -> pa.Table:
+    """
+    Sheet rows to a table: the first non-empty row is the header; empty
+    rows and columns with neither a header nor any value are dropped
+    (workbooks often carry formatted-but-empty ranges). SOURCE_ROW keeps
+    each row's 1-based sheet row number for error reports.
+    """
+    header: List[Any] = []
+    body: List[Tuple[Any, ...]] = []
+    row_nos: List[int] = []
+    for n, row in enumerate(rows, start=1):
+        if not any(v is not None and str(v).strip() != "" for v in row):
+            continue
+        if not header:
+            header = list(row)
+        else:
+            body.append(row)
+            row_nos.append(n)
+    width = max([len(header)] + [len(r) for r in body]) if header else 0
+    cols: Dict[str, pa.Array] = {}
+    for i in range(width):
+        name = str(header[i]).strip() if i < len(header) and header[i] is not None else ""
+        values = [r[i] if i < len(r) else None for r in body]
+        if not name and all(v is None for v in values):
+            continue
+        cols[unique_column_name(name or f"column {i + 1}", cols)] = column_array(values)
+    cols[SOURCE_ROW] = pa.array(row_nos, type=pa.int32())
+    return pa.table(cols)
+
+
+def write_arrow_atomic(table: pa.Table, out: Path) -> str:
+    """Writes an Arrow IPC file via a temp name; returns the sha256 of its bytes."""
+    tmp = out.with_name(f".{out.name}.{uuid.uuid4().hex}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=64 * 1024)
+    digest = file_sha256(tmp)
+    os.replace(tmp, out)
+    return digest
+
+
+@st.cache_resource(show_spinner=False)
+def table_cache_lock() -> threading.Lock:
+    # For writers under .cache/ that can race across sessions (the demo price store);
+    # the Arrow table caches themselves are only built on table_cache_worker()'s thread
+    return threading.Lock()
+
+
+def table_cache_dir(src: Path) -> Path:
+    rel = src.relative_to(ROOT).as_posix()
+    return TABLE_CACHE_DIR / f"{re.sub(r'[^A-Za-z0-9]+', '-', src.stem)[:40]}-{hashlib.sha1(rel.encode()).hexdigest()[:12]}"
+
+
+def current_table_cache(src: Path) -> Dict[str, Any]:
+    # meta.json if the cache is complete and built from this version of src, else {}
+    try:
+        meta = json.loads((table_cache_dir(src) / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return meta if meta.get("signature") == list(file_signature(src)) and meta.get("version") == TABLE_CACHE_VERSION else {}
+
+
+def build_table_cache(src: Path) -> Dict[str, Any]:
+    """
+    Columnar cache for a CSV/XLSX file: one uncompressed Arrow IPC file per
+    sheet, written once and rebuilt only when the source's mtime/size
+    change. meta.json is written last, so a half-built cache never looks
+    complete. Runs on table_cache_worker()'s thread; read errors propagate.
+    """
+    out = table_cache_dir(src)
+    sig = list(file_signature(src))
+    t0 = time.perf_counter()
+    if src.suffix.lower() == ".csv":
+        table = pacsv.read_csv(src)
+        names: List[str] = []
+        for c in table.column_names:
+            names.append(unique_column_name(c, names))
+        table = table.rename_columns(names)
+        sheets = [(src.stem, table.append_column(SOURCE_ROW, pa.array(np.arange(2, table.num_rows + 2, dtype=np.int32))))]
+    else:
+        wb = openpyxl.load_workbook(src, read_only=True, data_only=True)
+        try:
+            sheets = [(ws.title, rows_to_table(ws.iter_rows(values_only=True))) for ws in wb.worksheets]
+        finally:
+            wb.close()
+    out.mkdir(parents=True, exist_ok=True)
+    entries = []
+    for i, (name, table) in enumerate(sheets):
+        digest = write_arrow_atomic(table, out / f"{i}.arrow")
+        columns = [c for c in table.column_names if c != SOURCE_ROW]
+        entries.append({"name": name, "file": f"{i}.arrow", "rows": table.num_rows, "columns": columns, "sha256": digest})
+    meta = {
+        "version": TABLE_CACHE_VERSION,
+        "source": src.relative_to(ROOT).as_posix(),
+        "signature": sig,
+        "sheets": entries,
+        "convert_ms": round((time.perf_counter() - t0) * 1000),
+    }
+    meta_path = out / "meta.json"
+    tmp = meta_path.with_name(f".meta.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, meta_path)
+    return meta
+
+
+@st.cache_resource(show_spinner=False)
+def table_cache_worker() -> Dict[str, Any]:
+    """
+    One background thread per process that builds the Arrow caches, so a
+    large workbook (several seconds through openpyxl) never blocks a
+    script run. Every project CSV/XLSX is queued at startup, like the PDF
+    pages. A file that can't be read is recorded in "failed"
+    ((path, signature) -> error), so a fixed file gets another try.
+    """
+    state: Dict[str, Any] = {"queue": queue.Queue(), "queued": set(), "queued_lock": threading.Lock(), "failed": {}}
+
+    def run():
+        while True:
+            src = state["queue"].get()
+            key = (str(src), None)
+            try:
+                key = (str(src), file_signature(src))
+                if not current_table_cache(src):
+                    build_table_cache(src)
+            except Exception as e:
+                state["failed"][key] = f"{type(e).__name__}: {e}"
+            finally:
+                with state["queued_lock"]:
+                    state["queued"].discard(src)
+
+    threading.Thread(target=run, name="table-cache-worker", daemon=True).start()
+    for src in sorted(PROJECTS_DIR.rglob("*.csv")) + (sorted(PROJECTS_DIR.rglob("*.xlsx")) if openpyxl is not None else []):
+        queue_table_cache(state, src)
+    return state
+
+
+def queue_table_cache(worker: Dict[str, Any], src: Path):
+    with worker["queued_lock"]:
+        if src in worker["queued"]:
+            return
+        worker["queued"].add(src)
+    worker["queue"].put(src)
+
+
+def table_cache(src: Path) -> Tuple[Path, Dict[str, Any], str]:
+    """
+    (cache dir, meta, error) for src without blocking: meta is {} while the
+    cache is queued or being built, and error is set if the build failed.
+    """
+    meta = current_table_cache(src)
+    if meta:
+        return table_cache_dir(src), meta, ""
+    worker = table_cache_worker()
+    error = worker["failed"].get((str(src), file_signature(src)), "")
+    if not error:
+        queue_table_cache(worker, src)
+    return table_cache_dir(src), {}, error
+
+
+def wait_for_table_cache(src: Path, key: str):
+    """Placeholder while src's cache is built; reruns the page once it is ready (or has failed)."""
+
+    def poll():
+        _, meta, error = table_cache(src)
+        if (meta or error) and hasattr(st, "fragment"):
+            st.rerun(scope="app")
+        st.info(f"Building the columnar cache for {src.name} in the background (first view only)...")
+
+    if hasattr(st, "fragment"):
+        st.fragment(run_every=1)(poll)()
+    else:
+        poll()
+        st.button("Refresh", key=f"{key}_wait_{src.name}")
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def open_sheet(path: str, sig: Tuple[int, int]) -> pa.Table:
+    # Memory-mapped and zero-copy: pages are read from disk only when a slice touches them
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+FILTER_OP_RE = re.compile(r"^\s*(>=|<=|>|<|=)\s*(.+?)\s*$")
+FILTER_OPS = {">=": pc.greater_equal, "<=": pc.less_equal, ">": pc.greater, "<": pc.less, "=": pc.equal}
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def sheet_filter(path: str, sig: Tuple[int, int], column: str, query: str) -> np.ndarray:
+    """
+    Row indices matching `query` on `column`: a comparison such as ">= 100"
+    for numeric columns, otherwise a case-insensitive substring match.
+    Cached, so paging through a filtered view only slices.
+    """
+    col = open_sheet(path, sig).column(column)
+    m = FILTER_OP_RE.match(query)
+    mask = None
+    if m and (pa.types.is_integer(col.type) or pa.types.is_floating(col.type)):
+        try:
+            mask = FILTER_OPS[m.group(1)](col, float(m.group(2)))
+        except ValueError:
+            mask = None
+    if mask is None:
+        mask = pc.match_substring(pc.cast(col, pa.string()), query, ignore_case=True)
+    return pc.indices_nonzero(pc.fill_null(mask, False)).to_numpy()
+
+
+def download_file(p: Path, label: str, file_name: str = ""):
+    """
+    Download entry that costs nothing on rerun: a plain link to the static
+    mirror (streamed from disk by the server), or a deferred download button
+    that only reads the file once it is clicked.
+    """
+    file_name = file_name or p.name
+    if static_serving_enabled():
+        url = publish_static(p, static_rel(p))
+        st.markdown(
+            f'<a class="dl-link" href="{url}" download="{html.escape(file_name)}">{html.escape(label)}</a>',
+            unsafe_allow_html=True,
+        )
+    elif DEFERRED_DOWNLOADS:
+        st.download_button(
+            label=label,
+            data=p.read_bytes,
+            file_name=file_name,
+            mime=mime_for(p),
+            on_click="ignore",
+            key=f"dl_{static_rel(p)}",
+            use_container_width=True,
+        )
+    else:
+        st.download_button(
+            label=label,
+            data=p.read_bytes(),
+            file_name=file_name,
+            mime=mime_for(p),
+            key=f"dl_{static_rel(p)}",
+            use_container_width=True,
+        )
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def cached_embed_html(path: str, sig: Tuple[int, int]) -> str:
+    return read_text(Path(path))
+
+
 def read_project_embed_html(slug: str) -> str:
+    # Re-read only when the file's mtime/size change
     project_html = PROJECTS_DIR / slug / "index.html"
     if project_html.exists():
-        return read_text(project_html)
+        return cached_embed_html(str(project_html), file_signature(project_html))
     return ""
 
 
+def publish_hashed(data: bytes, rel_dir: str, stem: str, suffix: str, precompress: bool = True, keep: int = 16) -> str:
+    """
+    Writes data once to static/<rel_dir>/<stem>.<sha256[:16]><suffix> and
+    returns its static_path_url(). A name is never rewritten once it exists,
+    so its URL only changes with the content. Streamlit's static route
+    sends no Cache-Control, doesn't answer conditional requests and doesn't
+    pick precompressed files, so the .gz (and .br, with brotli installed)
+    siblings are for a fronting proxy that serves these names as immutable,
+    see README. Only the `keep` most recently published versions of a stem
+    are kept; publishing an existing name again refreshes its mtime (at
+    most hourly, to keep Last-Modified steady) so pages still in use stay.
+    """
+    name = f"{stem}.{hashlib.sha256(data).hexdigest()[:16]}{suffix}"
+    folder = STATIC_DIR / rel_dir
+    dst = folder / name
+    try:
+        if time.time() - dst.stat().st_mtime > 3600:
+            os.utime(dst)
+    except FileNotFoundError:
+        folder.mkdir(parents=True, exist_ok=True)
+        variants = [("", data)]
+        if precompress:
+            variants.append((".gz", gzip.compress(data, 9, mtime=0)))
+            if brotli is not None:
+                variants.append((".br", brotli.compress(data, quality=11)))
+        for ext, blob in sorted(variants, reverse=True):  # the plain file last: it marks the set complete
+            tmp = folder / f".{name}{ext}.{uuid.uuid4().hex}.tmp"
+            tmp.write_bytes(blob)
+            os.replace(tmp, folder / f"{name}{ext}")
+        old = sorted(folder.glob(f"{stem}.*{suffix}"), key=lambda q: q.stat().st_mtime_ns, reverse=True)[keep:]
+        for q in old:
+            for ext in ("", ".gz", ".br"):
+                Path(f"{q}{ext}").unlink(missing_ok=True)
+    return static_path_url(f"{rel_dir}/{name}")
+
+
+def publish_embed(slug: str, page: str) -> str:
+    # Next to the project's static mirror, so the page's relative links resolve there;
+    # generated maze levels each get their own version
+    return publish_hashed(page.encode("utf-8"), f"projects/{slug}", "index", ".html", keep=EMBED_VERSIONS_KEPT)
+
+
+def show_project_embed(slug: str, page: str, height: int, scrolling: bool):
+    if typed_static_enabled():
+        # Only the URL goes over the websocket; the browser fetches (or revalidates) the page itself
+        url = publish_embed(slug, page)
+        if hasattr(st, "iframe"):
+            st.iframe(url, height=height)
+        else:
+            components.iframe(url, height=height, scrolling=scrolling)
+    else:
+        components.html(page, height=height, scrolling=scrolling)
+
+
 def embed_pdf(pdf_path: Path, height: int = 860, mode: str = "Native Streamlit PDF"):
+    if mode == "Static URL" and static_serving_enabled():
+        # The browser's PDF viewer fetches the file itself from app/static,
+        # using Range requests to pull pages on demand. Nothing is inlined.
+        url = publish_static(pdf_path, static_rel(pdf_path))
+        st.markdown(
+            f"""
+            <iframe
+              src="{url}"
+              width="100%"
+              height="{height}"
+              style="border:1px solid rgba(229,231,235,.10); border-radius: 14px; background: rgba(11,20,17,.60);"
+              type="application/pdf"
+            ></iframe>
+            """,
+            unsafe_allow_html=True,
+        )
+        return
+
     data = pdf_path.read_bytes()
     b64 = base64.b64encode(data).decode("utf-8")
-    if mode == "Native Streamlit PDF":
+    if mode in ("Native Streamlit PDF", "Static URL"):
         try:
             # Newer Streamlit builds support width="stretch"
             st.pdf(data, width="stretch")
@@ -402,175 +981,1418 @@ def embed_pdf(pdf_path: Path, height: int = 860, mode: str = "Native Streamlit P
     components.html(html, height=height + 34, scrolling=False)
 
 
-def card(title: str, body: str, meta: str = "", extra_html: str = ""):
-    st.markdown(
-        f"""
-        <div class="card">
-          <div style="font-size: 1.35rem; font-weight: 800;">{title}</div>
-          {"<div class='tiny' style='margin-top:4px;'>" + meta + "</div>" if meta else ""}
-          <div class="muted" style="margin-top:10px; font-size: 1.05rem;">{body}</div>
-          {extra_html}
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-
-def quick_links(email: str, github_url: str, linkedin_url: str):
-    mailto = f"mailto:{email}"
-    html = f"""
-    <div style="display:flex; gap:12px; align-items:center; margin-top:10px;">
-
-      <a href="{mailto}" target="_blank" rel="noopener noreferrer" title="Email"
-         style="display:inline-flex; align-items:center; justify-content:center;
-                width:42px; height:42px; border-radius:12px;
-                border:1px solid rgba(229,231,235,.12);
-                background: rgba(229,231,235,.06);
-                box-shadow: 0 10px 30px rgba(0,0,0,.20);
-                text-decoration:none; transition: transform .12s ease;">
-        <svg width="22" height="22" viewBox="0 0 24 24" aria-hidden="true"
-             style="fill: rgba(229,231,235,.92);">
-          <path d="M20 4H4c-1.1 0-2 .9-2 2v12c0 1.1.9 2 2 2h16c1.1 0 2-.9 2-2V6c0-1.1-.9-2-2-2zm0 4-8 5-8-5V6l8 5 8-5v2z"/>
-        </svg>
-      </a>
-
-      <a href="{github_url}" target="_blank" rel="noopener noreferrer" title="GitHub"
-         style="display:inline-flex; align-items:center; justify-content:center;
-                width:42px; height:42px; border-radius:12px;
-                border:1px solid rgba(229,231,235,.12);
-                background: rgba(229,231,235,.06);
-                box-shadow: 0 10px 30px rgba(0,0,0,.20);
-                text-decoration:none; transition: transform .12s ease;">
-        <svg width="22" height="22" viewBox="0 0 24 24" aria-hidden="true"
-             style="fill: rgba(229,231,235,.92);">
-          <path d="M12 .5C5.73.5.5 5.74.5 12.02c0 5.11 3.29 9.44 7.86 10.97.57.1.78-.25.78-.55v-2.05c-3.2.7-3.88-1.38-3.88-1.38-.53-1.34-1.29-1.7-1.29-1.7-1.05-.72.08-.71.08-.71 1.16.08 1.77 1.2 1.77 1.2 1.03 1.77 2.7 1.26 3.36.96.1-.75.4-1.26.72-1.55-2.55-.29-5.23-1.28-5.23-5.7 0-1.26.45-2.29 1.19-3.1-.12-.29-.52-1.47.11-3.06 0 0 .98-.31 3.2 1.18.93-.26 1.92-.39 2.91-.39.99 0 1.98.13 2.91.39 2.22-1.49 3.2-1.18 3.2-1.18.63 1.59.23 2.77.11 3.06.74.81 1.19 1.84 1.19 3.1 0 4.43-2.69 5.41-5.25 5.69.41.36.78 1.07.78 2.16v3.2c0 .31.21.66.79.55 4.56-1.53 7.85-5.86 7.85-10.97C23.5 5.74 18.27.5 12 .5z"/>
-        </svg>
-      </a>
-
-      <a href="{linkedin_url}" target="_blank" rel="noopener noreferrer" title="LinkedIn"
-         style="display:inline-flex; align-items:center; justify-content:center;
-                width:42px; height:42px; border-radius:12px;
-                border:1px solid rgba(229,231,235,.12);
-                background: rgba(229,231,235,.06);
-                box-shadow: 0 10px 30px rgba(0,0,0,.20);
-                text-decoration:none; transition: transform .12s ease;">
-        <svg width="22" height="22" viewBox="0 0 24 24" aria-hidden="true"
-             style="fill: rgba(229,231,235,.92);">
-          <path d="M20.447 20.452h-3.554v-5.569c0-1.328-.027-3.037-1.852-3.037-1.853 0-2.136 1.445-2.136 2.939v5.667H9.351V9h3.414v1.561h.047c.476-.9 1.637-1.85 3.369-1.85 3.603 0 4.266 2.37 4.266 5.455v6.286zM5.337 7.433a2.067 2.067 0 1 1 0-4.134 2.067 2.067 0 0 1 0 4.134zM6.814 20.452H3.86V9h2.954v11.452zM22.225 0H1.771C.792 0 0 .774 0 1.727v20.545C0 23.227.792 24 1.771 24h20.451C23.2 24 24 23.227 24 22.273V1.727C24 .774 23.2 0 22.222 0h.003z"/>
-        </svg>
-      </a>
+# ---------------------------
+# PDF page previews (pre-rendered images)
+# ---------------------------
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def save_image_atomic(img, target: Path, quality: int = 72, fmt: str = "WEBP"):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    if fmt == "AVIF":
+        img.save(tmp, fmt, quality=quality, speed=6)
+    else:
+        img.save(tmp, fmt, quality=quality, method=4)
+    os.replace(tmp, target)
+
+
+def render_pdf_page_image(pdf_path: Path, out_dir: Path, page_no: int, kind: str, lock: threading.Lock) -> Path:
+    target = out_dir / f"{kind}-{page_no:03d}.webp"
+    if target.exists():
+        return target
+    width = PDF_THUMB_WIDTH if kind == "thumb" else PDF_PAGE_WIDTH
+    # pdfium is not thread-safe, so every render goes through one lock
+    with lock:
+        doc = pdfium.PdfDocument(str(pdf_path))
+        try:
+            page = doc[page_no - 1]
+            img = page.render(scale=width / page.get_size()[0]).to_pil()
+            page.close()
+        finally:
+            doc.close()
+    save_image_atomic(img, target)
+    return target
 
-    </div>
 
-    <script>
-      const links = document.querySelectorAll('a');
-      links.forEach(a => {{
-        a.addEventListener('mouseenter', () => {{
-          a.style.borderColor = 'rgba(163,230,53,.28)';
-          a.style.transform = 'translateY(-1px)';
-          const svg = a.querySelector('svg');
-          if (svg) svg.style.fill = '#A3E635';
-        }});
-        a.addEventListener('mouseleave', () => {{
-          a.style.borderColor = 'rgba(229,231,235,.12)';
-          a.style.transform = 'translateY(0px)';
-          const svg = a.querySelector('svg');
-          if (svg) svg.style.fill = 'rgba(229,231,235,.92)';
-        }});
-      }});
-    </script>
+def prerender_pdf(pdf_path: Path, out_dir: Path, lock: threading.Lock):
     """
-    components.html(html, height=70)
-
+    Thumbnails for the first PDF_PREVIEW_PAGES pages first (so the strip is
+    usable early), then the full-size page images. Already rendered files are
+    skipped, so re-queueing a PDF is cheap.
+    """
+    meta = out_dir / "pages.json"
+    if meta.exists():
+        total = json.loads(meta.read_text())["pages"]
+    else:
+        with lock:
+            doc = pdfium.PdfDocument(str(pdf_path))
+            total = len(doc)
+            doc.close()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        meta.write_text(json.dumps({"pages": total, "source": pdf_path.name}))
 
-def normalize_math(md_text: str) -> str:
-    md_text = md_text.replace(r"\(", "$").replace(r"\)", "$")
-    md_text = md_text.replace(r"\[", "$$").replace(r"\]", "$$")
-    return md_text
+    shown = min(total, PDF_PREVIEW_PAGES)
+    for kind in ("thumb", "page"):
+        for page_no in range(1, shown + 1):
+            render_pdf_page_image(pdf_path, out_dir, page_no, kind, lock)
 
 
-def parse_numeric_list(raw: str) -> List[float]:
-    parts = re.split(r"[\s,]+", raw.strip())
-    nums: List[float] = []
-    for p in parts:
-        if not p:
-            continue
-        try:
-            nums.append(float(p))
-        except ValueError:
-            continue
-    return nums
+@st.cache_resource(show_spinner=False)
+def pdf_page_worker() -> Dict[str, Any]:
+    """
+    One background thread per process that rasterizes project PDFs into
+    PDF_PAGES_DIR. Every projects_static PDF is queued at startup, so the
+    images are usually ready before anyone opens the Projects page.
+    Jobs are (pdf, 0) for the whole preview or (pdf, page) for one full-size
+    page; queue_pdf_render() drops a job that is already waiting. A PDF that
+    fails to hash or render is recorded in "failed" (digest -> error) so the
+    page browser can say so instead of waiting for it.
+    """
+    state: Dict[str, Any] = {
+        "lock": threading.Lock(),  # pdfium
+        "queue": queue.Queue(),
+        "queued": set(),
+        "queued_lock": threading.Lock(),
+        "digests": {},
+        "failed": {},
+    }
 
+    def run():
+        while True:
+            job = state["queue"].get()
+            pdf_path, page_no = job
+            digest = ""
+            try:
+                digest = pdf_digest(state, pdf_path)
+                if page_no:
+                    render_pdf_page_image(pdf_path, PDF_PAGES_DIR / digest, page_no, "page", state["lock"])
+                else:
+                    prerender_pdf(pdf_path, PDF_PAGES_DIR / digest, state["lock"])
+            except Exception as e:
+                # Keyed by content, so a fixed (re-uploaded) PDF gets another try
+                state["failed"][digest or str(pdf_path)] = f"{type(e).__name__}: {e}"
+            finally:
+                with state["queued_lock"]:
+                    state["queued"].discard(job)
+
+    if pdfium is not None:
+        threading.Thread(target=run, name="pdf-page-worker", daemon=True).start()
+        for pdf_path in sorted(PROJECTS_DIR.glob("*/*.pdf")):
+            queue_pdf_render(state, pdf_path)
+    return state
+
+
+def queue_pdf_render(worker: Dict[str, Any], pdf_path: Path, page_no: int = 0):
+    # Reruns while a job waits (every rerun of the page browser asks again) don't pile up copies
+    job = (pdf_path, page_no)
+    with worker["queued_lock"]:
+        if job in worker["queued"]:
+            return
+        worker["queued"].add(job)
+    worker["queue"].put(job)
 
-def compute_means_bundle(values: List[float], weights: List[float], trim_pct: float, p: float) -> Dict[str, float]:
-    out: Dict[str, float] = {}
-    n = len(values)
-    if n == 0:
-        return out
 
-    out["Arithmetic"] = sum(values) / n
-    out["RMS"] = math.sqrt(sum(v * v for v in values) / n)
+def pdf_digest(worker: Dict[str, Any], pdf_path: Path) -> str:
+    # Content hash, memoized per (path, mtime, size) so each PDF is hashed once
+    key = (str(pdf_path), file_signature(pdf_path))
+    digest = worker["digests"].get(key)
+    if digest is None:
+        digest = worker["digests"][key] = file_sha256(pdf_path)
+    return digest
 
-    all_positive = all(v > 0 for v in values)
-    if all_positive:
-        out["Geometric"] = math.exp(sum(math.log(v) for v in values) / n)
-        denom = sum(1.0 / v for v in values)
-        if denom != 0:
-            out["Harmonic"] = n / denom
-        if p <= 0:
-            out["Power (Mp)"] = (sum(v ** p for v in values) / n) ** (1.0 / p) if p != 0 else out["Geometric"]
-    elif p > 0:
-        near_integer = abs(p - round(p)) < 1e-9
-        if near_integer or all(v >= 0 for v in values):
-            out["Power (Mp)"] = (sum(v ** p for v in values) / n) ** (1.0 / p)
 
-    if p > 0 and "Power (Mp)" not in out:
-        if all(v >= 0 for v in values):
-            out["Power (Mp)"] = (sum(v ** p for v in values) / n) ** (1.0 / p)
+def known_pdf_digest(worker: Dict[str, Any], pdf_path: Path) -> str:
+    # The digest if the worker has already hashed this version of the file, else ""
+    # (the script thread never hashes; it queues the PDF and the worker does)
+    return worker["digests"].get((str(pdf_path), file_signature(pdf_path)), "")
 
-    if all(v >= 0 for v in values) and sum(values) > 0:
-        out["Contraharmonic"] = sum(v * v for v in values) / sum(values)
 
-    if weights and len(weights) == n and sum(weights) != 0:
-        out["Weighted"] = sum(v * w for v, w in zip(values, weights)) / sum(weights)
+# ---------------------------
+# Responsive images (profile + post figures)
+# ---------------------------
+IMAGE_MD_RE = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)\)")
+IMAGE_QUALITY = {"avif": 50, "webp": 74}
 
-    sorted_vals = sorted(values)
-    k = int(n * max(0.0, min(40.0, trim_pct)) / 100.0)
-    if 2 * k < n:
-        trimmed = sorted_vals[k : n - k]
-        out["Trimmed"] = sum(trimmed) / len(trimmed)
 
-    return out
+@st.cache_resource(show_spinner=False)
+def image_variants(path: str, sig: Tuple[int, int]) -> Dict[str, Any]:
+    """
+    Resized AVIF/WebP copies of one image at each of IMAGE_WIDTHS (plus the
+    source width when it's smaller than the largest), encoded once into
+    IMAGE_CACHE_DIR/<sha256 of the source> and reused across restarts.
+    Recomputed when the source's mtime/size change.
+    """
+    src = Path(path)
+    out_dir = IMAGE_CACHE_DIR / file_sha256(src)
+    with Image.open(src) as im:
+        im.load()
+        width, height = im.size
+        widths = sorted({w for w in IMAGE_WIDTHS if w < width} | {min(width, IMAGE_WIDTHS[-1])})
+        files: Dict[str, List[Tuple[int, Path]]] = {fmt: [] for fmt in IMAGE_FORMATS}
+        for w in widths:
+            targets = {fmt: out_dir / f"{w}.{fmt}" for fmt in IMAGE_FORMATS}
+            missing = [fmt for fmt, t in targets.items() if not t.exists()]
+            if missing:
+                img = im.convert("RGBA" if "A" in im.getbands() or "transparency" in im.info else "RGB")
+                if w < width:
+                    img = img.resize((w, round(height * w / width)), Image.Resampling.LANCZOS)
+                for fmt in missing:
+                    save_image_atomic(img, targets[fmt], IMAGE_QUALITY[fmt], fmt.upper())
+            for fmt, t in targets.items():
+                files[fmt].append((w, t))
+    return {"stem": src.stem, "width": width, "height": height, "files": files}
+
+
+def image_srcsets(variants: Dict[str, Any]) -> Dict[str, List[Tuple[int, str]]]:
+    # Published on every render, like publish_embed(): an existing name is only a stat, and a
+    # pruned or cleaned-out static/ gets its files back instead of serving 404s until a restart
+    return {
+        fmt: [(w, publish_hashed(t.read_bytes(), "assets/img", f"{variants['stem']}-{w}", f".{fmt}", precompress=False, keep=2)) for w, t in files]
+        for fmt, files in variants["files"].items()
+    }
 
 
-def render_means_interactive():
-    st.markdown("## Interactive playground")
-    st.markdown("<div class='muted'>Try your own values and compare mean choices.</div>", unsafe_allow_html=True)
+def fallback_variant(files: List[Tuple[int, Any]]) -> Any:
+    # The 640px one (or the largest there is) for the plain <img> / st.image
+    return files[min(1, len(files) - 1)][1]
 
-    c1, c2, c3 = st.columns(3)
-    with c1:
-        raw_values = st.text_area("Numbers (comma, space, or newline)", value="1, 2, 8", key="means_values")
-    with c2:
-        raw_weights = st.text_input("Weights (optional)", value="", key="means_weights")
-    with c3:
-        trim_pct = st.slider("Trim percent each tail", min_value=0, max_value=40, value=0, key="means_trim")
 
-    p_val = st.slider("Power mean p", min_value=-2.0, max_value=4.0, value=1.0, step=0.1, key="means_p")
-    selected = st.multiselect(
-        "Show on chart",
-        ["Arithmetic", "Geometric", "Harmonic", "RMS", "Contraharmonic", "Weighted", "Trimmed", "Power (Mp)"],
-        default=["Arithmetic", "Geometric", "Harmonic", "RMS", "Power (Mp)"],
-        key="means_show",
+def responsive_image_html(path: Path, alt: str, sizes: str, lazy: bool = True, style: str = "") -> str:
+    """
+    <picture> with an AVIF and a WebP srcset so the browser downloads only
+    the width its layout slot (sizes) and screen density call for. The <img>
+    carries the intrinsic size, so the space is reserved before it loads.
+    Needs static serving and at least one entry in IMAGE_FORMATS.
+    """
+    v = image_variants(str(path), file_signature(path))
+    srcsets = image_srcsets(v)
+    sources = "".join(
+        f'<source type="image/{fmt}" srcset="{", ".join(f"{url} {w}w" for w, url in urls)}" sizes="{sizes}">' for fmt, urls in srcsets.items()
+    )
+    fallback = fallback_variant(srcsets[IMAGE_FORMATS[-1]])
+    loading = 'loading="lazy" ' if lazy else 'fetchpriority="high" '
+    return (
+        f'<picture>{sources}<img src="{fallback}" alt="{html.escape(alt, quote=True)}" width="{v["width"]}" height="{v["height"]}" '
+        f'{loading}decoding="async" style="max-width:100%;height:auto;{style}"></picture>'
     )
 
-    values = parse_numeric_list(raw_values)
-    weights = parse_numeric_list(raw_weights) if raw_weights.strip() else []
 
-    if not values:
-        st.warning("Enter at least one valid numeric value.")
+def show_profile_image(path: Path):
+    if not IMAGE_FORMATS:
+        st.image(str(path), use_container_width=True)
         return
-
-    bundle = compute_means_bundle(values, weights, float(trim_pct), float(p_val))
+    # Above the fold on both pages that show it, so it isn't lazy-loaded
+    if static_serving_enabled():
+        st.markdown(
+            responsive_image_html(path, "Profile photo", "(max-width: 640px) 100vw, 360px", lazy=False, style="width:100%;border-radius:14px;"),
+            unsafe_allow_html=True,
+        )
+        return
+    # Without a static route the image goes through Streamlit's media endpoint: send a 640px variant, not the original
+    files = image_variants(str(path), file_signature(path))["files"][IMAGE_FORMATS[-1]]
+    st.image(str(fallback_variant(files)), use_container_width=True)
+
+
+def responsive_markdown_images(md_text: str, base: Path) -> str:
+    """
+    Swaps markdown images that point at local PNG/JPEG files (relative to
+    base) for responsive <picture> tags, when static serving is on. Remote
+    and missing images are left as they are.
+    """
+    if not static_serving_enabled() or not IMAGE_FORMATS:
+        return md_text
+
+    def swap(m: re.Match) -> str:
+        target = m.group(2)
+        if "://" in target or target.startswith(("/", "data:")) or Path(target).suffix.lower() not in (".png", ".jpg", ".jpeg"):
+            return m.group(0)
+        path = (base / target).resolve()
+        if not path.is_file() or ROOT.resolve() not in path.parents:
+            return m.group(0)
+        width = min(image_variants(str(path), file_signature(path))["width"], 1120)
+        return responsive_image_html(path, m.group(1), f"(max-width: {width}px) 100vw, {width}px")
+
+    return IMAGE_MD_RE.sub(swap, md_text)
+
+
+QA_COMPARE = {">=": pc.greater_equal, "<=": pc.less_equal, ">": pc.greater, "<": pc.less, "=": pc.equal}
+QA_TYPE_PATTERNS = {
+    "number": r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$",
+    "integer": r"^\s*[-+]?\d+\s*$",
+    "timestamp": r"^\s*\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?\s*$",
+}
+
+
+def qa_normalize(col: Any, how: str) -> Any:
+    """Key normalizers for cross-sheet matching: "day" drops the time, "ticker" drops an exchange suffix and case."""
+    if how == "day" and pa.types.is_timestamp(col.type):
+        return col.cast(pa.date32())
+    if how == "ticker":
+        return pc.utf8_upper(pc.replace_substring_regex(pc.cast(col, pa.string()), r"\.[A-Za-z]+$", ""))
+    return col
+
+
+def blank_mask(col: Any) -> Any:
+    mask = pc.is_null(col)
+    if pa.types.is_string(col.type) or pa.types.is_large_string(col.type):
+        mask = pc.or_(mask, pc.equal(pc.utf8_trim_whitespace(col), ""))
+    return pc.fill_null(mask, True)
+
+
+def qa_numeric(col: Any) -> Any:
+    """
+    col as numbers for comparisons. A text column (one stray label in a
+    number column is enough for the cache to store it as text) keeps its
+    number-like cells, cast, and the rest become null: those rows are left
+    to the type rules. None for columns of any other type.
+    """
+    t = col.type
+    if pa.types.is_integer(t) or pa.types.is_floating(t):
+        return col
+    if pa.types.is_string(t) or pa.types.is_large_string(t):
+        ok = pc.fill_null(pc.match_substring_regex(col, QA_TYPE_PATTERNS["number"]), False)
+        return pc.cast(pc.if_else(ok, pc.utf8_trim_whitespace(col), pa.scalar(None, pa.string())), pa.float64())
+    return None
+
+
+def qa_check(rule: Dict[str, Any], table: pa.Table, refs: Dict[str, pa.Table]) -> Tuple[np.ndarray, str]:
+    """
+    Runs one rule over one sheet as whole-column Arrow/NumPy operations.
+    Returns the violating row positions and a short description.
+    refs holds the other sheets, for cross-sheet checks.
+    """
+    check = rule["check"]
+    if check == "not_null":
+        mask = None
+        for c in rule["columns"]:
+            m = blank_mask(table.column(c))
+            mask = m if mask is None else pc.or_(mask, m)
+        return pc.indices_nonzero(mask).to_numpy(), "missing " + " / ".join(rule["columns"])
+
+    if check == "type":
+        want = rule["type"]
+        bad = []
+        for c in rule["columns"]:
+            col = table.column(c)
+            t = col.type
+            if want == "timestamp" and (pa.types.is_timestamp(t) or pa.types.is_date(t)):
+                continue
+            if want == "number" and (pa.types.is_integer(t) or pa.types.is_floating(t)):
+                continue
+            if want == "integer" and pa.types.is_integer(t):
+                continue
+            if want == "integer" and pa.types.is_floating(t):
+                mask = pc.not_equal(col, pc.floor(col))
+            elif pa.types.is_string(t) or pa.types.is_large_string(t):
+                mask = pc.invert(pc.match_substring_regex(col, QA_TYPE_PATTERNS[want]))
+            elif pa.types.is_null(t):
+                continue
+            else:
+                mask = pc.is_valid(col)  # a column of some other type entirely
+            bad.append(pc.indices_nonzero(pc.fill_null(mask, False)).to_numpy())
+        rows = np.unique(np.concatenate(bad)) if bad else np.empty(0, dtype=np.int64)
+        return rows, f"not a {want}"
+
+    if check == "range":
+        mask = None
+        for c in rule["columns"]:
+            col = qa_numeric(table.column(c))
+            if col is None:
+                continue  # left to the type rules
+            m = pa.array(np.zeros(table.num_rows, dtype=bool))
+            if "min" in rule:
+                m = pc.or_(m, pc.less(col, rule["min"]))
+            if "max" in rule:
+                m = pc.or_(m, pc.greater(col, rule["max"]))
+            mask = m if mask is None else pc.or_(mask, m)
+        if mask is None:
+            return np.empty(0, dtype=np.int64), "out of range"
+        lo, hi = rule.get("min", "-inf"), rule.get("max", "inf")
+        return pc.indices_nonzero(pc.fill_null(mask, False)).to_numpy(), f"outside [{lo}, {hi}]"
+
+    if check == "order":
+        cols = rule["columns"]
+        mask = None
+        for a, b in zip(cols[:-1], cols[1:]):
+            ca, cb = table.column(a), table.column(b)
+            if not (pa.types.is_temporal(ca.type) and pa.types.is_temporal(cb.type)):
+                ca, cb = qa_numeric(ca), qa_numeric(cb)
+                if ca is None or cb is None:
+                    continue  # left to the type rules
+            m = pc.greater(ca, cb)
+            mask = m if mask is None else pc.or_(mask, m)
+        if mask is None:
+            return np.empty(0, dtype=np.int64), " <= ".join(cols) + " broken"
+        return pc.indices_nonzero(pc.fill_null(mask, False)).to_numpy(), " <= ".join(cols) + " broken"
+
+    norm = rule.get("normalize", {})
+    if check == "unique":
+        keys = rule["columns"]
+        keyed = pa.table({k: qa_normalize(table.column(k), norm.get(k, "")) for k in keys} | {"_pos": np.arange(table.num_rows)})
+        groups = keyed.group_by(keys).aggregate([("_pos", "count"), ("_pos", "list")])
+        dup = pc.greater(groups.column("_pos_count"), 1)
+        lists = groups.column("_pos_list").filter(dup)
+        rows = np.sort(pc.list_flatten(lists).to_numpy()) if len(lists) else np.empty(0, dtype=np.int64)
+        return rows, "duplicate " + " + ".join(keys)
+
+    if check == "foreign_key":
+        keys, ref_keys = rule["columns"], rule["ref_columns"]
+        left = pa.table({f"k{i}": qa_normalize(table.column(k), norm.get(k, "")) for i, k in enumerate(keys)} | {"_pos": np.arange(table.num_rows)})
+        parts = []
+        for name, ref in refs.items():
+            cols = {}
+            for i, k in enumerate(ref_keys):
+                raw = pa.array([name] * ref.num_rows) if k == "__sheet__" else ref.column(k)
+                cols[f"k{i}"] = qa_normalize(raw, norm.get(k, ""))
+            parts.append(pa.table(cols))
+        if not parts:
+            return np.arange(table.num_rows), "no reference sheets"
+        right = pa.concat_tables(parts, promote_options="permissive").group_by([f"k{i}" for i in range(len(keys))]).aggregate([])
+        missing = left.join(right, [f"k{i}" for i in range(len(keys))], join_type="left anti")
+        return np.sort(missing.column("_pos").to_numpy()), "no matching row in " + ", ".join(refs)
+
+    if check == "jump":
+        what = f"{rule['column']} moved more than {rule['max_pct']}% since the previous {rule['order_by']}"
+        col = qa_numeric(table.column(rule["column"]))
+        if col is None:
+            return np.empty(0, dtype=np.int64), what
+        order = pc.sort_indices(table, [(rule["group_by"], "ascending"), (rule["order_by"], "ascending")]).to_numpy()
+        grp = table.column(rule["group_by"]).take(order).to_numpy(zero_copy_only=False)
+        # Text cells are null here, so NaN: no jump is reported into or out of them
+        v = pc.fill_null(pc.cast(col, pa.float64()).take(order), np.nan).to_numpy(zero_copy_only=False)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.abs(v[1:] / v[:-1] - 1) * 100
+        jump = (grp[1:] == grp[:-1]) & (pct > rule["max_pct"])
+        return np.sort(order[1:][jump]), what
+
+    if check == "flagged_when":
+        what = f"{rule['flag']} set iff {rule['source']} {rule['op']} {rule['value']}"
+        src = qa_numeric(table.column(rule["source"]))
+        if src is None:
+            return np.empty(0, dtype=np.int64), what
+        # Rows whose source is text (null here) are left to the type rules, not judged either way
+        cond = QA_COMPARE[rule["op"]](src, rule["value"])
+        flagged = pc.invert(blank_mask(table.column(rule["flag"])))
+        mask = pc.fill_null(pc.not_equal(cond, flagged), False)
+        return pc.indices_nonzero(mask).to_numpy(), what
+
+    raise ValueError(f"unknown QA check {check!r}")
+
+
+def qa_rule_columns(rule: Dict[str, Any]) -> List[str]:
+    cols = list(rule.get("columns", []))
+    for k in ("column", "group_by", "order_by", "flag", "source"):
+        if k in rule:
+            cols.append(rule[k])
+    return cols
+
+
+def qa_pick_sheets(spec: Any, exclude: List[str], sheets: List[Dict[str, Any]], needs: List[str]) -> List[Dict[str, Any]]:
+    picked = [sh for sh in sheets if sh["name"] not in exclude and (spec == "*" or sh["name"] in spec)]
+    return [sh for sh in picked if all(c in sh["columns"] for c in needs)]
+
+
+@st.cache_resource(show_spinner=False)
+def qa_memo() -> Dict[str, Any]:
+    # (rule, content hashes of every sheet it reads) -> result; bounded FIFO
+    return {"lock": threading.Lock(), "results": {}}
+
+
+def run_qa(rules: List[Dict[str, Any]], out: Path, meta: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Runs every rule on every sheet it applies to. Results are memoized on
+    the rule plus the sha256 of each sheet it reads (target and reference
+    sheets), so after a file changes only the rules touching a changed
+    sheet rerun. Returns the results and how many were reused.
+    """
+    memo = qa_memo()
+    results: List[Dict[str, Any]] = []
+    reused = 0
+    for rule in rules:
+        targets = qa_pick_sheets(rule["sheets"], rule.get("exclude", []), meta["sheets"], qa_rule_columns(rule))
+        refs_meta = []
+        if rule["check"] == "foreign_key":
+            ref_cols = [c for c in rule["ref_columns"] if c != "__sheet__"]
+            refs_meta = qa_pick_sheets(rule["ref_sheets"], rule.get("ref_exclude", []), meta["sheets"], ref_cols)
+        for sh in targets:
+            key = json.dumps([rule, sh["sha256"], [r["sha256"] for r in refs_meta]], sort_keys=True, default=str)
+            with memo["lock"]:
+                hit = memo["results"].get(key)
+            if hit is not None:
+                results.append(hit)
+                reused += 1
+                continue
+            path = out / sh["file"]
+            table = open_sheet(str(path), file_signature(path))
+            refs = {r["name"]: open_sheet(str(out / r["file"]), file_signature(out / r["file"])) for r in refs_meta}
+            error = ""
+            try:
+                pos, what = qa_check(rule, table, refs)
+            except (pa.ArrowException, KeyError, TypeError, ValueError) as e:
+                # One rule that can't run on this sheet is reported, not fatal for the rest
+                pos, what, error = np.empty(0, dtype=np.int64), "could not run", f"{type(e).__name__}: {e}"
+            res = {
+                "rule": rule["id"],
+                "sheet": sh["name"],
+                "checked": table.num_rows,
+                "what": what,
+                "rows": table.column(SOURCE_ROW).take(pa.array(pos, type=pa.int64())).to_numpy() if pos.size else np.empty(0, dtype=np.int32),
+                "positions": pos,
+                "columns": [c for c in qa_rule_columns(rule) if c in sh["columns"]],
+                "error": error,
+            }
+            with memo["lock"]:
+                if len(memo["results"]) >= 1024:
+                    memo["results"].pop(next(iter(memo["results"])))
+                memo["results"][key] = res
+            results.append(res)
+    return results, reused
+
+
+def render_table_preview(files: List[Path]):
+    """Paged, column-projected view of a project's CSV/XLSX files, read from the Arrow cache."""
+    st.markdown("### Data preview")
+    names = [p.name for p in files]
+    chosen = files[names.index(st.selectbox("File", names, key="tbl_file"))] if len(files) > 1 else files[0]
+    if chosen.suffix.lower() == ".xlsx" and openpyxl is None:
+        st.info("Install openpyxl to preview workbooks; the download still works.")
+        return
+    out, meta, error = table_cache(chosen)
+    if error:
+        st.info(f"{chosen.name} could not be read for the preview ({error}). The download still works.")
+        return
+    if not meta:
+        wait_for_table_cache(chosen, "tbl")
+        return
+    sheets = meta["sheets"]
+    if not sheets:
+        st.info("This file has no sheets with data.")
+        return
+    sheet_names = [sh["name"] for sh in sheets]
+    sheet = sheets[sheet_names.index(st.selectbox("Sheet", sheet_names, key=f"tbl_sheet_{out.name}"))] if len(sheets) > 1 else sheets[0]
+    path = out / sheet["file"]
+    sig = file_signature(path)
+    table = open_sheet(str(path), sig)
+    if not table.num_rows:
+        # Formula cells saved without cached results read as blank too
+        st.info("This sheet has a header but no rows." if sheet["columns"] else "This sheet has no values to show.")
+        return
+
+    skey = f"{out.name}_{sheet['file']}"
+    c1, c2, c3 = st.columns([2, 1, 1])
+    names = sheet["columns"]
+    cols = c1.multiselect("Columns", names, default=names[:10], key=f"tbl_cols_{skey}")
+    fcol = c2.selectbox("Filter column", ["(none)"] + names, key=f"tbl_fcol_{skey}")
+    query = c3.text_input("Filter", value="", key=f"tbl_q_{skey}", placeholder="text, or >= 100", disabled=fcol == "(none)")
+
+    rows = None
+    if fcol != "(none)" and query.strip():
+        rows = sheet_filter(str(path), sig, fcol, query.strip())
+    n = table.num_rows if rows is None else rows.size
+
+    p1, p2 = st.columns([1, 1])
+    page_size = p1.select_slider("Rows per page", options=[25, 50, 100, 250, 500], value=100, key="tbl_page_size")
+    n_pages = max(1, math.ceil(n / page_size))
+    page = p2.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key=f"tbl_page_{skey}")
+    lo = (int(page) - 1) * page_size
+    hi = min(lo + page_size, n)
+    view = table.select([SOURCE_ROW] + (cols or names[:1]))
+    view = view.slice(lo, hi - lo) if rows is None else view.take(rows[lo:hi])
+    view = view.rename_columns(["Sheet row"] + view.column_names[1:])
+    st.dataframe(view, use_container_width=True, hide_index=True)
+    st.caption(
+        f"Rows {lo + 1 if n else 0:,}–{hi:,} of {n:,}"
+        + (f" matching (of {table.num_rows:,})" if rows is not None else "")
+        + f"; page {int(page)} of {n_pages:,}. Served from a memory-mapped Arrow cache built once in {meta['convert_ms']:,} ms."
+    )
+
+
+def render_data_qa(slug: str, files: List[Path]):
+    rules = QA_RULES.get(slug)
+    if not rules:
+        return
+    st.markdown("### Data QA")
+    st.markdown(
+        f"<div class='muted'>{len(rules)} declarative rules (nulls, types, ranges, OHLC ordering, duplicates, "
+        "cross-sheet keys, day-over-day jumps, exception flags), each run as whole-column checks.</div>",
+        unsafe_allow_html=True,
+    )
+    for f in files:
+        if f.suffix.lower() == ".xlsx" and openpyxl is None:
+            continue
+        out, meta, error = table_cache(f)
+        if error:
+            st.info(f"{f.name} could not be read, so its rules were skipped ({error}).")
+            continue
+        if not meta:
+            wait_for_table_cache(f, "qa")
+            continue
+        t0 = time.perf_counter()
+        results, reused = run_qa(rules, out, meta)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        failing = [r for r in results if r["rows"].size]
+        errors = [r for r in results if r["error"]]
+        st.dataframe(
+            [
+                {
+                    "Rule": r["rule"],
+                    "Sheet": r["sheet"],
+                    "Rows checked": r["checked"],
+                    "Violations": int(r["rows"].size),
+                    "First rows": ", ".join(str(n) for n in r["rows"][:8]) + (" ..." if r["rows"].size > 8 else ""),
+                }
+                | ({"Error": r["error"]} if errors else {})
+                for r in sorted(results, key=lambda r: (not r["error"], -r["rows"].size, r["rule"], r["sheet"]))
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+        for r in failing[:12]:
+            with st.expander(f"{r['rule']} on {r['sheet']}: {r['rows'].size:,} rows ({r['what']})"):
+                path = out / next(sh["file"] for sh in meta["sheets"] if sh["name"] == r["sheet"])
+                table = open_sheet(str(path), file_signature(path))
+                view = table.select([SOURCE_ROW] + r["columns"]).take(pa.array(r["positions"][:200], type=pa.int64()))
+                st.dataframe(view.rename_columns(["Sheet row"] + view.column_names[1:]), use_container_width=True, hide_index=True)
+        st.caption(
+            f"{f.name}: {len(results)} rule x sheet checks, {len(failing)} with violations"
+            + (f", {len(errors)} could not run" if errors else "")
+            + "; "
+            f"{reused} reused from unchanged sheets, {len(results) - reused} run, {elapsed_ms:,.0f} ms. Row numbers are sheet rows."
+        )
+
+
+def render_pdf_page_browser(pdf_path: Path, per_strip: int = 6):
+    worker = pdf_page_worker()
+    digest = known_pdf_digest(worker, pdf_path)
+    error = worker["failed"].get(digest or str(pdf_path))
+    if error:
+        st.error(f"Page previews for {pdf_path.name} could not be rendered ({error}). Showing the PDF viewer instead.")
+        embed_pdf(pdf_path, height=860)
+        return
+    out_dir = PDF_PAGES_DIR / digest
+    meta = out_dir / "pages.json"
+    if not digest or not meta.exists() or not any(out_dir.glob("thumb-*.webp")):
+        queue_pdf_render(worker, pdf_path)
+        st.info("Page previews for this PDF are still being prepared in the background. Try another preview mode or check back in a moment.")
+        return
+
+    total = json.loads(meta.read_text())["pages"]
+    shown = min(total, PDF_PREVIEW_PAGES)
+    strip_key = f"pdf_strip_{pdf_path}"
+    page_key = f"pdf_page_{pdf_path}"
+    strip = st.session_state.get(strip_key, 0)
+    n_strips = math.ceil(shown / per_strip)
+
+    nav = st.columns([1, 4, 1])
+    if nav[0].button("Prev", key=f"{strip_key}_prev", disabled=strip <= 0, use_container_width=True):
+        st.session_state[strip_key] = strip - 1
+        st.rerun()
+    nav[1].markdown(
+        f"<div class='tiny' style='text-align:center;margin-top:8px;'>Pages {strip * per_strip + 1}-{min(shown, (strip + 1) * per_strip)} of {total}</div>",
+        unsafe_allow_html=True,
+    )
+    if nav[2].button("Next", key=f"{strip_key}_next", disabled=strip >= n_strips - 1, use_container_width=True):
+        st.session_state[strip_key] = strip + 1
+        st.rerun()
+
+    cols = st.columns(per_strip)
+    for i, page_no in enumerate(range(strip * per_strip + 1, min(shown, (strip + 1) * per_strip) + 1)):
+        with cols[i]:
+            thumb = out_dir / f"thumb-{page_no:03d}.webp"
+            if thumb.exists():
+                st.image(str(thumb), use_container_width=True)
+            if st.button(f"p. {page_no}", key=f"{page_key}_{page_no}", use_container_width=True):
+                st.session_state[page_key] = page_no
+                st.rerun()
+
+    page_no = st.session_state.get(page_key, 1)
+    page_img = out_dir / f"page-{page_no:03d}.webp"
+    if page_img.exists():
+        st.image(str(page_img), use_container_width=True)
+    else:
+        # Not rasterized yet: the worker does it (under its pdfium lock), this run shows a placeholder
+        queue_pdf_render(worker, pdf_path, page_no)
+
+        def pending_page():
+            error = worker["failed"].get(digest)
+            if page_img.exists():
+                st.image(str(page_img), use_container_width=True)
+            elif error:
+                st.error(f"Page {page_no} could not be rendered ({error}). Download the PDF to read it.")
+            else:
+                st.info(f"Rendering page {page_no}...")
+
+        if hasattr(st, "fragment"):
+            st.fragment(run_every=1)(pending_page)()
+        else:
+            pending_page()
+    if total > shown:
+        st.caption(f"Previews cover the first {shown} of {total} pages. Download the PDF for the rest.")
+
+
+def card(title: str, body: str, meta: str = "", extra_html: str = ""):
+    st.markdown(
+        f"""
+        <div class="card">
+          <div style="font-size: 1.35rem; font-weight: 800;">{title}</div>
+          {"<div class='tiny' style='margin-top:4px;'>" + meta + "</div>" if meta else ""}
+          <div class="muted" style="margin-top:10px; font-size: 1.05rem;">{body}</div>
+          {extra_html}
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+
+def icon(name: str, label: str = "") -> str:
+    """One icon from the shared sprite (see icon_sprite()); decorative unless a label is given."""
+    a11y = f'role="img" aria-label="{html.escape(label, quote=True)}"' if label else 'aria-hidden="true"'
+    href = icon_sprite(typed_static_enabled())["href"]
+    return f'<svg class="icon" {a11y}><use href="{href}{name}"/></svg>'
+
+
+def quick_links(email: str, github_url: str, linkedin_url: str):
+    # Plain markup in the page (no iframe); hover states live in app.css (.quick-links)
+    links = [(f"mailto:{email}", "Email", "mail"), (github_url, "GitHub", "github"), (linkedin_url, "LinkedIn", "linkedin")]
+    items = "".join(
+        f'<a href="{html.escape(url, quote=True)}" target="_blank" rel="noopener noreferrer" title="{title}" aria-label="{title}">{icon(name)}</a>'
+        for url, title, name in links
+    )
+    st.markdown(f'<div class="quick-links">{items}</div>', unsafe_allow_html=True)
+
+
+def normalize_math(md_text: str) -> str:
+    md_text = md_text.replace(r"\(", "$").replace(r"\)", "$")
+    md_text = md_text.replace(r"\[", "$$").replace(r"\]", "$$")
+    return md_text
+
+
+# One definition of a token boundary, used to parse and to locate tokens: commas and any
+# Unicode whitespace (NBSP, thin and ideographic spaces, ...)
+NUMERIC_SEPARATOR_RE = re.compile(r"[\s,]+")
+_ASCII_SEPARATORS = bytes(c for c in range(128) if NUMERIC_SEPARATOR_RE.fullmatch(chr(c)))
+NUMERIC_SEPARATORS = bytes.maketrans(_ASCII_SEPARATORS, b"\n" * len(_ASCII_SEPARATORS))
+FLOAT_TOKEN_RE = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+
+def arrow_floats(col: "pa.Array", offset: int) -> Tuple[np.ndarray, List[Tuple[int, str]]]:
+    """
+    Slow path for a string column that failed the float64 conversion: one
+    vectorized regex check finds the malformed cells, and only the valid
+    ones are cast. Null markers ("NA", "null", blanks) and values that
+    aren't finite (nan, inf, 1e400) count as malformed too.
+    Returns (values, [(offset + row, token)]).
+    """
+    trimmed = pc.utf8_trim_whitespace(col)
+    ok = pc.fill_null(pc.match_substring_regex(trimmed, FLOAT_TOKEN_RE), False)
+    vals = np.full(len(col), np.nan)
+    vals[ok.to_numpy(zero_copy_only=False)] = pc.cast(trimmed.filter(ok), pa.float64()).to_numpy(zero_copy_only=False)
+    finite = np.isfinite(vals)
+    bad = [(offset + int(i), col[int(i)].as_py()) for i in np.flatnonzero(~finite)]
+    return vals[finite], bad
+
+
+def parse_numeric_block(data: bytes, offset: int = 0) -> Tuple[np.ndarray, List[Tuple[int, str]]]:
+    """
+    Numbers separated by commas or whitespace -> float64 array.
+    Separators become newlines so Arrow's C++ CSV reader can parse one
+    column straight into a typed array. Malformed tokens are returned with
+    their token index (offset-based), not silently dropped.
+    """
+    if data.isascii():
+        data = data.translate(NUMERIC_SEPARATORS)
+    else:
+        data = NUMERIC_SEPARATOR_RE.sub("\n", data.decode("utf-8", errors="replace")).encode("utf-8")
+    if not data.strip():
+        return np.empty(0), []
+    read = pacsv.ReadOptions(column_names=["v"])
+    parse = pacsv.ParseOptions(delimiter="\x1f", quote_char=False)
+    # No null markers: "NA", "null", "#N/A" must fail the float64 read and be reported, not become NaN
+    nulls = {"null_values": [], "strings_can_be_null": False}
+    try:
+        table = pacsv.read_csv(io.BytesIO(data), read, parse, pacsv.ConvertOptions(column_types={"v": pa.float64()}, **nulls))
+        values = table.column("v").to_numpy()
+        if np.isfinite(values).all():
+            return values, []
+    except pa.ArrowInvalid:
+        pass
+    table = pacsv.read_csv(io.BytesIO(data), read, parse, pacsv.ConvertOptions(column_types={"v": pa.string()}, **nulls))
+    return arrow_floats(table.column("v").combine_chunks(), offset)
+
+
+def parse_numeric_text(raw: str) -> Tuple[np.ndarray, List[Tuple[int, str]]]:
+    return parse_numeric_block(raw.encode("utf-8"))
+
+
+def token_locations(raw: str, indices: List[int]) -> Dict[int, Tuple[int, int]]:
+    # (line, column) of the given token indices; only used to describe errors
+    wanted = set(indices)
+    out: Dict[int, Tuple[int, int]] = {}
+    line, line_start, scanned = 1, 0, 0
+    for i, m in enumerate(re.finditer(r"[^\s,]+", raw)):  # the complement of NUMERIC_SEPARATOR_RE
+        if i in wanted:
+            line += raw.count("\n", scanned, m.start())
+            nl = raw.rfind("\n", 0, m.start())
+            line_start = nl + 1
+            scanned = m.start()
+            out[i] = (line, m.start() - line_start + 1)
+            if len(out) == len(wanted):
+                break
+    return out
+
+
+def upload_columns(f) -> Tuple[List[str], bool]:
+    """
+    Column names of an uploaded CSV/TSV and whether the first row is a
+    header ("column N" names otherwise). The names come from Arrow's own
+    header parse (unquoted, untrimmed), so include_columns always finds
+    them. Raises pa.ArrowInvalid for an empty or unreadable file.
+    """
+    f.seek(0)
+    parse = pacsv.ParseOptions(delimiter="\t" if f.name.lower().endswith(".tsv") else ",", invalid_row_handler=lambda row: "skip")
+    try:
+        fields = pacsv.open_csv(f, parse_options=parse).schema.names
+    finally:
+        f.seek(0)
+    try:
+        [float(c) for c in fields if c.strip()]
+        return [f"column {i + 1}" for i in range(len(fields))], False
+    except ValueError:
+        return fields, True
+
+
+def iter_numeric_upload(f, column: str, chunk_bytes: int = 8 << 20) -> Iterator[Tuple[np.ndarray, List[Tuple[int, str]]]]:
+    """
+    Yields (values, malformed) per chunk of an uploaded file, so callers can
+    either collect the chunks or fold them into accumulators.
+    CSV/TSV: streams only `column` through Arrow's incremental reader; bad
+    cells are reported with their 1-based line number. Text: numbers in any
+    separator layout, parsed in chunk_bytes slices; bad tokens are reported
+    with their token index.
+    """
+    f.seek(0)
+    if f.name.lower().endswith((".csv", ".tsv")):
+        names, has_header = upload_columns(f)
+        read = pacsv.ReadOptions(block_size=chunk_bytes, column_names=None if has_header else names)
+        first_line = 2 if has_header else 1
+        ragged: List[Tuple[int, str]] = []
+
+        def skip_ragged(row) -> str:
+            # Rows with the wrong number of fields are reported, not fatal
+            ragged.append((int(row.number or 0), row.text))
+            return "skip"
+
+        parse = pacsv.ParseOptions(
+            delimiter="\t" if f.name.lower().endswith(".tsv") else ",", invalid_row_handler=skip_ragged
+        )
+
+        def stream(col_type):
+            f.seek(0)
+            ragged.clear()
+            # No null markers: blank, "NA" or "null" cells fail the float64 read and get reported
+            conv = pacsv.ConvertOptions(
+                include_columns=[column], column_types={column: col_type}, null_values=[], strings_can_be_null=False
+            )
+            return pacsv.open_csv(f, read_options=read, parse_options=parse, convert_options=conv)
+
+        done = 0  # batches already yielded from the fast float64 path
+        row = 0
+        try:
+            for batch in stream(pa.float64()):
+                vals = batch.column(0).to_numpy(zero_copy_only=False)
+                if not np.isfinite(vals).all():
+                    raise pa.ArrowInvalid("non-finite value")  # nan/inf cells are reported by the text path
+                out_bad = list(ragged)
+                ragged.clear()
+                yield vals, out_bad
+                done += 1
+                row += batch.num_rows
+        except pa.ArrowInvalid:
+            # Re-read as text from the failing batch on; batch boundaries are
+            # the same because block_size is. Line numbers assume no ragged
+            # rows came before the bad cell.
+            for i, batch in enumerate(stream(pa.string())):
+                if i < done:
+                    ragged.clear()
+                    continue
+                vals, batch_bad = arrow_floats(batch.column(0), first_line + row)
+                yield vals, sorted(batch_bad + ragged)
+                ragged.clear()
+                row += batch.num_rows
+    else:
+        tail = b""
+        tokens = 0
+        while True:
+            chunk = f.read(chunk_bytes)
+            buf = tail + chunk
+            if chunk:
+                cut = max(buf.rfind(sep) for sep in (b",", b" ", b"\t", b"\r", b"\n"))
+                if cut < 0:
+                    tail = buf
+                    continue
+                buf, tail = buf[: cut + 1], buf[cut + 1 :]
+            vals, block_bad = parse_numeric_block(buf, tokens)
+            yield vals, block_bad
+            tokens += vals.size + len(block_bad)
+            if not chunk:
+                break
+    f.seek(0)
+
+
+def parse_numeric_upload(f, column: str, chunk_bytes: int = 8 << 20) -> Tuple[np.ndarray, List[Tuple[int, str]]]:
+    parts: List[np.ndarray] = []
+    bad: List[Tuple[int, str]] = []
+    for vals, chunk_bad in iter_numeric_upload(f, column, chunk_bytes):
+        parts.append(vals)
+        bad.extend(chunk_bad)
+    return (np.concatenate(parts) if parts else np.empty(0)), bad
+
+
+@st.cache_resource(show_spinner="Parsing upload...", max_entries=2)
+def parsed_upload(file_id: str, column: str, _f) -> Tuple[np.ndarray, List[Tuple[int, str]]]:
+    # Keyed on the upload's id so a rerun never re-parses the same file
+    values, bad = parse_numeric_upload(_f, column)
+    values.setflags(write=False)
+    return values, bad
+
+
+@st.cache_resource(show_spinner="Streaming upload...", max_entries=4)
+def streamed_upload_means(file_id: str, column: str, p: float, sketch_k: int, _f) -> Tuple[Dict[str, float], "QuantileSketch", List[Tuple[int, str]]]:
+    # The sketch is trim-independent, so moving the trim slider only re-queries it
+    acc, sketch, bad = stream_upload_means(_f, column, p, sketch_k)
+    return acc.means(), sketch, bad
+
+
+def markdown_code(text: str) -> str:
+    # Inline code span, so st.warning shows the token as typed (no markdown, math or escaping)
+    text = " ".join(text.split())
+    return f"`` {text} ``" if "`" in text else f"`{text}`"
+
+
+def report_malformed(bad: List[Tuple[int, str]], where: Dict[int, str], show: int = 8):
+    if not bad:
+        return
+    listed = ", ".join(f"{markdown_code(str(tok)[:24])} ({where.get(i, '')})" if str(tok).strip() else f"blank ({where.get(i, '')})" for i, tok in bad[:show])
+    more = f" and {len(bad) - show:,} more" if len(bad) > show else ""
+    st.warning(f"Skipped {len(bad):,} malformed value(s): {listed}{more}.")
+
+
+def compute_means_bundle(values: List[float], weights: List[float], trim_pct: float, p: float) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    n = len(values)
+    if n == 0:
+        return out
+
+    out["Arithmetic"] = sum(values) / n
+    out["RMS"] = math.sqrt(sum(v * v for v in values) / n)
+
+    all_positive = all(v > 0 for v in values)
+    if all_positive:
+        out["Geometric"] = math.exp(sum(math.log(v) for v in values) / n)
+        denom = sum(1.0 / v for v in values)
+        if denom != 0:
+            out["Harmonic"] = n / denom
+        if p <= 0:
+            out["Power (Mp)"] = (sum(v ** p for v in values) / n) ** (1.0 / p) if p != 0 else out["Geometric"]
+    elif p > 0:
+        near_integer = abs(p - round(p)) < 1e-9
+        if near_integer or all(v >= 0 for v in values):
+            out["Power (Mp)"] = (sum(v ** p for v in values) / n) ** (1.0 / p)
+
+    if p > 0 and "Power (Mp)" not in out:
+        if all(v >= 0 for v in values):
+            out["Power (Mp)"] = (sum(v ** p for v in values) / n) ** (1.0 / p)
+
+    if all(v >= 0 for v in values) and sum(values) > 0:
+        out["Contraharmonic"] = sum(v * v for v in values) / sum(values)
+
+    if weights and len(weights) == n and sum(weights) != 0:
+        out["Weighted"] = sum(v * w for v, w in zip(values, weights)) / sum(weights)
+
+    sorted_vals = sorted(values)
+    k = int(n * max(0.0, min(40.0, trim_pct)) / 100.0)
+    if 2 * k < n:
+        trimmed = sorted_vals[k : n - k]
+        out["Trimmed"] = sum(trimmed) / len(trimmed)
+
+    return out
+
+
+MEANS_BLOCK = 1 << 16  # values per block in the NumPy engine (512 KB of float64, stays in cache)
+
+
+def power_mean_root(mean_pow: float, p: float) -> float:
+    # Real root of the mean of powers; odd integer p keeps the sign like the pure-Python path would for v ** p sums
+    if mean_pow < 0 and abs(p - round(p)) < 1e-9 and int(round(p)) % 2 == 1:
+        return -((-mean_pow) ** (1.0 / p))
+    return mean_pow ** (1.0 / p)
+
+
+def trimmed_order_stats(x: np.ndarray, k: int) -> Tuple[float, float, float, float]:
+    """
+    (sum of x[k:n-k] in sorted order, k-th smallest, k-th largest, median)
+    via three successive in-place partitions, each on a shrinking slice.
+    One np.partition call with several kth values is much slower on big inputs.
+    Requires 2 * k < n.
+    """
+    n = x.size
+    a = np.array(x, dtype=np.float64)  # private copy; partitions below are in place
+    if k:
+        a.partition(k)
+        lo = float(a[k])
+        a[k:].partition(n - 2 * k - 1)
+        hi = float(a[n - k - 1])
+    mid = a[k : n - k]
+    mid_sum = float(mid.sum())
+    if not k:
+        lo = hi = 0.0  # unused: winsorizing with k = 0 adds nothing
+
+    m = (n - 1) // 2 - k
+    mid.partition(m)
+    median = float(mid[m])
+    if n % 2 == 0:
+        median = 0.5 * (median + float(mid[m + 1 :].min()))
+    return mid_sum, lo, hi, median
+
+
+@dataclass
+class MeansAccumulator:
+    """
+    Mergeable running sums for every mean that doesn't need order
+    statistics. Feed chunks with update(), combine partial results from
+    other chunks, threads or processes with merge(), and read the means off
+    the merged state in O(1) with means(). p is fixed at creation because
+    the power sums depend on it. NaN and +-inf are left out of every sum
+    and counted in `malformed`.
+    """
+
+    p: float = 1.0
+    n: int = 0
+    total: float = 0.0
+    sum_sq: float = 0.0
+    log_sum: float = 0.0
+    recip_sum: float = 0.0
+    pow_sum: float = 0.0  # sum x^p
+    pow_m1_sum: float = 0.0  # sum x^(p-1), for the Lehmer mean
+    w_sum: float = 0.0
+    wx_sum: float = 0.0
+    w_count: int = 0  # values that arrived with a weight
+    vmin: float = math.inf
+    vmax: float = -math.inf
+    malformed: int = 0  # non-finite values skipped by update()
+
+    def update(self, x: np.ndarray, w: Any = None) -> "MeansAccumulator":
+        x = np.asarray(x, dtype=np.float64)
+        finite = np.isfinite(x)
+        if not finite.all():
+            # A NaN would also slip past min() and leave vmin at +inf
+            self.malformed += int(x.size - finite.sum())
+            x = x[finite]
+            if w is not None:
+                w = np.asarray(w, dtype=np.float64)[finite]
+        if x.size == 0:
+            return self
+        b_min = float(x.min())
+        # Logs and reciprocals only matter while everything seen is positive
+        positive = self.vmin > 0 and b_min > 0
+        self.n += x.size
+        self.total += float(x.sum())
+        self.sum_sq += float(x @ x)
+        with np.errstate(all="ignore"):
+            if positive:
+                self.log_sum += float(np.log(x).sum())
+                self.recip_sum += float(np.reciprocal(x).sum())
+            xp = np.power(x, self.p)
+            self.pow_sum += float(xp.sum())
+            if positive:
+                self.pow_m1_sum += float((xp / x).sum())
+        if w is not None:
+            w = np.asarray(w, dtype=np.float64)
+            self.w_sum += float(w.sum())
+            self.wx_sum += float(x @ w)
+            self.w_count += x.size
+        self.vmin = min(self.vmin, b_min)
+        self.vmax = max(self.vmax, float(x.max()))
+        return self
+
+    def merge(self, other: "MeansAccumulator") -> "MeansAccumulator":
+        if other.p != self.p:
+            raise ValueError(f"Cannot merge accumulators built for p={self.p} and p={other.p}")
+        for name in ("n", "total", "sum_sq", "log_sum", "recip_sum", "pow_sum", "pow_m1_sum", "w_sum", "wx_sum", "w_count", "malformed"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.vmin = min(self.vmin, other.vmin)
+        self.vmax = max(self.vmax, other.vmax)
+        return self
+
+    def means(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        n, p = self.n, self.p
+        if n == 0:
+            return out
+        all_positive = self.vmin > 0
+        all_nonneg = self.vmin >= 0
+        near_integer = abs(p - round(p)) < 1e-9
+
+        out["Arithmetic"] = self.total / n
+        out["RMS"] = math.sqrt(self.sum_sq / n)
+        if all_positive:
+            out["Geometric"] = math.exp(self.log_sum / n)
+            if self.recip_sum != 0:
+                out["Harmonic"] = n / self.recip_sum
+        if p == 0 and all_positive:
+            out["Power (Mp)"] = out["Geometric"]
+        elif p != 0 and (all_positive or (p > 0 and (near_integer or all_nonneg))):
+            out["Power (Mp)"] = power_mean_root(self.pow_sum / n, p)
+        if all_nonneg and self.total > 0:
+            out["Contraharmonic"] = self.sum_sq / self.total
+        if self.w_count == n and self.w_sum != 0:
+            out["Weighted"] = self.wx_sum / self.w_sum
+        if all_positive and self.pow_m1_sum != 0:
+            out["Lehmer (Lp)"] = self.pow_sum / self.pow_m1_sum
+        return out
+
+
+def accumulate_means(x: np.ndarray, w: Any, p: float, block: int = MEANS_BLOCK) -> MeansAccumulator:
+    acc = MeansAccumulator(p=p)
+    for i in range(0, x.size, block):
+        acc.update(x[i : i + block], None if w is None else w[i : i + block])
+    return acc
+
+
+def accumulate_means_parallel(x: np.ndarray, w: Any, p: float, workers: int = 0) -> MeansAccumulator:
+    """
+    Splits x into one contiguous slice per worker thread, accumulates each
+    slice independently and merges the partial states. NumPy releases the
+    GIL inside the reductions, so the slices really run on separate cores.
+    """
+    workers = workers or min(8, os.cpu_count() or 1)
+    if workers <= 1 or x.size < 4 * MEANS_BLOCK:
+        return accumulate_means(x, w, p)
+    bounds = np.linspace(0, x.size, workers + 1).astype(int)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(
+            pool.map(
+                lambda ab: accumulate_means(x[ab[0] : ab[1]], None if w is None else w[ab[0] : ab[1]], p),
+                zip(bounds[:-1], bounds[1:]),
+            )
+        )
+    acc = parts[0]
+    for part in parts[1:]:
+        acc.merge(part)
+    return acc
+
+
+@dataclass
+class QuantileSketch:
+    """
+    Mergeable, bounded-memory quantile sketch (multi-level compactors, as
+    in Manku-Rajagopalan-Lindsay / KLL). Level h holds items of weight 2^h.
+    A level larger than k is sorted and halved into the next level, which
+    shifts any rank by at most 2^h and any partial sum by at most
+    2^h * (buffer range). Both are tallied, so the error bounds reported
+    are guaranteed rather than probabilistic. Memory is about
+    k * log2(n / k) floats; rank error is about log2(n / k) / k of n.
+    """
+
+    k: int = 4096
+    n: int = 0
+    levels: List[List[np.ndarray]] = field(default_factory=list)
+    rank_err: float = 0.0
+    sum_err: float = 0.0
+    flips: int = 0  # alternates which half a compaction keeps, to avoid bias
+
+    def update(self, x: np.ndarray) -> "QuantileSketch":
+        x = np.asarray(x, dtype=np.float64)
+        if x.size:
+            self.n += x.size
+            self._push(0, x)
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        self.n += other.n
+        self.rank_err += other.rank_err
+        self.sum_err += other.sum_err
+        for h, bufs in enumerate(other.levels):
+            for b in bufs:
+                self._push(h, b)
+        return self
+
+    def _push(self, h: int, x: np.ndarray):
+        while True:
+            while len(self.levels) <= h:
+                self.levels.append([])
+            self.levels[h].append(x)
+            size = sum(b.size for b in self.levels[h])
+            if size <= self.k:
+                return
+            buf = np.sort(np.concatenate(self.levels[h]))
+            self.levels[h] = []
+            if buf.size % 2:
+                # Keep one item back so the halved buffer stays exact in count
+                self.levels[h].append(buf[-1:])
+                buf = buf[:-1]
+            w = float(2 ** h)
+            self.rank_err += w
+            self.sum_err += w * float(buf[-1] - buf[0])
+            x = buf[self.flips % 2 :: 2]
+            self.flips += 1
+            h += 1
+
+    def retained(self) -> int:
+        return sum(b.size for bufs in self.levels for b in bufs)
+
+    def weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted retained values and the cumulative weight (rank) at each."""
+        vals = [b for bufs in self.levels for b in bufs]
+        wts = [np.full(b.size, float(2 ** h)) for h, bufs in enumerate(self.levels) for b in bufs]
+        if not vals:
+            return np.empty(0), np.empty(0)
+        v = np.concatenate(vals)
+        order = np.argsort(v, kind="stable")
+        return v[order], np.cumsum(np.concatenate(wts)[order])
+
+    def quantile_at_rank(self, v: np.ndarray, cum: np.ndarray, r: float) -> float:
+        # value of the item holding (1-based) rank r
+        i = int(np.searchsorted(cum, min(max(r, 1.0), cum[-1]), side="left"))
+        return float(v[min(i, v.size - 1)])
+
+    def middle_sum(self, v: np.ndarray, cum: np.ndarray, lo: float, hi: float) -> float:
+        """Sum of the items with ranks in (lo, hi], splitting weights at the cuts."""
+        prev = np.concatenate(([0.0], cum[:-1]))
+        overlap = np.clip(np.minimum(cum, hi) - np.maximum(prev, lo), 0.0, None)
+        return float(overlap @ v)
+
+    def robust_means(self, trim_pct: float) -> Dict[str, Tuple[float, float]]:
+        """
+        Approximate Median, Trimmed and Winsorized means as (estimate,
+        error bound). The bounds come from re-evaluating with the cut ranks
+        moved by +/- rank_err, plus the tallied sum error.
+        """
+        out: Dict[str, Tuple[float, float]] = {}
+        n = self.n
+        if n == 0:
+            return out
+        v, cum = self.weighted()
+        e = self.rank_err
+        k = int(n * max(0.0, min(40.0, trim_pct)) / 100.0)
+
+        def median_at(shift: float) -> float:
+            return 0.5 * (self.quantile_at_rank(v, cum, (n + 1) // 2 + shift) + self.quantile_at_rank(v, cum, n // 2 + 1 + shift))
+
+        med = median_at(0)
+        out["Median"] = (med, max(abs(median_at(-e) - med), abs(median_at(e) - med)))
+
+        if 2 * k < n:
+            def trimmed_at(shift: float) -> Tuple[float, float]:
+                lo, hi = k + shift, n - k - shift
+                mid = self.middle_sum(v, cum, lo, hi)
+                q_lo = self.quantile_at_rank(v, cum, k + 1 + shift)
+                q_hi = self.quantile_at_rank(v, cum, n - k - shift)
+                trimmed = mid / max(hi - lo, 1.0)
+                winsor = (mid + k * q_lo + k * q_hi) / n
+                return trimmed, winsor
+
+            t0, w0 = trimmed_at(0)
+            shifted = [trimmed_at(-min(e, k)), trimmed_at(min(e, k))]
+            t_err = max(abs(t - t0) for t, _ in shifted) + self.sum_err / (n - 2 * k)
+            w_err = max(abs(w - w0) for _, w in shifted) + self.sum_err / n
+            out["Trimmed"] = (t0, t_err)
+            out["Winsorized"] = (w0, w_err)
+        return out
+
+
+def stream_upload_means(f, column: str, p: float, sketch_k: int = 4096) -> Tuple[MeansAccumulator, QuantileSketch, List[Tuple[int, str]]]:
+    """
+    Constant-memory path: every parsed chunk is folded into a
+    MeansAccumulator and a QuantileSketch and dropped, so the file never
+    exists as one array.
+    """
+    acc = MeansAccumulator(p=p)
+    sketch = QuantileSketch(k=sketch_k)
+    bad: List[Tuple[int, str]] = []
+    for vals, chunk_bad in iter_numeric_upload(f, column):
+        acc.merge(accumulate_means(vals, None, p))
+        sketch.update(vals)
+        bad.extend(chunk_bad)
+    return acc, sketch, bad
+
+
+def compute_means_bundle_np(values: np.ndarray, weights: np.ndarray, trim_pct: float, p: float) -> Dict[str, float]:
+    """
+    Vectorized compute_means_bundle() for large inputs, plus Median,
+    Winsorized and Lehmer (Lp) means. Every sum comes from one blocked,
+    multi-threaded MeansAccumulator pass; median/trim/winsor come from O(n)
+    partitions instead of a full sort.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = x.size
+    if n == 0:
+        return {}
+
+    w = np.asarray(weights, dtype=np.float64)
+    use_w = w.size == n and float(w.sum()) != 0
+    out = accumulate_means_parallel(x, w if use_w else None, p).means()
+    lehmer = out.pop("Lehmer (Lp)", None)
+
+    k = int(n * max(0.0, min(40.0, trim_pct)) / 100.0)
+    if 2 * k < n:
+        mid_sum, lo, hi, median = trimmed_order_stats(x, k)
+        out["Trimmed"] = mid_sum / (n - 2 * k)
+        out["Winsorized"] = (mid_sum + k * lo + k * hi) / n
+        out["Median"] = median
+    if lehmer is not None:
+        out["Lehmer (Lp)"] = lehmer
+
+    return out
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def sample_values(dist: str, n: int, seed: int) -> np.ndarray:
+    # Held as a shared resource (not cache_data) so 10M-value arrays are never pickled or copied per rerun
+    rng = np.random.default_rng(seed)
+    if dist == "Log-normal":
+        x = rng.lognormal(mean=0.0, sigma=1.0, size=n)
+    elif dist == "Uniform (0, 1]":
+        x = 1.0 - rng.random(n)
+    else:
+        x = rng.standard_normal(n)
+    x.setflags(write=False)
+    return x
+
+
+def benchmark_means_engines(sizes: List[int], trim_pct: float, p: float) -> List[Dict[str, str]]:
+    rows: List[Dict[str, str]] = []
+    for n in sizes:
+        x = sample_values("Log-normal", n, 0)
+        as_list = x.tolist()
+        t0 = time.perf_counter()
+        compute_means_bundle(as_list, [], trim_pct, p)
+        t_py = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        compute_means_bundle_np(x, np.empty(0), trim_pct, p)
+        t_np = time.perf_counter() - t0
+        rows.append(
+            {
+                "Values": f"{n:,}",
+                "Pure Python (ms)": f"{t_py * 1000:.1f}",
+                "NumPy (ms)": f"{t_np * 1000:.1f}",
+                "Speedup": f"{t_py / t_np:.0f}x" if t_np > 0 else "",
+            }
+        )
+    return rows
+
+
+def render_means_interactive():
+    st.markdown("## Interactive playground")
+    st.markdown("<div class='muted'>Try your own values and compare mean choices.</div>", unsafe_allow_html=True)
+
+    source = st.radio("Data", ["Type values", "Upload file", "Random sample"], horizontal=True, key="means_source")
+    c1, c2, c3 = st.columns(3)
+    if source == "Type values":
+        with c1:
+            raw_values = st.text_area("Numbers (comma, space, or newline)", value="1, 2, 8", key="means_values")
+        with c2:
+            raw_weights = st.text_input("Weights (optional)", value="", key="means_weights")
+    elif source == "Upload file":
+        with c1:
+            upload = st.file_uploader("CSV, TSV or text file", type=["csv", "tsv", "txt"], key="means_upload")
+        with c2:
+            upload_column = ""
+            if upload is not None and upload.name.lower().endswith((".csv", ".tsv")):
+                try:
+                    upload_column = st.selectbox("Column", upload_columns(upload)[0], key="means_upload_column")
+                except pa.ArrowInvalid as e:
+                    st.error(f"Could not read the file's header: {e}")
+                    return
+            streaming = st.checkbox(
+                "Streaming mode",
+                value=False,
+                key="means_streaming",
+                help="Folds each parsed chunk into running sums and a quantile sketch and discards it, so memory stays flat for any file size. Median, trimmed and winsorized means become approximate, with error bounds.",
+            )
+            sketch_k = 4096
+            if streaming:
+                sketch_k = st.select_slider(
+                    "Sketch size k",
+                    options=[512, 1024, 2048, 4096, 8192, 16384],
+                    value=4096,
+                    key="means_sketch_k",
+                    help="Larger k keeps more samples: rank error is about log2(n/k)/k of n.",
+                )
+    else:
+        with c1:
+            n_sample = st.number_input("Sample size", min_value=10, max_value=10_000_000, value=1_000_000, step=100_000, key="means_n")
+        with c2:
+            dist = st.selectbox("Distribution", ["Log-normal", "Uniform (0, 1]", "Normal(0, 1)"], key="means_dist")
+            sample_seed = st.number_input("Seed", min_value=0, max_value=999999, value=0, step=1, key="means_seed")
+    with c3:
+        trim_pct = st.slider("Trim percent each tail", min_value=0, max_value=40, value=0, key="means_trim")
+
+    p_val = st.slider("Power / Lehmer mean p", min_value=-2.0, max_value=4.0, value=1.0, step=0.1, key="means_p")
+    selected = st.multiselect(
+        "Show on chart",
+        [
+            "Arithmetic", "Geometric", "Harmonic", "RMS", "Contraharmonic", "Weighted", "Trimmed", "Power (Mp)",
+            "Median", "Winsorized", "Lehmer (Lp)",
+        ],
+        default=["Arithmetic", "Geometric", "Harmonic", "RMS", "Power (Mp)"],
+        key="means_show",
+    )
+
+    bounds: Dict[str, float] = {}
+    if source == "Type values":
+        values, bad = parse_numeric_text(raw_values)
+        locs = token_locations(raw_values, [i for i, _ in bad[:8]])
+        report_malformed(bad, {i: f"token {i + 1}, line {ln}, col {col}" for i, (ln, col) in locs.items()})
+        weights, bad_w = parse_numeric_text(raw_weights) if raw_weights.strip() else (np.empty(0), [])
+        report_malformed(bad_w, {i: f"weight {i + 1}" for i, _ in bad_w})
+    elif source == "Upload file":
+        if upload is None:
+            st.info("Upload a file to compute means over it.")
+            return
+        t0 = time.perf_counter()
+        try:
+            if streaming:
+                bundle, sketch, bad = streamed_upload_means(upload.file_id, upload_column, float(p_val), int(sketch_k), upload)
+            else:
+                values, bad = parsed_upload(upload.file_id, upload_column, upload)
+        except (pa.ArrowInvalid, pa.ArrowKeyError) as e:
+            st.error(f"Could not read {upload.name}: {e}")
+            return
+        if streaming:
+            bundle = dict(bundle)
+            lehmer = bundle.pop("Lehmer (Lp)", None)
+            robust = sketch.robust_means(float(trim_pct)) if sketch.n else {}
+            for name, (est, bound) in robust.items():
+                bundle[name] = est
+                bounds[name] = bound
+            if lehmer is not None:
+                bundle["Lehmer (Lp)"] = lehmer
+            n_values = sketch.n
+        where = "line" if upload_column else "value"
+        report_malformed(bad, {i: f"{where} {i if upload_column else i + 1}" for i, _ in bad})
+        weights = np.empty(0)
+    else:
+        values = sample_values(dist, int(n_sample), int(sample_seed))
+        weights = np.empty(0)
+
+    if not (source == "Upload file" and streaming):
+        if not values.size:
+            st.warning("Enter at least one valid numeric value.")
+            return
+        t0 = time.perf_counter()
+        bundle = compute_means_bundle_np(values, weights, float(trim_pct), float(p_val))
+        n_values = values.size
+    elif not n_values:
+        st.warning("The file has no valid numeric values.")
+        return
+    elapsed_ms = (time.perf_counter() - t0) * 1000
     am = bundle.get("Arithmetic")
 
     rows: List[Dict[str, str]] = []
@@ -578,58 +2400,543 @@ def render_means_interactive():
         diff = ""
         if am is not None:
             diff = f"{(val - am):.6f}"
-        rows.append({"Mean": name, "Value": f"{val:.6f}", "Difference from AM": diff})
+        row = {"Mean": name, "Value": f"{val:.6f}", "Difference from AM": diff}
+        if bounds:
+            row["Error bound"] = f"± {bounds[name]:.6f}" if name in bounds else "exact"
+        rows.append(row)
     st.table(rows)
+    st.caption(f"{n_values:,} values, computed in {elapsed_ms:.1f} ms.")
+    if bounds:
+        st.caption(
+            f"Median, trimmed and winsorized values come from a {sketch.retained():,}-sample quantile sketch; "
+            f"every cut point is within {sketch.rank_err:,.0f} ranks of exact, and the bounds are worst-case."
+        )
 
     chart_vals = {k: v for k, v in bundle.items() if k in selected}
     if chart_vals:
         st.bar_chart(chart_vals)
-    st.caption("Notes: GM and HM and Mp with p <= 0 require all values > 0. Contraharmonic requires non-negative values with positive sum.")
+    st.caption(
+        "Notes: GM and HM and Mp with p <= 0 require all values > 0. Contraharmonic requires non-negative values with positive sum. "
+        "Lehmer Lp = sum(x^p) / sum(x^(p-1)) requires all values > 0. Winsorized clamps the same tails that Trimmed drops."
+    )
 
+    with st.expander("Benchmark: NumPy engine vs pure Python"):
+        st.markdown(
+            "<div class='tiny'>Times the original list-based compute_means_bundle() against the vectorized engine on log-normal samples.</div>",
+            unsafe_allow_html=True,
+        )
+        if st.button("Run benchmark", key="means_bench"):
+            st.table(benchmark_means_engines([10_000, 100_000, 1_000_000], float(trim_pct), float(p_val)))
+
+
+# Sweep status codes, also used to colour the heatmaps
+GD_CONVERGED, GD_DIVERGED, GD_MAXED = 0, 1, 2
+GD_DIVERGE_AT = 1e9
+GD_SWEEP_BLOCK = 1 << 16
+# Single-run trace limits: steps kept, chart buckets, table rows per page
+GD_TRACE_MAX_STEPS = 1_000_000
+GD_CHART_BUCKETS = 1000
+GD_TABLE_PAGE = 100
+# Viridis-ish anchors for the heatmaps; diverged / unfinished cells get fixed colours
+HEAT_ANCHORS = np.array([[68, 1, 84], [59, 82, 139], [33, 145, 140], [94, 201, 98], [253, 231, 37]], dtype=np.float64)
+HEAT_DIVERGED = np.array([200, 40, 40], dtype=np.uint8)
+HEAT_MAXED = np.array([150, 150, 150], dtype=np.uint8)
+
+
+def gd_sweep_block(
+    coeffs: Tuple[float, float, float, float],
+    x: np.ndarray,
+    a: np.ndarray,
+    max_steps: int,
+    tol: float,
+    round_steps: bool,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Runs the trajectories starting at x with learning rates a, all at once.
+    Same stepping rules as the single run, but every step is one array
+    update over the trajectories still active: converged, diverged and
+    stuck ones are recorded and compacted out, so late steps only touch
+    the slow tail. Returns (steps, status, final x) per trajectory.
+    """
+    a3, a2, a1, _ = coeffs
+    total = x.size
+    steps = np.full(total, max_steps, dtype=np.int32)
+    status = np.full(total, GD_MAXED, dtype=np.int8)
+    final_x = np.empty(total)
+
+    idx = np.arange(total)
+    with np.errstate(over="ignore", invalid="ignore"):
+        for step in range(max_steps + 1):
+            d = (3 * a3 * x + 2 * a2) * x + a1
+            done = np.abs(d) < tol
+            if done.any():
+                steps[idx[done]] = step
+                status[idx[done]] = GD_CONVERGED
+                final_x[idx[done]] = x[done]
+                keep = ~done
+                idx, x, a, d = idx[keep], x[keep], a[keep], d[keep]
+            if step == max_steps or not idx.size:
+                break
+            d *= a
+            x_new = x - d
+            if round_steps:
+                np.round(x_new, 2, out=x_new)
+                # A rounded run that didn't move is stuck there for good
+                stuck = x_new == x
+                if stuck.any():
+                    final_x[idx[stuck]] = x[stuck]
+                    keep = ~stuck
+                    idx, x_new, a = idx[keep], x_new[keep], a[keep]
+            x = x_new
+            blown = ~(np.abs(x) <= GD_DIVERGE_AT)  # also catches NaN
+            if blown.any():
+                steps[idx[blown]] = step + 1
+                status[idx[blown]] = GD_DIVERGED
+                final_x[idx[blown]] = x[blown]
+                keep = ~blown
+                idx, x, a = idx[keep], x[keep], a[keep]
+    final_x[idx] = x
+    return steps, status, final_x
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def gd_sweep(
+    coeffs: Tuple[float, float, float, float],
+    alphas: Tuple[float, ...],
+    x0s: Tuple[float, ...],
+    max_steps: int,
+    tol: float,
+    round_steps: bool,
+) -> Dict[str, np.ndarray]:
+    """
+    One trajectory per (x0, alpha) pair. The grid is swept in blocks small
+    enough that a block's working arrays stay in cache across the ~15
+    array passes of each step. Returns (len(x0s), len(alphas)) grids of
+    steps, final f(x) and status.
+    """
+    a3, a2, a1, a0 = coeffs
+    alpha_grid, x_grid = np.meshgrid(np.asarray(alphas, dtype=np.float64), np.asarray(x0s, dtype=np.float64))
+    x_all = x_grid.ravel()
+    a_all = alpha_grid.ravel()
+    steps = np.empty(x_all.size, dtype=np.int32)
+    status = np.empty(x_all.size, dtype=np.int8)
+    final_x = np.empty(x_all.size)
+    for lo in range(0, x_all.size, GD_SWEEP_BLOCK):
+        hi = lo + GD_SWEEP_BLOCK
+        steps[lo:hi], status[lo:hi], final_x[lo:hi] = gd_sweep_block(
+            coeffs, x_all[lo:hi].copy(), a_all[lo:hi].copy(), max_steps, tol, round_steps
+        )
 
-def render_gradient_descent_interactive():
-    st.markdown("## Interactive playground (1-D, cubic only)")
-    st.markdown("<div class='muted'>Define f(x) = a3x^3 + a2x^2 + a1x + a0 and simulate gradient descent.</div>", unsafe_allow_html=True)
+    with np.errstate(over="ignore", invalid="ignore"):
+        fx = ((a3 * final_x + a2) * final_x + a1) * final_x + a0
+    fx[status == GD_DIVERGED] = np.nan
+    return {
+        "steps": steps.reshape(x_grid.shape),
+        "f": fx.reshape(x_grid.shape),
+        "status": status.reshape(x_grid.shape),
+    }
 
-    a_cols = st.columns(4)
-    a3 = a_cols[0].number_input("a3", value=0.0, step=0.1, key="gd_a3")
-    a2 = a_cols[1].number_input("a2", value=1.0, step=0.1, key="gd_a2")
-    a1 = a_cols[2].number_input("a1", value=0.0, step=0.1, key="gd_a1")
-    a0 = a_cols[3].number_input("a0", value=0.0, step=0.1, key="gd_a0")
 
+def heatmap_image(z: np.ndarray, status: np.ndarray, min_px: int = 420) -> np.ndarray:
+    """
+    Colours a grid for st.image: converged cells on a viridis-like ramp
+    (1st-99th percentile), diverged red, unfinished grey. Row 0 is drawn
+    at the bottom, and small grids are upscaled by pixel repetition so
+    the browser doesn't blur them.
+    """
+    ok = (status == GD_CONVERGED) & np.isfinite(z)
+    rgb = np.empty(z.shape + (3,), dtype=np.uint8)
+    rgb[status == GD_DIVERGED] = HEAT_DIVERGED
+    rgb[(status == GD_MAXED) | ((status == GD_CONVERGED) & ~ok)] = HEAT_MAXED
+    if ok.any():
+        lo, hi = np.percentile(z[ok], [1, 99])
+        t = np.clip((z[ok] - lo) / (hi - lo), 0.0, 1.0) if hi > lo else np.zeros(int(ok.sum()))
+        pos = t * (len(HEAT_ANCHORS) - 1)
+        i = np.minimum(pos.astype(int), len(HEAT_ANCHORS) - 2)
+        frac = (pos - i)[:, None]
+        rgb[ok] = (HEAT_ANCHORS[i] * (1 - frac) + HEAT_ANCHORS[i + 1] * frac).astype(np.uint8)
+    rgb = rgb[::-1]
+    rep = max(1, min_px // max(z.shape))
+    if rep > 1:
+        rgb = rgb.repeat(rep, axis=0).repeat(rep, axis=1)
+    return rgb
+
+
+def render_gd_sweep(coeffs: Tuple[float, float, float, float], tol: float, round_steps: bool):
+    st.markdown("<div class='muted'>Every cell is one full run: learning rate along x, start point along y.</div>", unsafe_allow_html=True)
     c1, c2, c3, c4 = st.columns(4)
-    x0 = c1.number_input("Initial x0", value=2.0, step=0.1, key="gd_x0")
-    alpha = c2.number_input("Learning rate alpha", value=0.2, step=0.01, min_value=0.0001, key="gd_alpha")
-    max_steps = c3.number_input("Max steps", min_value=1, max_value=200, value=20, step=1, key="gd_steps")
-    round_steps = c4.checkbox("Round each step to 2 decimals", value=True, key="gd_round")
-
-    tol = st.number_input("Stop when |f'(x)| < tol", min_value=0.0001, max_value=1.0, value=0.01, step=0.001, key="gd_tol")
+    alpha_lo = c1.number_input("alpha from", value=0.001, min_value=0.0001, step=0.01, format="%.4f", key="gd_sw_alpha_lo")
+    alpha_hi = c2.number_input("alpha to", value=1.0, min_value=0.0001, step=0.1, format="%.4f", key="gd_sw_alpha_hi")
+    x0_lo = c3.number_input("x0 from", value=-5.0, step=0.5, key="gd_sw_x0_lo")
+    x0_hi = c4.number_input("x0 to", value=5.0, step=0.5, key="gd_sw_x0_hi")
+
+    c5, c6, c7 = st.columns(3)
+    grid = c5.select_slider("Grid size", options=[50, 100, 200, 300, 500], value=200, key="gd_sw_grid")
+    max_steps = c6.number_input("Max steps", min_value=1, max_value=2000, value=200, step=50, key="gd_sw_steps")
+    log_alpha = c7.checkbox("Log-spaced alpha", value=True, key="gd_sw_log")
+
+    if alpha_hi <= alpha_lo or x0_hi <= x0_lo:
+        st.warning("Each range needs its upper end above its lower end.")
+        return
 
-    def f(x: float) -> float:
-        return a3 * x * x * x + a2 * x * x + a1 * x + a0
+    n = int(grid)
+    if log_alpha:
+        alphas = np.geomspace(float(alpha_lo), float(alpha_hi), n)
+    else:
+        alphas = np.linspace(float(alpha_lo), float(alpha_hi), n)
+    x0s = np.linspace(float(x0_lo), float(x0_hi), n)
+
+    t0 = time.perf_counter()
+    out = gd_sweep(coeffs, tuple(alphas.tolist()), tuple(x0s.tolist()), int(max_steps), float(tol), bool(round_steps))
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    status = out["status"]
+    total = status.size
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Converged", f"{(status == GD_CONVERGED).sum() / total:.1%}")
+    m2.metric("Diverged", f"{(status == GD_DIVERGED).sum() / total:.1%}")
+    m3.metric("Stalled / max steps", f"{(status == GD_MAXED).sum() / total:.1%}")
+
+    h1, h2 = st.columns(2)
+    with h1:
+        st.markdown("**Steps to converge**")
+        st.image(heatmap_image(out["steps"].astype(np.float64), status), use_container_width=True)
+    with h2:
+        st.markdown("**Final f(x)**")
+        st.image(heatmap_image(out["f"], status), use_container_width=True)
+
+    conv = status == GD_CONVERGED
+    if conv.any():
+        st.caption(
+            f"Steps {out['steps'][conv].min()}–{out['steps'][conv].max()}, "
+            f"final f(x) {np.nanmin(out['f'][conv]):.4g}–{np.nanmax(out['f'][conv]):.4g} over converged runs "
+            "(purple = low, yellow = high). Red: diverged. Grey: stalled or hit max steps."
+        )
+    st.caption(
+        f"alpha {alpha_lo:g} → {alpha_hi:g} left to right{' (log scale)' if log_alpha else ''}, "
+        f"x0 {x0_lo:g} → {x0_hi:g} bottom to top. {total:,} runs in {elapsed_ms:.0f} ms."
+    )
 
-    def df(x: float) -> float:
-        return 3 * a3 * x * x + 2 * a2 * x + a1
 
-    x = float(x0)
-    rows = []
+@st.cache_resource(show_spinner="Running gradient descent...", max_entries=4)
+def gd_trace(
+    coeffs: Tuple[float, float, float, float],
+    x0: float,
+    alpha: float,
+    max_steps: int,
+    tol: float,
+    round_steps: bool,
+) -> Dict[str, Any]:
+    """
+    Single run, recorded into growable float arrays instead of row dicts.
+    Only x is stored inside the (inherently sequential) loop; f(x) and
+    f'(x) are recomputed over the whole trace afterwards with the same
+    expressions, so they match the per-step values exactly.
+    The next x depends only on x, so once a value repeats the run is
+    periodic from there on: Brent's cycle check (compare against an
+    anchor that moves at powers of two) spots it, and the rest of the
+    trace up to max_steps is filled by tiling the cycle instead of
+    stepping. Stuck rounded runs and exact 2-cycles end in a few steps.
+    """
+    a3, a2, a1, a0 = coeffs
+    xs = np.empty(min(max_steps + 1, 1 << 16))
+    x = x0
+    n = 0
     diverged = False
-    for step in range(int(max_steps) + 1):
-        fx = f(x)
-        dfx = df(x)
-        rows.append({"Step": step, "x": round(x, 6), "f(x)": round(fx, 6), "f'(x)": round(dfx, 6)})
-        if abs(dfx) < float(tol):
+    anchor, anchor_x, power = 0, x0, 1
+    for step in range(max_steps + 1):
+        if n == xs.size:
+            xs = np.concatenate([xs, np.empty(min(xs.size, max_steps + 1 - xs.size))])
+        xs[n] = x
+        n += 1
+        dfx = 3 * a3 * x * x + 2 * a2 * x + a1
+        if abs(dfx) < tol:
             break
-        x = x - float(alpha) * dfx
+        x = x - alpha * dfx
         if round_steps:
             x = round(x, 2)
-        if abs(x) > 1e9:
+        if not abs(x) <= GD_DIVERGE_AT:
             diverged = True
             break
+        if x == anchor_x:
+            # xs[anchor:n] repeats forever; none of it converged or diverged
+            xs = np.concatenate([xs[:n], np.resize(xs[anchor:n], max_steps + 1 - n)])
+            n = xs.size
+            break
+        if n - anchor == power:
+            anchor, anchor_x, power = n, x, power * 2
+    xs = xs[:n].copy()
+    with np.errstate(over="ignore", invalid="ignore"):
+        return {
+            "x": xs,
+            "f": a3 * xs * xs * xs + a2 * xs * xs + a1 * xs + a0,
+            "df": 3 * a3 * xs * xs + 2 * a2 * xs + a1,
+            "diverged": diverged,
+        }
+
+
+def minmax_decimate(series: List[np.ndarray], buckets: int) -> np.ndarray:
+    """
+    Indices to plot so that each of `buckets` equal slices keeps its min and
+    max for every series (plus the endpoints). Peaks and oscillations stay
+    visible, and the payload is bounded by 2 * len(series) * buckets points.
+    """
+    n = series[0].size
+    if n <= 2 * buckets:
+        return np.arange(n)
+    width = math.ceil(n / buckets)
+    m = math.ceil(n / width)
+    offsets = np.arange(m) * width
+    picks = [np.array([0, n - 1])]
+    for y in series:
+        # Pad the tail bucket with its last value so the reshape is exact
+        padded = np.concatenate([y, np.full(m * width - n, y[-1])]).reshape(m, width)
+        nan = np.isnan(padded)
+        picks.append(offsets + np.argmin(np.where(nan, np.inf, padded), axis=1))
+        picks.append(offsets + np.argmax(np.where(nan, -np.inf, padded), axis=1))
+    return np.unique(np.minimum(np.concatenate(picks), n - 1))
+
+
+# 2-D cost surface: f(x, y) = a x^2 + b y^2 + c xy + d x + e y + s sin(x) cos(y).
+# f is linear in (a..s), so tiles cache the coefficient-free basis terms and a
+# coefficient change is just a weighted sum over cached tiles.
+SURFACE_TILE = 64
+SURFACE_TILES = 8  # per side of the view, so the grid is 512 x 512
+SURFACE_LEVELS = 14
+SURFACE_PATH_COLOURS = {
+    "Gradient descent": np.array([255, 255, 255], dtype=np.uint8),
+    "Momentum": np.array([255, 140, 0], dtype=np.uint8),
+    "Adam": np.array([235, 40, 120], dtype=np.uint8),
+}
+
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def surface_basis_tile(h: float, ti: int, tj: int) -> np.ndarray:
+    """(6, T, T) basis terms for the tile whose first sample is at (ti*T*h, tj*T*h); rows run along y."""
+    xs = (ti * SURFACE_TILE + np.arange(SURFACE_TILE)) * h
+    ys = (tj * SURFACE_TILE + np.arange(SURFACE_TILE)) * h
+    X = np.broadcast_to(xs, (SURFACE_TILE, SURFACE_TILE))
+    Y = np.broadcast_to(ys[:, None], (SURFACE_TILE, SURFACE_TILE))
+    basis = np.stack([X * X, Y * Y, X * Y, X, Y, np.outer(np.cos(ys), np.sin(xs))])
+    basis.setflags(write=False)
+    return basis
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def surface_grid(coeffs: Tuple[float, ...], h: float, ti0: int, tj0: int) -> np.ndarray:
+    """The view's cost grid for one coefficient set, assembled from cached basis tiles."""
+    w = np.asarray(coeffs, dtype=np.float64)
+    size = SURFACE_TILE * SURFACE_TILES
+    Z = np.empty((size, size))
+    for j in range(SURFACE_TILES):
+        for i in range(SURFACE_TILES):
+            tile = surface_basis_tile(h, ti0 + i, tj0 + j)
+            Z[j * SURFACE_TILE : (j + 1) * SURFACE_TILE, i * SURFACE_TILE : (i + 1) * SURFACE_TILE] = np.tensordot(w, tile, axes=1)
+    Z.setflags(write=False)
+    return Z
+
+
+def surface_grad(coeffs: Tuple[float, ...], p: np.ndarray) -> np.ndarray:
+    a, b, c, d, e, s = coeffs
+    x, y = p
+    return np.array([
+        2 * a * x + c * y + d + s * math.cos(x) * math.cos(y),
+        2 * b * y + c * x + e - s * math.sin(x) * math.sin(y),
+    ])
+
+
+def run_optimizer(kind: str, coeffs: Tuple[float, ...], start: Tuple[float, float], lr: float, steps: int, beta: float = 0.9) -> np.ndarray:
+    """Path of plain GD, heavy-ball momentum or Adam from start; stops on a flat gradient or divergence."""
+    p = np.array(start, dtype=np.float64)
+    v = np.zeros(2)
+    m2 = np.zeros(2)
+    path = np.empty((steps + 1, 2))
+    path[0] = p
+    n = 1
+    for t in range(1, steps + 1):
+        g = surface_grad(coeffs, p)
+        if not np.all(np.isfinite(g)) or np.hypot(*g) < 1e-6:
+            break
+        if kind == "Momentum":
+            v = beta * v + g
+            p = p - lr * v
+        elif kind == "Adam":
+            v = beta * v + (1 - beta) * g
+            m2 = 0.999 * m2 + 0.001 * g * g
+            p = p - lr * (v / (1 - beta ** t)) / (np.sqrt(m2 / (1 - 0.999 ** t)) + 1e-8)
+        else:
+            p = p - lr * g
+        path[n] = p
+        n += 1
+        if not np.all(np.abs(p) < 1e6):
+            break
+    return path[:n]
+
+
+def contour_image(Z: np.ndarray, origin: Tuple[float, float], h: float, paths: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Filled contour bands with dark isolines, plus each path drawn as a
+    2-px polyline in its colour. Band limits are the 1st-99th percentile
+    on a square-root scale, which keeps bowls readable. Row 0 (lowest y)
+    ends up at the bottom.
+    """
+    lo, hi = np.percentile(Z, [1, 99])
+    t = np.sqrt(np.clip((Z - lo) / (hi - lo), 0.0, 1.0)) if hi > lo else np.zeros_like(Z)
+    band = np.minimum((t * SURFACE_LEVELS).astype(int), SURFACE_LEVELS - 1)
+    pos = (band + 0.5) / SURFACE_LEVELS * (len(HEAT_ANCHORS) - 1)
+    i = np.minimum(pos.astype(int), len(HEAT_ANCHORS) - 2)
+    frac = (pos - i)[..., None]
+    rgb = HEAT_ANCHORS[i] * (1 - frac) + HEAT_ANCHORS[i + 1] * frac
+    edge = np.zeros(Z.shape, dtype=bool)
+    edge[:, 1:] |= band[:, 1:] != band[:, :-1]
+    edge[1:, :] |= band[1:, :] != band[:-1, :]
+    rgb[edge] *= 0.45
+    rgb = rgb.astype(np.uint8)
+
+    rows, cols = Z.shape
+    for name, path in paths.items():
+        colour = SURFACE_PATH_COLOURS[name]
+        pix = (path - np.asarray(origin)) / h  # (col, row) in pixels
+        pts = [pix[:1]]
+        for p0, p1 in zip(pix[:-1], pix[1:]):
+            seg = min(int(np.abs(p1 - p0).max()) + 1, 4 * rows)
+            pts.append(p0 + (p1 - p0) * np.linspace(0, 1, seg + 1)[1:, None])
+        pts = np.rint(np.concatenate(pts)).astype(np.int64)
+        for dr, dc in ((0, 0), (0, 1), (1, 0), (1, 1)):
+            r, c = pts[:, 1] + dr, pts[:, 0] + dc
+            ok = (r >= 0) & (r < rows) & (c >= 0) & (c < cols)
+            rgb[r[ok], c[ok]] = colour
+        r0, c0 = np.rint(pix[0, 1]).astype(int), np.rint(pix[0, 0]).astype(int)
+        rgb[max(r0 - 4, 0) : max(r0 + 5, 0), max(c0 - 4, 0) : max(c0 + 5, 0)] = colour
+    return rgb[::-1]
+
+
+def render_gd_surface():
+    st.markdown(
+        "<div class='muted'>f(x, y) = a x² + b y² + c xy + d x + e y + s·sin(x)·cos(y). "
+        "Drag the coefficients: the grid is re-weighted from cached tiles, not recomputed.</div>",
+        unsafe_allow_html=True,
+    )
+    cols = st.columns(6)
+    coeffs = (
+        cols[0].slider("a", -2.0, 2.0, 1.0, 0.05, key="gd2_a"),
+        cols[1].slider("b", -2.0, 2.0, 0.3, 0.05, key="gd2_b"),
+        cols[2].slider("c", -2.0, 2.0, 0.4, 0.05, key="gd2_c"),
+        cols[3].slider("d", -5.0, 5.0, 0.0, 0.1, key="gd2_d"),
+        cols[4].slider("e", -5.0, 5.0, 0.0, 0.1, key="gd2_e"),
+        cols[5].slider("s (ripple)", 0.0, 5.0, 1.5, 0.1, key="gd2_s"),
+    )
+
+    v1, v2, v3 = st.columns(3)
+    half = v1.select_slider("View half-width", options=[1.0, 2.0, 4.0, 8.0, 16.0], value=4.0, key="gd2_half")
+    cx = v2.number_input("View centre x", value=0.0, step=half / 2, key="gd2_cx")
+    cy = v3.number_input("View centre y", value=0.0, step=half / 2, key="gd2_cy")
+
+    o1, o2, o3, o4, o5 = st.columns(5)
+    sx = o1.number_input("Start x", value=-3.0, step=0.25, key="gd2_x0")
+    sy = o2.number_input("Start y", value=3.0, step=0.25, key="gd2_y0")
+    lr = o3.number_input("Learning rate", value=0.05, min_value=0.0001, step=0.01, format="%.4f", key="gd2_lr")
+    steps = o4.number_input("Steps", min_value=1, max_value=5000, value=200, step=50, key="gd2_steps")
+    beta = o5.number_input("Momentum / Adam beta", min_value=0.0, max_value=0.999, value=0.9, step=0.05, key="gd2_beta")
+    kinds = st.multiselect("Optimizers", list(SURFACE_PATH_COLOURS), default=list(SURFACE_PATH_COLOURS), key="gd2_opts")
+
+    # Snap the view to the tile lattice so panning reuses tiles
+    h = 2 * float(half) / (SURFACE_TILE * SURFACE_TILES)
+    tile_w = SURFACE_TILE * h
+    ti0 = int(round((float(cx) - float(half)) / tile_w))
+    tj0 = int(round((float(cy) - float(half)) / tile_w))
+    origin = (ti0 * tile_w, tj0 * tile_w)
+
+    t0 = time.perf_counter()
+    Z = surface_grid(tuple(float(c) for c in coeffs), h, ti0, tj0)
+    grid_ms = (time.perf_counter() - t0) * 1000
+
+    paths = {k: run_optimizer(k, coeffs, (float(sx), float(sy)), float(lr), int(steps), float(beta)) for k in kinds}
+    st.image(contour_image(Z, origin, h, paths), use_container_width=True)
+
+    span = SURFACE_TILE * SURFACE_TILES * h
+    legend = " ".join(
+        f"<span style='color: rgb{tuple(int(v) for v in SURFACE_PATH_COLOURS[k])}; text-shadow: 0 0 2px #000'>■</span> {k}" for k in kinds
+    )
+    st.markdown(f"<div class='tiny'>{legend}</div>", unsafe_allow_html=True)
+    st.caption(
+        f"x {origin[0]:g} → {origin[0] + span:g}, y {origin[1]:g} → {origin[1] + span:g}. "
+        f"{Z.size:,}-point grid ready in {grid_ms:.1f} ms ({SURFACE_TILES ** 2} tiles of {SURFACE_TILE}×{SURFACE_TILE})."
+    )
+
+    if paths:
+        a, b, c, d, e, s_ = coeffs
+        rows = []
+        for k, path in paths.items():
+            x, y = path[-1]
+            fx = a * x * x + b * y * y + c * x * y + d * x + e * y + s_ * math.sin(x) * math.cos(y)
+            rows.append({"Optimizer": k, "Steps": len(path) - 1, "Final x": f"{x:.4f}", "Final y": f"{y:.4f}", "f(x, y)": f"{fx:.6g}"})
+        st.table(rows)
+
+
+def render_gradient_descent_interactive():
+    st.markdown("## Interactive playground (1-D, cubic only)")
+    st.markdown("<div class='muted'>Define f(x) = a3x^3 + a2x^2 + a1x + a0 and simulate gradient descent.</div>", unsafe_allow_html=True)
+
+    mode = st.radio("Mode", ["Single run", "Parameter sweep", "2-D surface"], horizontal=True, key="gd_mode")
+    if mode == "2-D surface":
+        render_gd_surface()
+        return
+
+    a_cols = st.columns(4)
+    a3 = a_cols[0].number_input("a3", value=0.0, step=0.1, key="gd_a3")
+    a2 = a_cols[1].number_input("a2", value=1.0, step=0.1, key="gd_a2")
+    a1 = a_cols[2].number_input("a1", value=0.0, step=0.1, key="gd_a1")
+    a0 = a_cols[3].number_input("a0", value=0.0, step=0.1, key="gd_a0")
+
+    if mode == "Parameter sweep":
+        c1, c2 = st.columns(2)
+        round_steps = c1.checkbox("Round each step to 2 decimals", value=True, key="gd_round")
+        tol = c2.number_input("Stop when |f'(x)| < tol", min_value=0.0001, max_value=1.0, value=0.01, step=0.001, key="gd_tol")
+        render_gd_sweep((float(a3), float(a2), float(a1), float(a0)), float(tol), bool(round_steps))
+        return
+
+    c1, c2, c3, c4 = st.columns(4)
+    x0 = c1.number_input("Initial x0", value=2.0, step=0.1, key="gd_x0")
+    alpha = c2.number_input("Learning rate alpha", value=0.2, step=0.01, min_value=0.0001, key="gd_alpha")
+    max_steps = c3.number_input("Max steps", min_value=1, max_value=GD_TRACE_MAX_STEPS, value=20, step=1, key="gd_steps")
+    round_steps = c4.checkbox("Round each step to 2 decimals", value=True, key="gd_round")
 
-    st.dataframe(rows, use_container_width=True)
-    st.line_chart({"f(x)": [r["f(x)"] for r in rows], "f'(x)": [r["f'(x)"] for r in rows]})
-    if diverged:
+    tol = st.number_input("Stop when |f'(x)| < tol", min_value=0.0001, max_value=1.0, value=0.01, step=0.001, key="gd_tol")
+
+    t0 = time.perf_counter()
+    trace = gd_trace((float(a3), float(a2), float(a1), float(a0)), float(x0), float(alpha), int(max_steps), float(tol), bool(round_steps))
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    n = trace["x"].size
+
+    n_pages = max(1, math.ceil(n / GD_TABLE_PAGE))
+    if n_pages > 1:
+        p1, p2 = st.columns([1, 3])
+        page = p1.number_input("Table page", min_value=1, max_value=n_pages, value=1, step=1, key="gd_page")
+        lo = (int(page) - 1) * GD_TABLE_PAGE
+        p2.markdown(
+            f"<div class='tiny'>Steps {lo:,}–{min(lo + GD_TABLE_PAGE, n) - 1:,} of {n - 1:,} (page {int(page)} of {n_pages:,}).</div>",
+            unsafe_allow_html=True,
+        )
+    else:
+        lo = 0
+    hi = min(lo + GD_TABLE_PAGE, n)
+    st.dataframe(
+        {
+            "Step": np.arange(lo, hi),
+            "x": np.round(trace["x"][lo:hi], 6),
+            "f(x)": np.round(trace["f"][lo:hi], 6),
+            "f'(x)": np.round(trace["df"][lo:hi], 6),
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    keep = minmax_decimate([trace["f"], trace["df"]], GD_CHART_BUCKETS)
+    st.line_chart({"Step": keep, "f(x)": trace["f"][keep], "f'(x)": trace["df"][keep]}, x="Step")
+    if keep.size < n:
+        st.caption(f"{n:,} steps in {elapsed_ms:.0f} ms; chart shows {keep.size:,} points (min/max per bucket, so spikes survive).")
+    if trace["diverged"]:
         st.warning("The run diverged. Try a smaller learning rate.")
 
 
@@ -642,515 +2949,2136 @@ def compute_oee(planned_time_sec: int, downtime_sec: int, total_count: int, good
     performance = (total_count * ideal_cycle_time_sec) / run_time
     quality = good_count / total_count
 
-    availability = max(0.0, min(1.0, availability))
-    performance = max(0.0, min(1.0, performance))
-    quality = max(0.0, min(1.0, quality))
+    availability = max(0.0, min(1.0, availability))
+    performance = max(0.0, min(1.0, performance))
+    quality = max(0.0, min(1.0, quality))
+
+    oee = availability * performance * quality
+    return {"availability": availability, "performance": performance, "quality": quality, "oee": oee}
+
+
+# Shift-log schema for the fleet view; times in seconds, counts in parts
+OEE_SHIFT_COLUMNS = ["machine", "line", "date", "planned_time_sec", "downtime_sec", "total_count", "good_count", "ideal_cycle_time_sec"]
+OEE_NUMERIC_COLUMNS = OEE_SHIFT_COLUMNS[3:]
+OEE_ROLLUPS = {
+    "Machine": ["machine", "line"],
+    "Line": ["line"],
+    "Day": ["date"],
+    "Week": ["week"],
+    "Line x week": ["line", "week"],
+}
+OEE_LOSSES = {
+    "Availability (downtime)": "downtime_time",
+    "Performance (speed loss)": "speed_loss_time",
+    "Quality (scrap)": "scrap_time",
+}
+
+
+def read_shift_log(f) -> pa.Table:
+    """Reads the OEE_SHIFT_COLUMNS of an uploaded CSV or Parquet shift log; raises ValueError naming missing columns."""
+    f.seek(0)
+    if f.name.lower().endswith(".parquet"):
+        names = pq.ParquetFile(f).schema_arrow.names
+        missing = [c for c in OEE_SHIFT_COLUMNS if c not in names]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+        f.seek(0)
+        table = pq.read_table(f, columns=OEE_SHIFT_COLUMNS)
+    else:
+        names, _ = upload_columns(f)
+        missing = [c for c in OEE_SHIFT_COLUMNS if c not in names]
+        if missing:
+            padded = " (header names must not have spaces around them)" if any(c in [n.strip() for n in names] for c in missing) else ""
+            raise ValueError(f"Missing column(s): {', '.join(missing)}{padded}")
+        convert = pacsv.ConvertOptions(
+            include_columns=OEE_SHIFT_COLUMNS,
+            column_types={"machine": pa.string(), "line": pa.string(), "date": pa.date32()},
+        )
+        table = pacsv.read_csv(f, convert_options=convert)
+    return table.cast(
+        pa.schema(
+            [("machine", pa.string()), ("line", pa.string()), ("date", pa.date32())]
+            + [(c, pa.float64()) for c in OEE_NUMERIC_COLUMNS]
+        )
+    )
+
+
+def shift_facts(table: pa.Table) -> Tuple[pa.Table, np.ndarray]:
+    """
+    Per-row metrics plus an additive fact table for roll-ups. Invalid rows
+    (compute_oee would return zeros) are dropped from the facts; ratios are
+    never averaged, they are rebuilt from summed times in oee_rollup().
+    """
+    col = {c: table.column(c).to_numpy(zero_copy_only=False) for c in OEE_NUMERIC_COLUMNS}
+    rows = compute_oee_batch(col["planned_time_sec"], col["downtime_sec"], col["total_count"], col["good_count"], col["ideal_cycle_time_sec"])
+    valid = rows["valid"]
+    keep = {c: v[valid] for c, v in col.items()}
+    run = keep["planned_time_sec"] - keep["downtime_sec"]
+    ideal = keep["total_count"] * keep["ideal_cycle_time_sec"]
+    good_time = keep["good_count"] * keep["ideal_cycle_time_sec"]
+    mask = pa.array(valid)
+    keys = {}
+    for k in ("machine", "line"):
+        c = table.column(k).filter(mask)
+        keys[k] = c if pa.types.is_dictionary(c.type) else c.dictionary_encode()
+    date = table.column("date").filter(mask)
+    facts = pa.table(
+        {
+            "machine": keys["machine"],
+            "line": keys["line"],
+            "date": date,
+            "week": pc.floor_temporal(date, unit="week", week_starts_monday=True),
+            "planned_time": keep["planned_time_sec"],
+            "run_time": run,
+            "ideal_time": ideal,
+            "total_count": keep["total_count"],
+            "good_count": keep["good_count"],
+            "downtime_time": keep["planned_time_sec"] - run,
+            "speed_loss_time": np.maximum(run - ideal, 0.0),
+            "scrap_time": np.maximum(ideal - good_time, 0.0),
+        }
+    )
+    return facts, rows["oee"].astype(np.float32)
+
+
+def oee_ratios(planned: np.ndarray, run: np.ndarray, ideal: np.ndarray, total: np.ndarray, good: np.ndarray) -> Dict[str, np.ndarray]:
+    """OEE components from summed times and counts, clipped to [0, 1] like the per-shift figures."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        availability = np.clip(np.nan_to_num(run / planned), 0.0, 1.0)
+        performance = np.clip(np.nan_to_num(ideal / run), 0.0, 1.0)
+        quality = np.clip(np.nan_to_num(good / total), 0.0, 1.0)
+    return {"availability": availability, "performance": performance, "quality": quality, "oee": availability * performance * quality}
+
+
+def oee_rollup(facts: pa.Table, keys: List[str]) -> pa.Table:
+    """Sums the fact columns per group (Arrow hash aggregation) and rebuilds A/P/Q/OEE from the sums; worst OEE first."""
+    sums = ["planned_time", "run_time", "ideal_time", "total_count", "good_count"] + list(OEE_LOSSES.values())
+    agg = facts.group_by(keys).aggregate([(c, "sum") for c in sums] + [("planned_time", "count")])
+    col = {c: agg.column(f"{c}_sum").to_numpy() for c in sums}
+    r = oee_ratios(col["planned_time"], col["run_time"], col["ideal_time"], col["total_count"], col["good_count"])
+    out = pa.table(
+        {k: agg.column(k).cast(pa.string()) if pa.types.is_dictionary(agg.column(k).type) else agg.column(k) for k in keys}
+        | {
+            "shifts": agg.column("planned_time_count"),
+            "availability": r["availability"],
+            "performance": r["performance"],
+            "quality": r["quality"],
+            "oee": r["oee"],
+            "planned_h": col["planned_time"] / 3600,
+        }
+        | {c: col[c] / 3600 for c in OEE_LOSSES.values()}
+    )
+    return out.sort_by([("oee", "ascending")])
+
+
+def loss_pareto(rollup: pa.Table, keys: List[str], top: int = 20) -> List[Dict[str, Any]]:
+    """Every (group, loss category) pair ranked by lost hours, with the cumulative share of all losses."""
+    labels = [" / ".join(str(v) for v in vals) for vals in zip(*(rollup.column(k).to_pylist() for k in keys))]
+    hours = np.concatenate([rollup.column(c).to_numpy() for c in OEE_LOSSES.values()])
+    cats = np.repeat(list(OEE_LOSSES), rollup.num_rows)
+    total = hours.sum()
+    n = min(top, hours.size)
+    order = np.argsort(-hours, kind="stable")[:n]
+    cum = np.cumsum(hours[order]) / total if total > 0 else np.zeros(n)
+    return [
+        {"Where": labels[i % rollup.num_rows], "Loss": str(cats[i]), "Hours lost": round(float(hours[i]), 1), "Cumulative share": f"{c:.1%}"}
+        for i, c in zip(order, cum)
+    ]
+
+
+@st.cache_resource(show_spinner="Generating shift log...", max_entries=2)
+def sample_shift_log(n_rows: int, seed: int) -> pa.Table:
+    """Synthetic fleet: 200 machines on 20 lines over a year, each machine with its own downtime, speed and scrap habits."""
+    rng = np.random.default_rng(seed)
+    n_machines, n_lines = 200, 20
+    m = rng.integers(0, n_machines, n_rows)
+    down_rate = rng.gamma(2.0, 0.05, n_machines)
+    speed = rng.uniform(0.72, 0.97, n_machines)
+    scrap_rate = rng.gamma(1.5, 0.02, n_machines)
+    ideal_cycle = rng.choice([18.0, 20.0, 22.0, 24.0, 26.0], n_machines)
+
+    planned = rng.choice([420.0, 450.0, 480.0], n_rows) * 60
+    downtime = np.minimum(planned * rng.gamma(2.0, down_rate[m] / 2), planned * 0.9).round()
+    total = np.floor((planned - downtime) / ideal_cycle[m] * speed[m] * rng.uniform(0.9, 1.05, n_rows))
+    good = total - rng.binomial(total.astype(np.int64), np.minimum(scrap_rate[m], 0.5))
+    days = np.datetime64("2025-01-01") + rng.integers(0, 365, n_rows).astype("timedelta64[D]")
+    machines = pa.array([f"M{i:03d}" for i in range(n_machines)])
+    lines = pa.array([f"L{i:02d}" for i in range(n_lines)])
+    return pa.table(
+        {
+            "machine": pa.DictionaryArray.from_arrays(pa.array(m.astype(np.int32)), machines),
+            "line": pa.DictionaryArray.from_arrays(pa.array((m % n_lines).astype(np.int32)), lines),
+            "date": pa.array(days),
+            "planned_time_sec": planned,
+            "downtime_sec": downtime,
+            "total_count": total,
+            "good_count": good.astype(np.float64),
+            "ideal_cycle_time_sec": ideal_cycle[m],
+        }
+    )
+
+
+@st.cache_resource(show_spinner="Computing shift metrics...", max_entries=2)
+def fleet_facts(source_key: str, _table: pa.Table) -> Tuple[pa.Table, np.ndarray]:
+    return shift_facts(_table)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def fleet_rollup(source_key: str, by: str, _facts: pa.Table) -> pa.Table:
+    return oee_rollup(_facts, OEE_ROLLUPS[by])
+
+
+# Downtime sources, highest priority first: where intervals overlap, the
+# instant is booked to the first active category. Planned stops reduce
+# planned time instead of counting as downtime.
+DOWNTIME_CATEGORIES = ["planned_maintenance", "breakdown", "changeover", "minor_stop"]
+PLANNED_STOPS = {"planned_maintenance"}
+
+
+@dataclass
+class DowntimeIndex:
+    """
+    Elementary segments inside planned-production windows, sorted by
+    (machine, start), each booked to one class: a downtime category or
+    "run" (the last class). Per-class prefix sums over the segments answer
+    "time in each class for machine m between t1 and t2" with two binary
+    searches, without touching the raw intervals again.
+    """
+
+    machines: List[str]
+    seg_key: np.ndarray
+    seg_start: np.ndarray
+    seg_end: np.ndarray
+    seg_cls: np.ndarray
+    cum: np.ndarray  # (classes, segments + 1)
+    raw_s: np.ndarray  # per machine: summed raw durations, overlaps counted twice
+
+    @property
+    def classes(self) -> List[str]:
+        return DOWNTIME_CATEGORIES + ["run"]
+
+    def totals(self) -> np.ndarray:
+        """(machines, classes) seconds over everything indexed."""
+        out = np.zeros((len(self.machines), len(self.classes)))
+        np.add.at(out, (self.seg_key, self.seg_cls), self.seg_end - self.seg_start)
+        return out
+
+    def query(self, machine: str, t1: float, t2: float) -> Dict[str, float]:
+        k = self.machines.index(machine)
+        lo, hi = np.searchsorted(self.seg_key, [k, k + 1])
+        starts, ends = self.seg_start[lo:hi], self.seg_end[lo:hi]
+        # Segments fully inside [t1, t2) come from the prefix sums; the two edge segments are clipped
+        i = lo + int(np.searchsorted(ends, t1, side="right"))
+        j = lo + int(np.searchsorted(starts, t2, side="left"))
+        out = dict.fromkeys(self.classes, 0.0)
+        if i >= j:
+            return out
+        for c, name in enumerate(self.classes):
+            out[name] = float(self.cum[c, j] - self.cum[c, i])
+        for e in {i, j - 1}:
+            name = self.classes[self.seg_cls[e]]
+            out[name] -= max(0.0, t1 - self.seg_start[e]) + max(0.0, self.seg_end[e] - t2)
+        return out
+
+
+def build_downtime_index(
+    machines: List[str],
+    key: np.ndarray,
+    start: np.ndarray,
+    end: np.ndarray,
+    cat: np.ndarray,
+    win_key: np.ndarray,
+    win_start: np.ndarray,
+    win_end: np.ndarray,
+) -> DowntimeIndex:
+    """
+    Merges and classifies downtime intervals (machine code, start, end,
+    DOWNTIME_CATEGORIES code) against planned-production windows in one
+    O(n log n) sweep. Every start is a +1 and every end a -1 event for its
+    category (windows are one more category). After sorting by (machine,
+    time), a cumulative sum per category is that category's coverage; a
+    machine's events sum to zero, so coverage never leaks into the next
+    machine. Between consecutive events coverage is constant, and each
+    such segment inside a window goes to the first active category.
+    """
+    n_cat = len(DOWNTIME_CATEGORIES)
+    ok = end > start
+    wok = win_end > win_start
+    k_all = np.concatenate([key[ok], key[ok], win_key[wok], win_key[wok]])
+    t_all = np.concatenate([start[ok], end[ok], win_start[wok], win_end[wok]])
+    c_all = np.concatenate([cat[ok], cat[ok], np.full(2 * int(wok.sum()), n_cat)]).astype(np.int64)
+    n_iv, n_w = int(ok.sum()), int(wok.sum())
+    d_all = np.concatenate([np.ones(n_iv), -np.ones(n_iv), np.ones(n_w), -np.ones(n_w)]).astype(np.int32)
+
+    # Time first (ties don't matter: zero-length segments are dropped), then a
+    # stable sort by machine, which is a radix sort when codes fit in 16 bits
+    order = np.argsort(t_all)
+    k_sorted = k_all[order].astype(np.uint16 if len(machines) <= 1 << 16 else np.int64)
+    order = order[np.argsort(k_sorted, kind="stable")]
+    k_all, t_all, c_all, d_all = k_all[order], t_all[order], c_all[order], d_all[order]
+    cover = np.zeros((n_cat + 1, t_all.size), dtype=np.int32)
+    for c in range(n_cat + 1):
+        cover[c] = np.cumsum(np.where(c_all == c, d_all, 0))
+
+    seg = (k_all[:-1] == k_all[1:]) & (t_all[1:] > t_all[:-1]) & (cover[n_cat, :-1] > 0)
+    idx = np.flatnonzero(seg)
+    active = cover[:n_cat, idx] > 0
+    # First active category, or n_cat ("run") when none is
+    cls = np.where(active.any(axis=0), active.argmax(axis=0), n_cat)
+    seg_key, seg_start, seg_end = k_all[idx], t_all[idx], t_all[idx + 1]
+    dur = seg_end - seg_start
+    cum = np.zeros((n_cat + 1, idx.size + 1))
+    for c in range(n_cat + 1):
+        np.cumsum(np.where(cls == c, dur, 0.0), out=cum[c, 1:])
+    raw = np.bincount(key[ok], weights=(end - start)[ok], minlength=len(machines))
+    return DowntimeIndex(machines, seg_key, seg_start, seg_end, cls, cum, raw)
+
+
+def downtime_oee_inputs(index: DowntimeIndex) -> Dict[str, np.ndarray]:
+    """Per-machine planned_time_sec and downtime_sec for compute_oee(), plus the per-category split."""
+    tot = index.totals()
+    window = tot.sum(axis=1)
+    planned_stop = sum(tot[:, DOWNTIME_CATEGORIES.index(c)] for c in PLANNED_STOPS)
+    unplanned = [i for i, c in enumerate(DOWNTIME_CATEGORIES) if c not in PLANNED_STOPS]
+    return {
+        "planned_time_sec": window - planned_stop,
+        "downtime_sec": tot[:, unplanned].sum(axis=1),
+        "by_category": tot,
+    }
+
+
+@st.cache_resource(show_spinner="Building downtime index...", max_entries=2)
+def sample_downtime_index(n_intervals: int, n_machines: int, days: int, seed: int) -> DowntimeIndex:
+    """
+    Synthetic downtime from four independent sources, so intervals overlap
+    and nest freely, against two 8-hour shifts (06:00-22:00) per day.
+    Times are seconds from the start of day 0.
+    """
+    rng = np.random.default_rng(seed)
+    horizon = days * 86400.0
+    cat = rng.choice(len(DOWNTIME_CATEGORIES), n_intervals, p=[0.02, 0.18, 0.2, 0.6])
+    mean_s = np.array([3 * 3600.0, 45 * 60.0, 30 * 60.0, 4 * 60.0])
+    key = rng.integers(0, n_machines, n_intervals)
+    start = rng.uniform(0, horizon, n_intervals)
+    end = np.minimum(start + rng.exponential(mean_s[cat]), horizon)
+
+    day = np.arange(days) * 86400.0
+    win_key = np.repeat(np.arange(n_machines), 2 * days)
+    win_start = np.tile(np.concatenate([day + 6 * 3600, day + 14 * 3600]), n_machines)
+    win_end = win_start + 8 * 3600
+    machines = [f"M{i:03d}" for i in range(n_machines)]
+    return build_downtime_index(machines, key, start, end, cat, win_key, win_start, win_end)
+
+
+@st.cache_resource(show_spinner="Reading shift log...", max_entries=2)
+def uploaded_shift_log(file_id: str, _f) -> pa.Table:
+    return read_shift_log(_f)
+
+
+@st.cache_resource(show_spinner=False)
+def process_pool() -> ProcessPoolExecutor:
+    # Shared by the OEE simulator and the Granger runner.
+    # spawn, not fork: the Streamlit server is multi-threaded
+    return ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1), mp_context=multiprocessing.get_context("spawn"))
+
+
+@st.cache_resource(show_spinner="Simulating shifts...", max_entries=8)
+def monte_carlo_oee(scenario: OeeScenario, n_shifts: int, seed: int) -> Dict[str, Any]:
+    """
+    Runs the scenario in SIM_CHUNK-shift chunks across the process pool and
+    merges the per-chunk summaries. Every chunk has its own spawned seed,
+    so the result is the same for a given seed however the chunks are
+    scheduled (or if the pool is unavailable and they run here instead).
+    """
+    plan = chunk_plan(n_shifts, seed)
+    args = ([scenario] * len(plan), [s for s, _ in plan], [n for _, n in plan])
+    try:
+        parts = list(process_pool().map(simulate_chunk, *args))
+        where = "process pool"
+    except (BrokenProcessPool, OSError):
+        process_pool.clear()
+        parts = [simulate_chunk(*a) for a in zip(*args)]
+        where = "in-process"
+    hist = sum(p[0] for p in parts)
+    biggest = sum(p[1] for p in parts)
+    sums = sum(p[2] for p in parts)
+    return {"hist": hist, "biggest": biggest, "means": sums / n_shifts, "chunks": len(plan), "where": where}
+
+
+# Sliding windows for the live view: name -> (span in seconds, ring buckets)
+ROLLING_WINDOWS = {
+    "Last 15 min": (15 * 60, 60),
+    "Last shift (8 h)": (8 * 3600, 96),
+    "Last day": (24 * 3600, 96),
+}
+# Time states; "off" is unplanned time and doesn't count toward availability
+EVENT_STATES = ("run", "down", "off")
+TAIL_MAX_BYTES = 8 << 20  # per poll, so a huge backlog is read over a few refreshes
+# The demo log keeps only what the longest window reads, trimmed this often
+DEMO_LOG_KEEP_S = max(span for span, _ in ROLLING_WINDOWS.values())
+DEMO_LOG_TRIM_EVERY_S = 3600
+
+
+class RollingCounters:
+    """
+    Sums of (planned s, run s, total, good) over the last `span` seconds,
+    kept in a ring of fixed-width time buckets with running totals. Moving
+    forward evicts whole buckets, so each update touches O(1) buckets
+    amortized and memory is fixed at n_buckets per window.
+    """
+
+    def __init__(self, span: float, n_buckets: int):
+        self.width = span / n_buckets
+        self.n = n_buckets
+        self.slots = [[0.0, 0.0, 0.0, 0.0] for _ in range(n_buckets)]
+        self.totals = [0.0, 0.0, 0.0, 0.0]
+        self.head = None  # absolute index of the newest bucket
+
+    def advance(self, t: float):
+        b = int(t // self.width)
+        if self.head is not None and b <= self.head:
+            return
+        first = b - self.n + 1 if self.head is None else max(self.head + 1, b - self.n + 1)
+        for k in range(first, b + 1):
+            slot = self.slots[k % self.n]
+            for i in range(4):
+                self.totals[i] -= slot[i]
+                slot[i] = 0.0
+        self.head = b
+
+    def add(self, t: float, vals: Tuple[float, float, float, float]):
+        self.advance(t)
+        b = int(t // self.width)
+        if b <= self.head - self.n:
+            return  # older than the window
+        slot = self.slots[b % self.n]
+        for i, v in enumerate(vals):
+            slot[i] += v
+            self.totals[i] += v
+
+    def add_interval(self, t0: float, t1: float, state: str):
+        """Spreads the time between t0 and t1 in `state` over the buckets it covers."""
+        if t1 <= t0 or state not in ("run", "down"):
+            self.advance(t1)
+            return
+        self.advance(t1)
+        t0 = max(t0, (self.head - self.n + 1) * self.width)
+        while t0 < t1:
+            edge = min(t1, (int(t0 // self.width) + 1) * self.width)
+            dt = edge - t0
+            self.add(t0, (dt, dt if state == "run" else 0.0, 0.0, 0.0))
+            t0 = edge
+
+
+@dataclass
+class MachineCounters:
+    state: str = "off"
+    since: float = 0.0
+    ideal_cycle_sec: float = 0.0  # 0 = use the view's default
+    windows: Dict[str, RollingCounters] = field(
+        default_factory=lambda: {name: RollingCounters(span, n) for name, (span, n) in ROLLING_WINDOWS.items()}
+    )
+
+    def accrue(self, t: float):
+        t = max(t, self.since)
+        for w in self.windows.values():
+            w.add_interval(self.since, t, self.state)
+        self.since = t
+
+
+def parse_event_time(v: Any) -> float:
+    """Epoch seconds, or an ISO 8601 timestamp."""
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(v).replace("Z", "+00:00")).timestamp()
+
+
+class EventTail:
+    """
+    Follows an append-only JSONL/CSV machine event log from a byte offset,
+    so each poll reads only what was appended since the last one (a file
+    that shrinks or is replaced by a new one is treated as rotated and
+    replayed from the start).
+
+    Events: {"ts", "machine", "type": "state", "state": run|down|off}
+    or {"ts", "machine", "type": "count", "good", "scrap"}; any event may
+    carry "ideal_cycle_sec" for its machine. Event time is the clock, so a
+    replayed log gives the same numbers as a live one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.inode = 0
+        self.offset = 0
+        self.partial = b""
+        self.header: List[str] = []
+        self.machines: Dict[str, MachineCounters] = {}
+        self.clock = 0.0
+        self.events = 0
+        self.bad = 0
+
+    def poll(self) -> int:
+        """Reads newly appended lines; returns how many events were applied."""
+        with self.lock:
+            try:
+                st_ = self.path.stat()
+            except OSError:
+                return 0
+            size = st_.st_size
+            if size < self.offset or (self.inode and st_.st_ino != self.inode):
+                self.reset()
+            self.inode = st_.st_ino
+            if size == self.offset:
+                return 0
+            with open(self.path, "rb") as fh:
+                fh.seek(self.offset)
+                chunk = fh.read(TAIL_MAX_BYTES)
+            self.offset += len(chunk)
+            lines = (self.partial + chunk).split(b"\n")
+            self.partial = lines.pop()
+            before = self.events
+            is_csv = self.path.suffix.lower() == ".csv"
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    if is_csv:
+                        row = next(csv.reader([line.decode("utf-8")]))
+                        if not self.header:
+                            self.header = [c.strip() for c in row]
+                            continue
+                        ev = dict(zip(self.header, row))
+                    else:
+                        ev = json.loads(line)
+                    self.apply(ev)
+                except (ValueError, KeyError, TypeError):
+                    self.bad += 1
+            return self.events - before
+
+    def apply(self, ev: Dict[str, Any]):
+        t = parse_event_time(ev["ts"])
+        name = str(ev["machine"])
+        kind = ev.get("type", "")
+        if kind == "state" and ev.get("state") not in EVENT_STATES:
+            raise ValueError(f"unknown state {ev.get('state')!r}")
+        if kind not in ("state", "count"):
+            raise ValueError(f"unknown event type {kind!r}")
+        m = self.machines.get(name)
+        if m is None:
+            m = self.machines[name] = MachineCounters(since=t)
+        if ev.get("ideal_cycle_sec") not in (None, ""):
+            m.ideal_cycle_sec = float(ev["ideal_cycle_sec"])
+        m.accrue(t)
+        if kind == "state":
+            m.state = ev["state"]
+        else:
+            good = float(ev.get("good") or 0)
+            scrap = float(ev.get("scrap") or 0)
+            for w in m.windows.values():
+                w.add(m.since, (0.0, 0.0, good + scrap, good))
+        self.clock = max(self.clock, t)
+        self.events += 1
+
+    def snapshot(self, window: str, ideal_cycle_sec: float) -> Dict[str, Dict[str, Any]]:
+        """compute_oee() per machine over `window`, with open states accrued up to the log's clock."""
+        out = {}
+        with self.lock:
+            for name, m in self.machines.items():
+                m.accrue(self.clock)
+                planned, run, total, good = m.windows[window].totals
+                ideal = m.ideal_cycle_sec or ideal_cycle_sec
+                oee = compute_oee(
+                    planned_time_sec=planned,
+                    downtime_sec=planned - run,
+                    total_count=round(total),
+                    good_count=round(good),
+                    ideal_cycle_time_sec=ideal,
+                )
+                out[name] = {"state": m.state, "planned_s": planned, "run_s": run, "ideal_s": total * ideal, "total": total, "good": good, **oee}
+        return out
+
+
+@st.cache_resource(show_spinner=False)
+def event_tail(path: str) -> EventTail:
+    return EventTail(Path(path))
+
+
+@st.cache_resource(show_spinner=False)
+def demo_event_feed(path: str) -> Dict[str, Any]:
+    """
+    Writes a synthetic six-machine event log: a day of backfilled history,
+    then live events every second. It pauses once nobody has looked at the
+    live view for ten minutes (the view bumps "seen" on every refresh).
+    Every hour the log is rewritten to hold only the last DEMO_LOG_KEEP_S,
+    led by each machine's state at the cut, so it doesn't grow without bound.
+    """
+    feed = {"seen": time.time()}
+    out = Path(path)
+    rng = random.Random(11)
+    machines = {f"M{i:02d}": {"state": "run", "cycle": rng.choice([18.0, 20.0, 24.0])} for i in range(1, 7)}
+
+    def events_at(t: float, dt: float) -> List[Dict[str, Any]]:
+        evs = []
+        for name, m in machines.items():
+            if rng.random() < dt / 1000:  # a state change every ~17 min
+                m["state"] = rng.choices(["run", "down", "off"], weights=[6, 3, 1])[0]
+                evs.append({"ts": round(t, 3), "machine": name, "type": "state", "state": m["state"]})
+            if m["state"] == "run":
+                expected = dt / m["cycle"] * 0.88  # runs a bit below ideal speed
+                made = int(expected) + (rng.random() < expected % 1)
+                if made:
+                    scrap = sum(rng.random() < 0.04 for _ in range(made))
+                    evs.append({"ts": round(t, 3), "machine": name, "type": "count", "good": made - scrap, "scrap": scrap})
+        return evs
+
+    def write(evs: List[Dict[str, Any]]):
+        with open(out, "a", encoding="utf-8") as fh:
+            fh.write("".join(json.dumps(e) + "\n" for e in evs))
+
+    def trim(now: float):
+        # Replaced atomically (new inode), which EventTail reads as a rotation
+        cutoff = now - DEMO_LOG_KEEP_S
+        states = {n: "run" for n in machines}
+        kept: List[str] = []
+        with open(out, encoding="utf-8") as fh:
+            for line in fh:
+                ev = json.loads(line)
+                if ev["ts"] >= cutoff:
+                    kept.append(line)
+                elif ev["type"] == "state":
+                    states[ev["machine"]] = ev["state"]
+        head = [
+            json.dumps({"ts": round(cutoff, 3), "machine": n, "type": "state", "state": states[n], "ideal_cycle_sec": m["cycle"]}) + "\n"
+            for n, m in machines.items()
+        ]
+        tmp = out.with_name(f".{out.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text("".join(head + kept), encoding="utf-8")
+        os.replace(tmp, out)
+
+    def run():
+        out.parent.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        if out.exists() and out.stat().st_mtime < now - DEMO_LOG_KEEP_S:
+            out.unlink()  # nothing in it is inside any window any more
+        elif out.exists() and out.stat().st_size:
+            trim(now)
+        if not out.exists() or out.stat().st_size == 0:
+            evs = [{"ts": now - 86400, "machine": n, "type": "state", "state": "run", "ideal_cycle_sec": m["cycle"]} for n, m in machines.items()]
+            for k in range(0, 86400, 10):
+                evs.extend(events_at(now - 86400 + k, 10.0))
+            write(evs)
+        next_trim = time.time() + DEMO_LOG_TRIM_EVERY_S
+        while True:
+            time.sleep(1.0)
+            if time.time() - feed["seen"] < 600:
+                write(events_at(time.time(), 1.0))
+            if time.time() >= next_trim:
+                trim(time.time())
+                next_trim += DEMO_LOG_TRIM_EVERY_S
+
+    threading.Thread(target=run, daemon=True, name="oee-demo-feed").start()
+    return feed
+
+
+def render_oee_interactive():
+    st.markdown("## Interactive OEE calculation (click to run)")
+    st.markdown(
+        "<div class='muted'>This demo generates a realistic shift scenario, calculates OEE, and tells you what to fix first based on the biggest loss.</div>",
+        unsafe_allow_html=True,
+    )
+
+    cA, cB = st.columns([1, 1])
+    with cA:
+        seed = st.number_input("Optional seed (repeat the same example)", min_value=0, max_value=999999, value=0, step=1)
+    with cB:
+        st.markdown("<div class='tiny'>Tip: set seed to 0 for fresh random outputs.</div>", unsafe_allow_html=True)
+
+    run = st.button("Run randomized example", key="run_oee_demo")
+
+    with st.expander("Show Python code"):
+        st.code(
+            """def compute_oee(planned_time_sec, downtime_sec, total_count, good_count, ideal_cycle_time_sec):
+    run_time = planned_time_sec - downtime_sec
+    availability = run_time / planned_time_sec
+    performance  = (total_count * ideal_cycle_time_sec) / run_time
+    quality      = good_count / total_count
+    oee = availability * performance * quality
+    return availability, performance, quality, oee
+""",
+            language="python",
+        )
+
+    if not run:
+        st.markdown("<div class='oee-box tiny'>Click the button to generate inputs and see the output metrics + takeaway.</div>", unsafe_allow_html=True)
+        return
+
+    if seed != 0:
+        random.seed(int(seed))
+
+    planned_time_min = random.choice([420, 450, 480])      # 7h, 7.5h, 8h
+    downtime_min = random.randint(15, 90)
+    total_count = random.randint(700, 1600)
+    scrap = random.randint(0, max(1, int(0.12 * total_count)))
+    good_count = max(0, total_count - scrap)
+    ideal_cycle_time_sec = random.choice([18, 20, 22, 24, 26])
+
+    planned_time_sec = planned_time_min * 60
+    downtime_sec = downtime_min * 60
+
+    out = compute_oee(
+        planned_time_sec=planned_time_sec,
+        downtime_sec=downtime_sec,
+        total_count=total_count,
+        good_count=good_count,
+        ideal_cycle_time_sec=ideal_cycle_time_sec,
+    )
+
+    st.markdown("### Inputs")
+    st.write(
+        {
+            "planned_time_min": planned_time_min,
+            "downtime_min": downtime_min,
+            "total_count": total_count,
+            "good_count": good_count,
+            "ideal_cycle_time_sec": ideal_cycle_time_sec,
+        }
+    )
+
+    st.markdown("### Outputs")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Availability", f"{out['availability']*100:.1f}%")
+    c2.metric("Performance", f"{out['performance']*100:.1f}%")
+    c3.metric("Quality", f"{out['quality']*100:.1f}%")
+    c4.metric("OEE", f"{out['oee']*100:.1f}%")
+
+    # Key takeaway generator based on biggest loss
+    losses = {
+        "Availability (downtime, setups, breakdowns)": 1 - out["availability"],
+        "Performance (micro-stops, slow cycles, minor jams)": 1 - out["performance"],
+        "Quality (scrap, rework, startup rejects)": 1 - out["quality"],
+    }
+    worst = max(losses, key=losses.get)
+    worst_loss = losses[worst]
+
+    st.markdown("### Key takeaway")
+    if worst_loss < 0.04:
+        st.success(
+            "This run is fairly balanced. Biggest gains come from tightening measurement, standard work, and small continuous improvements."
+        )
+    else:
+        if "Availability" in worst:
+            st.info(
+                "Availability is the main limiter. Reduce unplanned stops, improve changeovers, and shorten maintenance response time."
+            )
+        elif "Performance" in worst:
+            st.info(
+                "Performance is the main limiter. Hunt micro-stops and speed losses: feeding issues, small jams, slow cycles, and drift from the ideal."
+            )
+        else:
+            st.info(
+                "Quality is the main limiter. Focus on defect root causes, startup stability, process parameters, and catching issues earlier in the line."
+            )
+
+    st.markdown(
+        f"<div class='tiny'>Biggest loss in this run: <b>{worst}</b> (approx. {(worst_loss*100):.1f}% loss)</div>",
+        unsafe_allow_html=True,
+    )
+
+
+def render_oee_monte_carlo():
+    st.markdown("## Monte Carlo: what does a typical month of shifts look like?")
+    st.markdown(
+        "<div class='muted'>Instead of one random shift, draw many from the distributions below and look at the spread.</div>",
+        unsafe_allow_html=True,
+    )
+    c1, c2, c3, c4 = st.columns(4)
+    planned = c1.selectbox("Planned time (min)", [420, 450, 480], index=2, key="oee_mc_planned")
+    down_mean = c2.number_input("Downtime mean (min)", min_value=0.0, max_value=400.0, value=45.0, step=5.0, key="oee_mc_down")
+    down_cv = c3.number_input("Downtime CV", min_value=0.05, max_value=3.0, value=0.6, step=0.05, key="oee_mc_down_cv")
+    ideal = c4.number_input("Ideal cycle (s)", min_value=1.0, max_value=600.0, value=22.0, step=1.0, key="oee_mc_ideal")
+    c5, c6, c7, c8 = st.columns(4)
+    cycle_mean = c5.number_input("Actual cycle mean (s)", min_value=1.0, max_value=600.0, value=25.0, step=0.5, key="oee_mc_cycle")
+    cycle_sd = c6.number_input("Actual cycle SD (s)", min_value=0.0, max_value=100.0, value=2.0, step=0.5, key="oee_mc_cycle_sd")
+    scrap_mean = c7.number_input("Scrap rate mean", min_value=0.0, max_value=0.9, value=0.04, step=0.01, format="%.3f", key="oee_mc_scrap")
+    scrap_k = c8.number_input("Scrap concentration", min_value=1.0, max_value=1000.0, value=40.0, step=5.0, key="oee_mc_scrap_k", help="Higher = shift-to-shift scrap rates stay closer to the mean.")
+    c9, c10 = st.columns(2)
+    n_shifts = c9.select_slider("Shifts", options=[10_000, 100_000, 500_000, 1_000_000, 5_000_000], value=500_000, key="oee_mc_n")
+    seed = c10.number_input("Seed", min_value=0, max_value=2**31 - 1, value=42, step=1, key="oee_mc_seed")
+
+    scenario = OeeScenario(
+        planned_min=float(planned),
+        downtime_mean_min=float(down_mean),
+        downtime_cv=float(down_cv),
+        ideal_cycle_sec=float(ideal),
+        cycle_mean_sec=float(cycle_mean),
+        cycle_sd_sec=float(cycle_sd),
+        scrap_mean=float(scrap_mean),
+        scrap_concentration=float(scrap_k),
+    )
+    t0 = time.perf_counter()
+    res = monte_carlo_oee(scenario, int(n_shifts), int(seed))
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    qs = [5, 10, 25, 50, 75, 90, 95]
+    pct = histogram_percentiles(res["hist"], qs)
+    m = res["means"]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Mean availability", f"{m[0]*100:.1f}%")
+    c2.metric("Mean performance", f"{m[1]*100:.1f}%")
+    c3.metric("Mean quality", f"{m[2]*100:.1f}%")
+    c4.metric("Median OEE", f"{pct[3]*100:.1f}%")
+
+    left, right = st.columns(2)
+    with left:
+        st.markdown("**OEE percentiles**")
+        st.table([{"Percentile": f"P{q}", "OEE": f"{v*100:.2f}%"} for q, v in zip(qs, pct)])
+    with right:
+        st.markdown("**Biggest loss, share of shifts**")
+        shares = res["biggest"] / int(n_shifts)
+        st.table([{"Loss": k, "Share": f"{v:.1%}"} for k, v in zip(LOSS_BUCKETS, shares)])
+
+    # Coarsen the 10k-bin histogram to 50 bars for the chart
+    bars = res["hist"].reshape(50, -1).sum(axis=1)
+    st.bar_chart({"OEE": [f"{i / 50:.2f}" for i in range(50)], "Shifts": bars}, x="OEE")
+    st.caption(
+        f"{int(n_shifts):,} shifts in {res['chunks']} chunks of {SIM_CHUNK:,} ({res['where']}), {elapsed_ms:,.0f} ms. "
+        "Same seed and settings give the same numbers; repeated settings come straight from the cache."
+    )
+
+
+def render_oee_live():
+    st.markdown("## Live rolling OEE from a machine event log")
+    st.markdown(
+        "<div class='muted'>State changes and part counts stream in; each machine keeps rolling counters per window, "
+        "so the view never rescans history.</div>",
+        unsafe_allow_html=True,
+    )
+    if OEE_EVENT_LOG:
+        path = OEE_EVENT_LOG
+    else:
+        if not st.checkbox("Run the demo event feed", value=False, key="oee_live_demo", help=f"Writes synthetic events to {OEE_DEMO_LOG.relative_to(ROOT)}. Set OEE_EVENT_LOG to tail a real log instead."):
+            st.markdown("<div class='tiny'>Start the demo feed to see six simulated machines.</div>", unsafe_allow_html=True)
+            return
+        path = str(OEE_DEMO_LOG)
+
+    c1, c2 = st.columns(2)
+    window = c1.radio("Window", list(ROLLING_WINDOWS), horizontal=True, key="oee_live_window")
+    ideal = c2.number_input("Default ideal cycle (s)", min_value=0.1, value=20.0, step=1.0, key="oee_live_ideal")
+
+    def panel():
+        if not OEE_EVENT_LOG:
+            demo_event_feed(path)["seen"] = time.time()
+        tail = event_tail(path)
+        tail.poll()
+        snap = tail.snapshot(window, float(ideal))
+        if not snap:
+            st.info("Waiting for events...")
+            return
+
+        # Fleet ratios from summed counters, then deltas since this session's last refresh
+        sums = [np.array([sum(v[k] for v in snap.values())]) for k in ("planned_s", "run_s", "ideal_s", "total", "good")]
+        fleet = {k: float(v[0]) for k, v in oee_ratios(*sums).items()}
+        prev = st.session_state.get("oee_live_prev", {})
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Fleet OEE", f"{fleet['oee']*100:.1f}%", f"{(fleet['oee'] - prev['oee'])*100:+.1f} pts" if "oee" in prev else None)
+        c2.metric("Fleet availability", f"{fleet['availability']*100:.1f}%")
+        c3.metric("Events", f"{tail.events:,}", f"+{tail.events - prev['events']:,}" if "events" in prev else None)
+        st.session_state["oee_live_prev"] = {"oee": fleet["oee"], "events": tail.events}
+
+        st.dataframe(
+            [
+                {
+                    "Machine": name,
+                    "State": v["state"],
+                    "OEE": f"{v['oee']*100:.1f}%",
+                    "Availability": f"{v['availability']*100:.1f}%",
+                    "Performance": f"{v['performance']*100:.1f}%",
+                    "Quality": f"{v['quality']*100:.1f}%",
+                    "Good / total": f"{v['good']:,.0f} / {v['total']:,.0f}",
+                }
+                for name, v in sorted(snap.items())
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+        clock = datetime.fromtimestamp(tail.clock).strftime("%Y-%m-%d %H:%M:%S") if tail.clock else "-"
+        st.caption(f"Log clock {clock}; {tail.offset:,} bytes read; {tail.bad:,} malformed lines skipped.")
+
+    # Only this panel reruns on the timer, not the rest of the post
+    if hasattr(st, "fragment"):
+        st.fragment(run_every=2)(panel)()
+    else:
+        panel()
+        st.button("Refresh", key="oee_live_refresh")
+
+
+def render_oee_downtime():
+    st.markdown("## Downtime from overlapping interval logs")
+    st.markdown(
+        "<div class='muted'>Breakdowns, changeovers, minor stops and planned maintenance arrive as separate interval logs that overlap. "
+        "Each second of planned production is booked to one cause (priority: "
+        + " > ".join(c.replace("_", " ") for c in DOWNTIME_CATEGORIES)
+        + "), so nothing is counted twice.</div>",
+        unsafe_allow_html=True,
+    )
+    c1, c2, c3 = st.columns(3)
+    n_intervals = c1.select_slider("Intervals", options=[100_000, 1_000_000, 3_000_000], value=100_000, key="oee_dt_n")
+    days = c2.select_slider("Days", options=[30, 90, 365], value=90, key="oee_dt_days")
+    seed = c3.number_input("Seed", min_value=0, max_value=999999, value=1, step=1, key="oee_dt_seed")
+    n_machines = 200
+
+    t0 = time.perf_counter()
+    index = sample_downtime_index(int(n_intervals), n_machines, int(days), int(seed))
+    build_ms = (time.perf_counter() - t0) * 1000
+    inputs = downtime_oee_inputs(index)
+    planned, down = inputs["planned_time_sec"], inputs["downtime_sec"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        availability = np.clip(np.nan_to_num((planned - down) / planned), 0.0, 1.0)
+
+    by_cat = inputs["by_category"].sum(axis=0)[: len(DOWNTIME_CATEGORIES)] / 3600
+    st.bar_chart({"Cause": [c.replace("_", " ") for c in DOWNTIME_CATEGORIES], "Hours": by_cat}, x="Cause")
+    worst = np.argsort(availability, kind="stable")[:25]
+    st.dataframe(
+        [
+            {
+                "Machine": index.machines[k],
+                "Planned h": round(planned[k] / 3600, 1),
+                "Downtime h": round(down[k] / 3600, 1),
+                **{c.replace("_", " ") + " h": round(inputs["by_category"][k, i] / 3600, 1) for i, c in enumerate(DOWNTIME_CATEGORIES)},
+                "Raw interval sum h": round(index.raw_s[k] / 3600, 1),
+                "Availability": f"{availability[k]*100:.1f}%",
+            }
+            for k in worst
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+    st.caption(
+        f"{int(n_intervals):,} intervals on {n_machines} machines merged into {index.seg_key.size:,} segments in {build_ms:,.0f} ms "
+        "(cached per setting). Planned h and Downtime h are the compute_oee() inputs; the raw sum double-counts overlaps "
+        "and includes time outside shifts."
+    )
+
+    st.markdown("**Query the index**")
+    q1, q2 = st.columns([1, 2])
+    machine = q1.selectbox("Machine", index.machines, key="oee_dt_machine")
+    day_from, day_to = q2.slider("Days", 0, int(days), (0, min(7, int(days))), key="oee_dt_range")
+    t0 = time.perf_counter()
+    res = index.query(machine, day_from * 86400.0, day_to * 86400.0)
+    query_us = (time.perf_counter() - t0) * 1e6
+    st.table([{"Class": k.replace("_", " "), "Hours": f"{v / 3600:.2f}"} for k, v in res.items()])
+    st.caption(f"Answered from prefix sums in {query_us:,.0f} µs, without rescanning intervals.")
+
+
+def render_oee_fleet():
+    st.markdown("## Fleet OEE from shift logs")
+    st.markdown(
+        "<div class='muted'>The same calculation over a whole table of shifts, rolled up by machine, line, day or week, "
+        "with a Pareto of where the time goes.</div>",
+        unsafe_allow_html=True,
+    )
+    source = st.radio("Shift data", ["Sample fleet", "Upload CSV/Parquet"], horizontal=True, key="oee_fleet_source")
+    if source == "Sample fleet":
+        c1, c2 = st.columns(2)
+        n_rows = c1.select_slider("Shifts", options=[10_000, 100_000, 1_000_000, 10_000_000], value=100_000, key="oee_fleet_rows")
+        seed = c2.number_input("Seed", min_value=0, max_value=999999, value=7, step=1, key="oee_fleet_seed")
+        t0 = time.perf_counter()
+        table = sample_shift_log(int(n_rows), int(seed))
+        source_key = f"sample:{int(n_rows)}:{int(seed)}"
+    else:
+        upload = st.file_uploader(
+            "Shift log",
+            type=["csv", "parquet"],
+            key="oee_fleet_upload",
+            help="Columns: " + ", ".join(OEE_SHIFT_COLUMNS) + ". Dates as YYYY-MM-DD, times in seconds.",
+        )
+        if upload is None:
+            st.info("Upload a shift log with columns: " + ", ".join(OEE_SHIFT_COLUMNS) + ".")
+            return
+        t0 = time.perf_counter()
+        try:
+            table = uploaded_shift_log(upload.file_id, upload)
+        except (ValueError, pa.ArrowInvalid, pa.ArrowKeyError) as e:
+            st.error(f"Could not read the shift log: {e}")
+            return
+        source_key = f"upload:{upload.file_id}"
+
+    facts, shift_oee = fleet_facts(source_key, table)
+    skipped = table.num_rows - facts.num_rows
+    if not facts.num_rows:
+        st.warning("No valid shifts (planned time, run time and total count must be positive).")
+        return
+
+    fleet = oee_ratios(
+        *(np.array([pc.sum(facts.column(c)).as_py()]) for c in ["planned_time", "run_time", "ideal_time", "total_count", "good_count"])
+    )
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Fleet availability", f"{fleet['availability'][0]*100:.1f}%")
+    c2.metric("Fleet performance", f"{fleet['performance'][0]*100:.1f}%")
+    c3.metric("Fleet quality", f"{fleet['quality'][0]*100:.1f}%")
+    c4.metric("Fleet OEE", f"{fleet['oee'][0]*100:.1f}%")
+
+    by = st.selectbox("Roll up by", list(OEE_ROLLUPS), key="oee_fleet_rollup")
+    keys = OEE_ROLLUPS[by]
+    rollup = fleet_rollup(source_key, by, facts)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    if keys in (["date"], ["week"]):
+        ordered = rollup.sort_by(keys[0])
+        st.line_chart(
+            {
+                "Period": ordered.column(keys[0]).to_pylist(),
+                "OEE": ordered.column("oee").to_numpy(),
+                "Availability": ordered.column("availability").to_numpy(),
+                "Performance": ordered.column("performance").to_numpy(),
+                "Quality": ordered.column("quality").to_numpy(),
+            },
+            x="Period",
+        )
+    else:
+        st.markdown("<div class='tiny'>Worst OEE first.</div>", unsafe_allow_html=True)
+    st.dataframe(rollup.slice(0, 500), use_container_width=True, hide_index=True)
+
+    st.markdown("### Loss Pareto")
+    pareto = loss_pareto(rollup, keys)
+    st.dataframe(pareto, use_container_width=True, hide_index=True)
+    hist, edges = np.histogram(shift_oee, bins=20, range=(0.0, 1.0))
+    st.markdown("<div class='tiny'>Shift-level OEE distribution</div>", unsafe_allow_html=True)
+    st.bar_chart({"OEE bucket": [f"{e:.2f}" for e in edges[:-1]], "Shifts": hist}, x="OEE bucket")
+    st.caption(
+        f"{table.num_rows:,} shifts ({skipped:,} invalid skipped), {rollup.num_rows:,} groups, {elapsed_ms:,.0f} ms. "
+        "Roll-ups sum times and counts before dividing, so big shifts weigh more than small ones; "
+        "loss hours are downtime, run time above ideal, and ideal time spent on scrap."
+    )
+
+
+# ---------------------------
+# Rolling betas (commodity-equity linkages)
+# ---------------------------
+NIFTY50 = [
+    "ADANIENT", "ADANIPORTS", "APOLLOHOSP", "ASIANPAINT", "AXISBANK", "BAJAJ-AUTO", "BAJFINANCE", "BAJAJFINSV", "BEL", "BHARTIARTL",
+    "CIPLA", "COALINDIA", "DRREDDY", "EICHERMOT", "ETERNAL", "GRASIM", "HCLTECH", "HDFCBANK", "HDFCLIFE", "HEROMOTOCO",
+    "HINDALCO", "HINDUNILVR", "ICICIBANK", "INDUSINDBK", "INFY", "ITC", "JIOFIN", "JSWSTEEL", "KOTAKBANK", "LT",
+    "M&M", "MARUTI", "NESTLEIND", "NTPC", "ONGC", "POWERGRID", "RELIANCE", "SBILIFE", "SBIN", "SHRIRAMFIN",
+    "SUNPHARMA", "TATACONSUM", "TATAMOTORS", "TATASTEEL", "TCS", "TECHM", "TITAN", "TRENT", "ULTRACEMCO", "WIPRO",
+]
+COMMODITIES = ["BRENT", "WTI", "NATGAS", "GOLD", "SILVER", "COPPER", "ALUMINIUM", "ZINC"]
+# Demo store: which names lean on which commodity (the rest only see the market)
+DEMO_EXPOSURES = {
+    "BRENT": ["ONGC", "RELIANCE", "COALINDIA", "ASIANPAINT"],
+    "NATGAS": ["NTPC", "POWERGRID"],
+    "COPPER": ["HINDALCO", "LT"],
+    "ALUMINIUM": ["HINDALCO"],
+    "ZINC": ["TATASTEEL", "JSWSTEEL"],
+    "GOLD": ["TITAN", "SHRIRAMFIN"],
+}
+# ... and which react a day late, for the Granger tests to pick up
+DEMO_LAGGED = {"BRENT": ["ONGC", "COALINDIA"], "COPPER": ["HINDALCO", "JSWSTEEL"]}
+BETA_DEFAULT_WINDOW = 120  # trading days; any length from 2 to the history minus one can be picked
+
+
+def write_demo_price_store(out: Path, years: int = 10, seed: int = 19) -> None:
+    """
+    Synthetic daily closes for the Nifty 50 and eight commodities. Equities
+    load on a market factor and, for the names in DEMO_EXPOSURES, on a
+    commodity with a beta that drifts over time, so rolling windows have
+    something to find. DEMO_LAGGED names also follow yesterday's commodity move.
+    """
+    rng = np.random.default_rng(seed)
+    days = np.arange(np.datetime64("2015-01-01"), np.datetime64("2015-01-01") + np.timedelta64(years * 365, "D"))
+    days = days[np.is_busday(days)]
+    t = days.size
+    oil = rng.standard_t(5, t) * 0.018
+    com = {
+        "BRENT": oil,
+        "WTI": 0.9 * oil + rng.normal(0, 0.006, t),
+        "NATGAS": 0.3 * oil + rng.normal(0, 0.028, t),
+        "GOLD": rng.normal(0, 0.008, t),
+    }
+    com["SILVER"] = 1.4 * com["GOLD"] + rng.normal(0, 0.011, t)
+    metals = rng.normal(0, 0.011, t)
+    com["COPPER"] = metals + rng.normal(0, 0.006, t)
+    com["ALUMINIUM"] = 0.8 * metals + rng.normal(0, 0.007, t)
+    com["ZINC"] = 0.9 * metals + rng.normal(0, 0.008, t)
+
+    market = rng.normal(0.0004, 0.009, t) + 0.1 * oil
+    phase = np.linspace(0, 2 * np.pi, t)
+    eq = {}
+    for i, name in enumerate(NIFTY50):
+        r = rng.uniform(0.7, 1.3) * market + rng.normal(0, rng.uniform(0.008, 0.016), t)
+        for c, names in DEMO_EXPOSURES.items():
+            if name in names:
+                r += (0.35 + 0.25 * np.sin(phase * rng.uniform(1, 3) + i)) * com[c]
+        for c, names in DEMO_LAGGED.items():
+            if name in names:
+                r[1:] += 0.4 * com[c][:-1]
+        eq[name] = r
+
+    out.mkdir(parents=True, exist_ok=True)
+    for file, rets in (("equities", eq), ("commodities", {c: com[c] for c in COMMODITIES})):
+        cols = {"date": pa.array(days)}
+        for name, r in rets.items():
+            cols[name] = np.round(100 * np.exp(np.cumsum(r)), 2)
+        tmp = out / f".{file}.{uuid.uuid4().hex}.tmp"
+        pq.write_table(pa.table(cols), tmp)
+        os.replace(tmp, out / f"{file}.parquet")
+
+
+def price_store_files(store: Path) -> Dict[str, Path]:
+    files = {}
+    for kind in ("equities", "commodities"):
+        for ext in (".parquet", ".csv"):
+            if (store / f"{kind}{ext}").exists():
+                files[kind] = store / f"{kind}{ext}"
+                break
+    return files
+
+
+@st.cache_resource(show_spinner="Loading prices...", max_entries=2)
+def load_price_store(paths: Tuple[str, str], sigs: Tuple[Any, ...]) -> Dict[str, Any]:
+    """
+    Reads both wide price files, inner-joins them on date, and turns closes
+    into log returns: (days, names) float64 matrices, NaN where a price is
+    missing or non-positive on either end of a day. Raises ValueError for a
+    file without a date column or with a non-numeric price column, and
+    Arrow's errors for one that can't be parsed.
+    """
+    tables = []
+    for path in paths:
+        table = pq.read_table(path) if path.endswith(".parquet") else pacsv.read_csv(path)
+        if "date" not in table.column_names:
+            raise ValueError(f"{Path(path).name} has no date column")
+        text = [c for c, t in zip(table.column_names, table.schema.types) if c != "date" and not (pa.types.is_integer(t) or pa.types.is_floating(t))]
+        if text:
+            raise ValueError(f"{Path(path).name}: non-numeric price column(s) {', '.join(text[:5])}")
+        day = pc.cast(table.column("date"), pa.timestamp("s")).cast(pa.date32())
+        tables.append(table.set_column(table.column_names.index("date"), "date", day))
+    eq, com = tables
+    com = com.rename_columns(["date"] + [f"c:{c}" for c in com.column_names[1:]])
+    joined = eq.join(com, "date", join_type="inner").sort_by("date")
+
+    def log_returns(names: List[str]) -> np.ndarray:
+        px = np.column_stack([joined.column(n).to_numpy(zero_copy_only=False).astype(np.float64) for n in names])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lp = np.where(px > 0, np.log(px), np.nan)
+        return np.diff(lp, axis=0)
+
+    eq_names = eq.column_names[1:]
+    com_names = com.column_names[1:]
+    return {
+        "dates": joined.column("date").to_numpy()[1:],
+        "equities": eq_names,
+        "commodities": [c[2:] for c in com_names],
+        "y": log_returns(eq_names),
+        "x": log_returns(com_names),
+    }
+
+
+@st.cache_resource(show_spinner="Building prefix sums...", max_entries=2)
+def beta_prefix_sums(store_key: Tuple[Any, ...], _store: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Running sums for every (day, equity, commodity): pair count, x, y, x*x,
+    y*y and x*y, each with a leading zero row. Any window's sums are then
+    one subtraction, so a new window length costs O(days) per pair instead
+    of O(days * window). Days where either return is missing drop out of
+    that pair only. With no gaps at all the x and y sums don't depend on the
+    pairing and are kept unbroadcast.
+    """
+    x, y = _store["x"], _store["y"]
+    vx, vy = ~np.isnan(x), ~np.isnan(y)
+    x0, y0 = np.where(vx, x, 0.0), np.where(vy, y, 0.0)
+
+    def prefix(a: np.ndarray) -> np.ndarray:
+        out = np.zeros((a.shape[0] + 1,) + a.shape[1:])
+        np.cumsum(a, axis=0, out=out[1:])
+        return out
+
+    xy = np.einsum("tk,tn->tnk", x0, y0)
+    if vx.all() and vy.all():
+        n = np.arange(x.shape[0] + 1, dtype=np.float64)[:, None, None]
+        return {
+            "n": n,
+            "x": prefix(x0)[:, None, :],
+            "y": prefix(y0)[:, :, None],
+            "xx": prefix(x0 * x0)[:, None, :],
+            "yy": prefix(y0 * y0)[:, :, None],
+            "xy": prefix(xy),
+        }
+    both = vy[:, :, None] & vx[:, None, :]
+    xb = np.where(both, x0[:, None, :], 0.0)
+    yb = np.where(both, y0[:, :, None], 0.0)
+    return {
+        "n": prefix(both.astype(np.float64)),
+        "x": prefix(xb),
+        "y": prefix(yb),
+        "xx": prefix(xb * xb),
+        "yy": prefix(yb * yb),
+        "xy": prefix(xy),
+    }
+
+
+def window_betas(sums: Dict[str, np.ndarray], window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    OLS beta of y on x and the correlation over every trailing window of
+    `window` days, as (days - window + 1, equities, commodities) arrays.
+    Windows with fewer than half their days present are NaN.
+    """
+    d = {k: v[window:] - v[:-window] for k, v in sums.items()}
+    n = d["n"]
+    sxx = n * d["xx"] - d["x"] ** 2
+    syy = n * d["yy"] - d["y"] ** 2
+    sxy = n * d["xy"] - d["x"] * d["y"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = np.where((n >= window / 2) & (sxx > 0), sxy / sxx, np.nan)
+        corr = np.where((n >= window / 2) & (sxx > 0) & (syy > 0), sxy / np.sqrt(sxx * syy), np.nan)
+    return beta, corr
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def rolling_betas(store_key: Tuple[Any, ...], window: int, _sums: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    return window_betas(_sums, window)
+
+
+def price_store() -> Any:
+    """The configured price store (writing the demo one if needed) as (returns, cache key, label), or None."""
+    store = Path(PRICE_STORE) if PRICE_STORE else PRICE_DEMO_STORE
+    files = price_store_files(store)
+    if len(files) < 2 and not PRICE_STORE:
+        with table_cache_lock():
+            if len(price_store_files(store)) < 2:
+                write_demo_price_store(store)
+        files = price_store_files(store)
+    if len(files) < 2:
+        st.info(f"No price store at {store}: expected equities and commodities files (.parquet or .csv).")
+        return None
+    paths = (str(files["equities"]), str(files["commodities"]))
+    sigs = tuple(file_signature(files[k]) for k in ("equities", "commodities"))
+    try:
+        data = load_price_store(paths, sigs)
+    except (ValueError, OSError, pa.ArrowException) as e:
+        st.info(f"Could not read the price store at {store}: {e}")
+        return None
+    return data, paths + sigs, "synthetic demo store" if not PRICE_STORE else str(store)
+
+
+def render_rolling_betas():
+    st.markdown("### Rolling betas")
+    st.markdown(
+        "<div class='muted'>Rolling OLS betas of every Nifty 50 stock on each commodity's daily log returns. "
+        "Running sums are built once per price store; each window length is then a single pass.</div>",
+        unsafe_allow_html=True,
+    )
+    found = price_store()
+    if found is None:
+        return
+    data, key, source = found
+    t0 = time.perf_counter()
+    sums = beta_prefix_sums(key, data)
+    prefix_ms = (time.perf_counter() - t0) * 1000
+
+    c1, c2, c3 = st.columns([1, 1, 2])
+    with c1:
+        commodity = st.selectbox("Commodity", data["commodities"], key="beta_commodity")
+    with c2:
+        longest = len(data["dates"]) - 1
+        window = int(
+            st.number_input(
+                "Window (trading days)",
+                min_value=2,
+                max_value=max(2, longest),
+                value=min(BETA_DEFAULT_WINDOW, max(2, longest)),
+                step=1,
+                key="beta_window",
+            )
+        )
+    with c3:
+        default = [n for n in ("ONGC", "RELIANCE", "HINDALCO", "TITAN") if n in data["equities"]] or data["equities"][:3]
+        picked = st.multiselect("Stocks", data["equities"], default=default, key="beta_stocks")
+    if window > longest:
+        st.info("The price history is too short for a rolling window.")
+        return
+
+    t0 = time.perf_counter()
+    beta, corr = rolling_betas(key, window, sums)
+    window_ms = (time.perf_counter() - t0) * 1000
+    k = data["commodities"].index(commodity)
+    dates = data["dates"][window - 1 :]
+
+    if picked:
+        idx = [data["equities"].index(n) for n in picked]
+        chart = {"Date": dates}
+        chart.update({n: beta[:, i, k] for n, i in zip(picked, idx)})
+        st.line_chart(chart, x="Date")
+
+    st.markdown(f"<div class='tiny'>Latest {window}-day beta and correlation on {commodity}, largest |beta| first</div>", unsafe_allow_html=True)
+    last_b, last_r = beta[-1, :, k], corr[-1, :, k]
+    order = np.argsort(-np.nan_to_num(np.abs(last_b), nan=-1.0))
+    st.dataframe(
+        {
+            "Stock": [data["equities"][i] for i in order],
+            "Beta": np.round(last_b[order], 3),
+            "Correlation": np.round(last_r[order], 3),
+            "Beta range (full history)": [f"{np.nanmin(beta[:, i, k]):.2f} to {np.nanmax(beta[:, i, k]):.2f}" for i in order],
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
+    with st.expander("Full matrix: latest beta of every stock on every commodity"):
+        st.dataframe(
+            {"Stock": data["equities"]} | {c: np.round(beta[-1, :, j], 3) for j, c in enumerate(data["commodities"])},
+            use_container_width=True,
+            hide_index=True,
+        )
+    st.caption(
+        f"{len(data['equities'])} stocks x {len(data['commodities'])} commodities over {len(data['dates']):,} days ({source}). "
+        f"Prefix sums {prefix_ms:,.0f} ms (cached per store), this window {window_ms:,.0f} ms."
+    )
+
+
+# Direction -> (effect, cause) series of the price store
+GRANGER_DIRECTIONS = {"Commodity → stock": ("y", "x"), "Stock → commodity": ("x", "y")}
+GRANGER_MIN_DAYS = 60  # shorter calendar years (a partial first or last year) are skipped
+
+
+def granger_windows(dates: np.ndarray) -> List[Tuple[str, slice]]:
+    """Calendar-year windows. Appending a day only changes the last one."""
+    years = dates.astype("datetime64[Y]")
+    starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+    ends = np.r_[starts[1:], dates.size]
+    return [(str(years[a]), slice(a, b)) for a, b in zip(starts, ends) if b - a >= GRANGER_MIN_DAYS]
+
+
+def window_sha256(data: Dict[str, Any], sl: slice) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([data["equities"], data["commodities"]]).encode())
+    for a in (data["dates"][sl], data["y"][sl], data["x"][sl]):
+        h.update(np.ascontiguousarray(a).tobytes())
+    return h.hexdigest()
+
+
+def read_granger_file(path: Path, shapes: Dict[str, Tuple[int, int]]) -> Dict[Tuple[str, int], Tuple[np.ndarray, ...]]:
+    """Rows are (direction, lag) blocks of effect-major pairs, so each block reshapes straight back."""
+    if not path.exists():
+        return {}
+    table = pq.read_table(path)
+    keys = table.select(["direction", "lag"]).to_pylist()
+    starts = [i for i in range(table.num_rows) if i == 0 or keys[i] != keys[i - 1]] + [table.num_rows]
+    out = {}
+    for a, b in zip(starts[:-1], starts[1:]):
+        direction, lag = keys[a]["direction"], keys[a]["lag"]
+        block = table.slice(a, b - a)
+        out[direction, lag] = tuple(block.column(c).to_numpy().reshape(shapes[direction]) for c in ("f", "p", "n"))
+    return out
+
 
-    oee = availability * performance * quality
-    return {"availability": availability, "performance": performance, "quality": quality, "oee": oee}
+@st.cache_resource(show_spinner=False)
+def granger_cache_lock() -> threading.Lock:
+    # Sessions running other directions or lags on the same window merge into one file, one at a time
+    return threading.Lock()
 
 
-def render_oee_interactive():
-    st.markdown("## Interactive OEE calculation (click to run)")
-    st.markdown(
-        "<div class='muted'>This demo generates a realistic shift scenario, calculates OEE, and tells you what to fix first based on the biggest loss.</div>",
-        unsafe_allow_html=True,
-    )
+def prune_granger_cache(keep: set) -> None:
+    # Appending a day gives the last year a new hash; older windows' files are never read again
+    for path in GRANGER_CACHE_DIR.glob("*.parquet"):
+        if path not in keep:
+            path.unlink(missing_ok=True)
+    for tmp in GRANGER_CACHE_DIR.glob(".*.tmp"):
+        try:
+            if time.time() - tmp.stat().st_mtime > 3600:
+                tmp.unlink()
+        except FileNotFoundError:
+            pass
 
-    cA, cB = st.columns([1, 1])
-    with cA:
-        seed = st.number_input("Optional seed (repeat the same example)", min_value=0, max_value=999999, value=0, step=1)
-    with cB:
-        st.markdown("<div class='tiny'>Tip: set seed to 0 for fresh random outputs.</div>", unsafe_allow_html=True)
 
-    run = st.button("Run randomized example", key="run_oee_demo")
+def write_granger_file(path: Path, results: Dict[Tuple[str, int], Tuple[np.ndarray, ...]]) -> None:
+    parts = []
+    for (direction, lag), (f, p, n) in sorted(results.items()):
+        parts.append(pa.table({"direction": [direction] * f.size, "lag": np.full(f.size, lag, dtype=np.int16), "f": f.ravel(), "p": p.ravel(), "n": n.ravel()}))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    pq.write_table(pa.concat_tables(parts), tmp)
+    os.replace(tmp, path)
 
-    with st.expander("Show Python code"):
-        st.code(
-            """def compute_oee(planned_time_sec, downtime_sec, total_count, good_count, ideal_cycle_time_sec):
-    run_time = planned_time_sec - downtime_sec
-    availability = run_time / planned_time_sec
-    performance  = (total_count * ideal_cycle_time_sec) / run_time
-    quality      = good_count / total_count
-    oee = availability * performance * quality
-    return availability, performance, quality, oee
-""",
-            language="python",
-        )
 
-    if not run:
-        st.markdown("<div class='oee-box tiny'>Click the button to generate inputs and see the output metrics + takeaway.</div>", unsafe_allow_html=True)
+@st.cache_resource(show_spinner="Running Granger tests...", max_entries=8)
+def granger_results(store_key: Tuple[Any, ...], direction: str, max_lag: int, _data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    F tests for every pair, every lag up to max_lag, in every calendar-year
+    window. Each window's results live on disk under the sha256 of that
+    window's returns, so only windows whose data changed (or lags not run
+    before) are computed; those go to the process pool, one task per window.
+    New blocks are merged into whatever the file holds by then (another
+    session may have added its own), and files of windows that no longer
+    exist are removed.
+    """
+    effect_key, cause_key = GRANGER_DIRECTIONS[direction]
+    shapes = {d: (_data[e].shape[1], _data[c].shape[1]) for d, (e, c) in GRANGER_DIRECTIONS.items()}
+    lags = tuple(range(1, max_lag + 1))
+    windows, todo, stored = [], [], {}
+    for label, sl in granger_windows(_data["dates"]):
+        path = GRANGER_CACHE_DIR / f"{window_sha256(_data, sl)}.parquet"
+        stored[label] = (path, read_granger_file(path, shapes))
+        missing = tuple(lag for lag in lags if (direction, lag) not in stored[label][1])
+        windows.append(label)
+        if missing:
+            todo.append((label, _data[effect_key][sl].T.copy(), _data[cause_key][sl].T.copy(), missing))
+
+    where = "cache"
+    if todo:
+        args = ([t[1] for t in todo], [t[2] for t in todo], [t[3] for t in todo])
+        try:
+            parts = list(process_pool().map(granger_task, *args))
+            where = "process pool"
+        except (BrokenProcessPool, OSError):
+            process_pool.clear()
+            parts = [granger_task(*a) for a in zip(*args)]
+            where = "in-process"
+        with granger_cache_lock():
+            for (label, *_), part in zip(todo, parts):
+                path, results = stored[label]
+                results.update(read_granger_file(path, shapes))
+                results.update({(direction, lag): v for lag, v in part.items()})
+                write_granger_file(path, results)
+            prune_granger_cache({path for path, _ in stored.values()})
+
+    p = np.stack([np.stack([stored[w][1][direction, lag][1] for lag in lags]) for w in windows])  # (window, lag, effect, cause)
+    if effect_key == "x":
+        p = np.swapaxes(p, -1, -2)  # always (window, lag, stock, commodity)
+    return {"windows": windows, "p": p, "computed": len(todo), "where": where}
+
+
+def render_granger():
+    st.markdown("### Granger causality")
+    st.markdown(
+        "<div class='muted'>F tests of whether one series' past returns help predict the other's, "
+        "for every stock-commodity pair and lag, in each calendar year.</div>",
+        unsafe_allow_html=True,
+    )
+    found = price_store()
+    if found is None:
         return
+    data, key, source = found
 
-    if seed != 0:
-        random.seed(int(seed))
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        direction = st.radio("Direction", list(GRANGER_DIRECTIONS), horizontal=True, key="granger_dir")
+    with c2:
+        max_lag = st.select_slider("Lags tested (days)", options=list(range(1, 11)), value=5, key="granger_lags")
+    with c3:
+        alpha = st.select_slider("Significance level", options=[0.01, 0.05, 0.1], value=0.05, key="granger_alpha")
 
-    planned_time_min = random.choice([420, 450, 480])      # 7h, 7.5h, 8h
-    downtime_min = random.randint(15, 90)
-    total_count = random.randint(700, 1600)
-    scrap = random.randint(0, max(1, int(0.12 * total_count)))
-    good_count = max(0, total_count - scrap)
-    ideal_cycle_time_sec = random.choice([18, 20, 22, 24, 26])
+    t0 = time.perf_counter()
+    res = granger_results(key, direction, max_lag, data)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    if not res["windows"]:
+        st.info(f"Not enough history: each window needs at least {GRANGER_MIN_DAYS} days.")
+        return
+    # Smallest p over the lags, Bonferroni-adjusted for having tried max_lag of them
+    best = np.minimum(np.nanmin(np.where(np.isnan(res["p"]), np.inf, res["p"]), axis=1) * max_lag, 1.0)
 
-    planned_time_sec = planned_time_min * 60
-    downtime_sec = downtime_min * 60
+    c1, c2, c3 = st.columns([1, 1, 1])
+    with c1:
+        view = st.selectbox("Window", ["Years significant"] + res["windows"][::-1], key="granger_window")
+    with c2:
+        name_q = st.text_input("Filter stocks", placeholder="e.g. ONGC, TATA", key="granger_q")
+    with c3:
+        only_sig = st.checkbox("Only stocks with a significant pair", value=True, key="granger_only_sig")
 
-    out = compute_oee(
-        planned_time_sec=planned_time_sec,
-        downtime_sec=downtime_sec,
-        total_count=total_count,
-        good_count=good_count,
-        ideal_cycle_time_sec=ideal_cycle_time_sec,
+    if view == "Years significant":
+        cells = (best < alpha).sum(axis=0)
+        sig = cells > 0
+        fmt = lambda v: int(v)
+    else:
+        cells = best[res["windows"].index(view)]
+        sig = cells < alpha
+        fmt = lambda v: round(float(v), 4)
+    stocks = np.array(data["equities"])
+    keep = np.ones(len(stocks), dtype=bool)
+    if name_q.strip():
+        terms = [t.strip().upper() for t in name_q.split(",") if t.strip()]
+        keep &= np.array([any(t in s.upper() for t in terms) for s in stocks])
+    if only_sig:
+        keep &= sig.any(axis=1)
+    rows = np.flatnonzero(keep)
+    st.dataframe(
+        {"Stock": stocks[rows].tolist()} | {c: [fmt(v) for v in cells[rows, j]] for j, c in enumerate(data["commodities"])},
+        use_container_width=True,
+        hide_index=True,
     )
-
-    st.markdown("### Inputs")
-    st.write(
-        {
-            "planned_time_min": planned_time_min,
-            "downtime_min": downtime_min,
-            "total_count": total_count,
-            "good_count": good_count,
-            "ideal_cycle_time_sec": ideal_cycle_time_sec,
-        }
+    if view == "Years significant":
+        what = f"years (of {len(res['windows'])}) with adjusted p < {alpha}; {int(sig.sum())} of {sig.size} pairs significant in at least one"
+    else:
+        what = f"adjusted p-values for {view}; {int(sig.sum())} of {sig.size} pairs below {alpha}"
+    ran = f"{res['computed']} computed ({res['where']}), the rest" if res["computed"] else "all"
+    st.caption(
+        f"Cells: {what}. Adjusted p is the smallest over lags 1-{max_lag}, times {max_lag}. {rows.size} stocks shown. "
+        f"{len(res['windows'])} yearly windows: {ran} read from the on-disk cache when first loaded; "
+        f"this view {elapsed_ms:,.0f} ms ({source})."
     )
 
-    st.markdown("### Outputs")
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Availability", f"{out['availability']*100:.1f}%")
-    c2.metric("Performance", f"{out['performance']*100:.1f}%")
-    c3.metric("Quality", f"{out['quality']*100:.1f}%")
-    c4.metric("OEE", f"{out['oee']*100:.1f}%")
 
-    # Key takeaway generator based on biggest loss
-    losses = {
-        "Availability (downtime, setups, breakdowns)": 1 - out["availability"],
-        "Performance (micro-stops, slow cycles, minor jams)": 1 - out["performance"],
-        "Quality (scrap, rework, startup rejects)": 1 - out["quality"],
-    }
-    worst = max(losses, key=losses.get)
-    worst_loss = losses[worst]
+# ---------------------------
+# Wall-jump maze levels
+# ---------------------------
+MAZE_SIZES = list(range(15, 42, 2))  # odd, so walls and corridors alternate; tables grow as tiles^2
+# Index order of the embed's moves; the JS side uses the same order
+MAZE_DIRS = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # up, down, left, right
+MAZE_LEVEL_RE = re.compile(r"/\*__LEVEL__\*/\s*null")
+MAZE_TEMPLATE_RE = re.compile(r"const mapTemplate = (\[.*?\]);\s*$", re.S | re.M)
 
-    st.markdown("### Key takeaway")
-    if worst_loss < 0.04:
-        st.success(
-            "This run is fairly balanced. Biggest gains come from tightening measurement, standard work, and small continuous improvements."
-        )
+
+def generate_maze(cols: int, rows: int, seed: int, braid: float = 0.7) -> np.ndarray:
+    """
+    Recursive-backtracker maze on the odd tiles (1 wall, 2 pellet), then a
+    `braid` share of dead ends knocked through so the ghost can be dodged.
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.ones((rows, cols), dtype=np.uint8)
+    seen = np.zeros((rows, cols), dtype=bool)
+    stack = [(1, 1)]
+    seen[1, 1] = True
+    grid[1, 1] = 2
+    while stack:
+        x, y = stack[-1]
+        options = [(dx, dy) for dx, dy in MAZE_DIRS if 0 < x + 2 * dx < cols - 1 and 0 < y + 2 * dy < rows - 1 and not seen[y + 2 * dy, x + 2 * dx]]
+        if not options:
+            stack.pop()
+            continue
+        dx, dy = options[rng.integers(len(options))]
+        grid[y + dy, x + dx] = grid[y + 2 * dy, x + 2 * dx] = 2
+        seen[y + 2 * dy, x + 2 * dx] = True
+        stack.append((x + 2 * dx, y + 2 * dy))
+
+    for y in range(1, rows - 1, 2):
+        for x in range(1, cols - 1, 2):
+            walls = [(dx, dy) for dx, dy in MAZE_DIRS if grid[y + dy, x + dx] == 1]
+            if len(walls) == 3 and rng.random() < braid:
+                inner = [(dx, dy) for dx, dy in walls if 0 < x + 2 * dx < cols - 1 and 0 < y + 2 * dy < rows - 1]
+                if inner:
+                    dx, dy = inner[rng.integers(len(inner))]
+                    grid[y + dy, x + dx] = 2
+    return grid
+
+
+def maze_tables(grid: np.ndarray) -> Dict[str, Any]:
+    """
+    Ghost lookup tables for every (ghost tile, player tile) pair of open
+    tiles: the BFS distance and the first move of a shortest path. All
+    targets are searched at once, level by level, with one bit per target
+    packed into bytes, so a level costs a few byte-array gathers however
+    many open tiles there are. Wall tiles (the player mid-jump) map to
+    their nearest open tile.
+    """
+    rows, cols = grid.shape
+    open_ = grid.ravel() != 1
+    ids = np.flatnonzero(open_)
+    n = ids.size
+    index = np.full(rows * cols, -1, dtype=np.int64)
+    index[ids] = np.arange(n)
+    ys, xs = np.divmod(ids, cols)
+    nbr = np.full((n, 4), n, dtype=np.int64)  # n = a sentinel row of zero bits
+    for d, (dx, dy) in enumerate(MAZE_DIRS):
+        nx, ny = xs + dx, ys + dy
+        ok = (nx >= 0) & (nx < cols) & (ny >= 0) & (ny < rows)
+        nbr[ok, d] = np.where(index[ny[ok] * cols + nx[ok]] >= 0, index[ny[ok] * cols + nx[ok]], n)
+    moves = np.zeros(rows * cols, dtype=np.uint8)
+    moves[ids] = ((nbr < n) << np.arange(4)).sum(axis=1)
+
+    # Rows are tiles (plus the sentinel), bits are targets: bit t of row g is "g reached from t"
+    width = (n + 7) // 8
+    eye = np.packbits(np.eye(n, dtype=bool), axis=1, bitorder="little")
+    visited = np.zeros((n + 1, width), dtype=np.uint8)
+    visited[:n] = eye
+    frontier = visited.copy()
+    hop_bits = [np.zeros_like(visited) for _ in range(2)]
+    dist_bits: List[np.ndarray] = []
+    level = 0
+    while frontier.any():
+        level += 1
+        while level >= 1 << len(dist_bits):
+            dist_bits.append(np.zeros_like(visited))
+        reached = np.zeros_like(visited)
+        for d in range(4):
+            via = frontier[nbr[:, d]] & ~visited[:n] & ~reached[:n]
+            reached[:n] |= via
+            for b in range(2):
+                if d >> b & 1:
+                    hop_bits[b][:n] |= via
+        visited |= reached
+        for b in range(len(dist_bits)):
+            if level >> b & 1:
+                dist_bits[b] |= reached
+        frontier = reached
+
+    def unpack(bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bits[:n], axis=1, count=n, bitorder="little")
+
+    hop = unpack(hop_bits[0]) | unpack(hop_bits[1]) << 1  # hop[g, t]
+    dist = sum(unpack(b).astype(np.uint16) << i for i, b in enumerate(dist_bits)) if dist_bits else np.zeros((n, n), np.uint16)
+
+    # Nearest open tile for every tile, by BFS outwards from all open tiles
+    nearest = np.where(open_, index, -1)
+    grid_near = nearest.reshape(rows, cols)
+    while (grid_near < 0).any():
+        # Every direction reads the previous ring, so a tile can't take a value set earlier in this one
+        padded = np.pad(grid_near, 1, constant_values=-1)
+        for dx, dy in MAZE_DIRS:
+            src = padded[1 + dy : 1 + dy + rows, 1 + dx : 1 + dx + cols]
+            take = (grid_near < 0) & (src >= 0)
+            grid_near = np.where(take, src, grid_near)
+    return {"n": n, "index": grid_near.ravel(), "moves": moves, "hop": hop, "dist": dist}
+
+
+def b64(a: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(a).tobytes()).decode("ascii")
+
+
+@st.cache_resource(show_spinner="Building maze...", max_entries=16)
+def maze_level(cols: int, rows: int, seed: int, template: str = "") -> Dict[str, Any]:
+    """
+    A level for the embed: the grid (generated from the seed, or the page's
+    own hand-made map when `template` is given) and its ghost tables, encoded
+    for the page. Hops are 2 bits each, four to a byte; distances are uint8
+    when they fit.
+    """
+    if template:
+        grid = np.array(json.loads(template), dtype=np.uint8)
+        rows, cols = grid.shape
     else:
-        if "Availability" in worst:
-            st.info(
-                "Availability is the main limiter. Reduce unplanned stops, improve changeovers, and shorten maintenance response time."
-            )
-        elif "Performance" in worst:
-            st.info(
-                "Performance is the main limiter. Hunt micro-stops and speed losses: feeding issues, small jams, slow cycles, and drift from the ideal."
-            )
-        else:
-            st.info(
-                "Quality is the main limiter. Focus on defect root causes, startup stability, process parameters, and catching issues earlier in the line."
-            )
+        grid = generate_maze(cols, rows, seed)
+    player, ghost = (1, 1), (cols - 2, rows - 2)
+    grid[player[1], player[0]] = grid[ghost[1], ghost[0]] = 0
+    t0 = time.perf_counter()
+    tables = maze_tables(grid)
+    hop = tables["hop"].ravel()
+    hop = np.pad(hop, (0, -hop.size % 4)).reshape(-1, 4)
+    packed = (hop[:, 0] | hop[:, 1] << 2 | hop[:, 2] << 4 | hop[:, 3] << 6).astype(np.uint8)
+    dist = tables["dist"]
+    wide = int(dist.max(initial=0)) > 255
+    return {
+        "cols": cols,
+        "rows": rows,
+        "grid": ["".join(map(str, row)) for row in grid.tolist()],
+        "player": player,
+        "ghost": ghost,
+        "n": tables["n"],
+        "index": b64(tables["index"].astype("<i2")),
+        "moves": b64(tables["moves"]),
+        "hop": b64(packed),
+        "dist": b64(dist.astype("<u2" if wide else np.uint8)),
+        "distBytes": 2 if wide else 1,
+        "build_ms": (time.perf_counter() - t0) * 1000,
+    }
 
-    st.markdown(
-        f"<div class='tiny'>Biggest loss in this run: <b>{worst}</b> (approx. {(worst_loss*100):.1f}% loss)</div>",
-        unsafe_allow_html=True,
+
+def maze_embed_html(html: str, level: Dict[str, Any]) -> str:
+    """The game page with a level injected in place of its LEVEL placeholder."""
+    page_level = {k: v for k, v in level.items() if k != "build_ms"}
+    return MAZE_LEVEL_RE.sub(lambda _: json.dumps(page_level, separators=(",", ":")), html, count=1)
+
+
+def render_maze_controls(html: str) -> Tuple[str, int]:
+    """Level picker above the game; returns the page with the level injected and an iframe height for it."""
+    template = MAZE_TEMPLATE_RE.search(html)
+    c1, c2, c3, c4 = st.columns([1.2, 1, 1, 0.8])
+    with c1:
+        kind = st.radio("Level", ["Original", "Generated"] if template else ["Generated"], horizontal=True, key="maze_kind")
+    generated = kind == "Generated"
+    with c2:
+        cols = st.select_slider("Width", options=MAZE_SIZES, value=25, disabled=not generated, key="maze_cols")
+    with c3:
+        rows = st.select_slider("Height", options=MAZE_SIZES, value=19, disabled=not generated, key="maze_rows")
+    with c4:
+        seed = st.number_input("Seed", min_value=0, value=1, step=1, disabled=not generated, key="maze_seed")
+    level = maze_level(cols, rows, int(seed)) if generated else maze_level(0, 0, 0, template.group(1))
+    st.caption(
+        f"{level['cols']}x{level['rows']} tiles, {level['n']:,} open. Ghost moves and distances for all "
+        f"{level['n'] ** 2:,} tile pairs precomputed in {level['build_ms']:,.0f} ms; levels are cached by seed."
     )
+    return maze_embed_html(html, level), int(832 * level["rows"] / level["cols"]) + 130
 
 
 # ---------------------------
-# Data
+# Theme + fonts (Crimson Text + Oswald) + UI polish
 # ---------------------------
-posts = load_posts()
-projects = load_projects()
+@st.cache_resource(show_spinner=False)
+def site_css(sig: Tuple[int, int]) -> str:
+    # Minified once per change of assets/css/app.css
+    return build_stylesheet()
 
-# ---------------------------
-# Navigation state
-# ---------------------------
-PAGES = ["Home", "Projects", "Blog", "About"]
-if "page" not in st.session_state:
-    st.session_state["page"] = "Home"
-if "selected_post" not in st.session_state:
-    st.session_state["selected_post"] = ""
-if "selected_project" not in st.session_state:
-    st.session_state["selected_project"] = ""
 
-st.sidebar.markdown("## Sujash Bharadwaj")
-st.sidebar.markdown('<div class="muted">Portfolio and personal blog</div>', unsafe_allow_html=True)
-st.sidebar.markdown("")
+def site_stylesheet(static: bool) -> str:
+    """
+    The <style> for every page: an @import of Google Fonts and the app CSS.
+    With typed static serving the CSS is published under a content-hashed
+    name on every render (an existing name is only a stat, and a pruned or
+    cleaned-out static/ gets it back), so each rerun sends two @imports the
+    browser fetches in parallel and then keeps. Otherwise it's inlined.
+    """
+    fonts = f"@import url('{GOOGLE_FONTS_CSS}');"
+    css = site_css(file_signature(SITE_CSS))
+    if static:
+        return f'<style>{fonts}@import url("{publish_hashed(css.encode("utf-8"), "assets", "app", ".css", keep=4)}");</style>'
+    return f"<style>{fonts}{css}</style>"
 
-current_index = PAGES.index(st.session_state["page"]) if st.session_state["page"] in PAGES else 0
-page = st.sidebar.radio("Navigate", PAGES, index=current_index, label_visibility="collapsed")
-st.session_state["page"] = page
 
+@st.cache_resource(show_spinner=False)
+def icon_sprite_svg(sig: Tuple[int, int]) -> Dict[str, Any]:
+    # Read once per change of assets/img/icons.svg: the file as published, and minified and hidden for inlining
+    svg = ICON_SPRITE.read_text(encoding="utf-8")
+    inline = re.sub(r">\s+<", "><", re.sub(r"<!--.*?-->", "", svg, flags=re.S)).strip()
+    inline = inline.replace("<svg ", '<svg width="0" height="0" style="position:absolute" aria-hidden="true" ', 1)
+    return {"file": svg.encode("utf-8"), "inline": inline}
 
-# ---------------------------
-# Pages
-# ---------------------------
-if st.session_state["page"] == "Home":
-    left, right = st.columns([2.2, 1], gap="large")
 
-    with left:
-        st.markdown(
-            """
-            <div style="margin-top: 6px;">
-              <div style="font-size: clamp(2.1rem, 4vw, 3.2rem); font-weight: 900; line-height: 1.1;">
-                Sujash Bharadwaj's Portfolio
-              </div>
-              <div class="muted" style="margin-top: 10px; font-size: 1.25rem;">
-                Final-year BSc(Hons) Applied Statistics & Data Analytics (MIT-WPU) + IITM BS (Data Science & Applications).
-                I build practical projects, write what I learn, and keep things reproducible.
-              </div>
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
+def icon_sprite(static: bool) -> Dict[str, str]:
+    """
+    assets/img/icons.svg, the <symbol>s that icon() references. With typed
+    static serving it's published under a content-hashed name on every
+    render, like the stylesheet, and each <use> points into that file
+    (fetched once, cached by the browser); otherwise (an SVG served as
+    text/plain would leave every icon blank) the sprite is inlined, hidden,
+    next to the stylesheet.
+    """
+    svg = icon_sprite_svg(file_signature(ICON_SPRITE))
+    if static:
+        return {"href": publish_hashed(svg["file"], "assets", "icons", ".svg", keep=4) + "#", "html": ""}
+    return {"href": "#", "html": svg["inline"]}
+
+
+# Everything below renders the page, so it only runs when Streamlit executes this file.
+# Spawned process-pool workers load it as __mp_main__ (for oee_sim / granger tasks) and
+# tests import it as a module; neither should draw widgets or start background threads.
+if __name__ == "__main__":
+    st.set_page_config(
+        page_title="Sujash Bharadwaj's Portfolio",
+        layout="wide",
+    )
 
-        c1, c2 = st.columns([1, 1], gap="small")
-        with c1:
-            if st.button("Explore projects", use_container_width=True):
-                st.session_state["page"] = "Projects"
-                st.rerun()
-        with c2:
-            if st.button("Read the blog", use_container_width=True):
-                st.session_state["page"] = "Blog"
-                st.rerun()
+    st.markdown(
+        site_stylesheet(typed_static_enabled()) + icon_sprite(typed_static_enabled())["html"],
+        unsafe_allow_html=True,
+    )
+
+
+    # ---------------------------
+    # Data
+    # ---------------------------
+    posts = load_posts()
+    projects = load_projects()
+    pdf_page_worker()  # starts background page rendering on the first run
+    table_cache_worker()  # and the Arrow caches behind the data previews
+
+    # ---------------------------
+    # Navigation state
+    # ---------------------------
+    PAGES = ["Home", "Projects", "Blog", "About"]
+    if "page" not in st.session_state:
+        st.session_state["page"] = "Home"
+    if "selected_post" not in st.session_state:
+        st.session_state["selected_post"] = ""
+    if "selected_project" not in st.session_state:
+        st.session_state["selected_project"] = ""
+
+    st.sidebar.markdown("## Sujash Bharadwaj")
+    st.sidebar.markdown('<div class="muted">Portfolio and personal blog</div>', unsafe_allow_html=True)
+    st.sidebar.markdown("")
+
+    current_index = PAGES.index(st.session_state["page"]) if st.session_state["page"] in PAGES else 0
+    page = st.sidebar.radio("Navigate", PAGES, index=current_index, label_visibility="collapsed")
+    st.session_state["page"] = page
+
+
+    # ---------------------------
+    # Pages
+    # ---------------------------
+    if st.session_state["page"] == "Home":
+        left, right = st.columns([2.2, 1], gap="large")
+
+        with left:
+            st.markdown(
+                """
+                <div style="margin-top: 6px;">
+                  <div style="font-size: clamp(2.1rem, 4vw, 3.2rem); font-weight: 900; line-height: 1.1;">
+                    Sujash Bharadwaj's Portfolio
+                  </div>
+                  <div class="muted" style="margin-top: 10px; font-size: 1.25rem;">
+                    Final-year BSc(Hons) Applied Statistics & Data Analytics (MIT-WPU) + IITM BS (Data Science & Applications).
+                    I build practical projects, write what I learn, and keep things reproducible.
+                  </div>
+                </div>
+                """,
+                unsafe_allow_html=True,
+            )
+
+            c1, c2 = st.columns([1, 1], gap="small")
+            with c1:
+                if st.button("Explore projects", use_container_width=True):
+                    st.session_state["page"] = "Projects"
+                    st.rerun()
+            with c2:
+                if st.button("Read the blog", use_container_width=True):
+                    st.session_state["page"] = "Blog"
+                    st.rerun()
+
+            st.markdown("")
+            st.markdown("### Latest article")
+            latest = posts[0] if posts else None
+            if latest:
+                card(latest["title"], latest["excerpt"], meta=latest["date"])
+                if st.button("Open article", key="open_latest"):
+                    st.session_state["selected_post"] = str(latest["path"])
+                    st.session_state["page"] = "Blog"
+                    st.rerun()
+            else:
+                st.info("No blog posts found yet.")
+
+            st.markdown("### Latest project")
+            if projects:
+                card(projects[0]["title"], projects[0]["desc"])
+                if st.button("Open project", key="open_latest_project"):
+                    st.session_state["selected_project"] = projects[0]["slug"]
+                    st.session_state["page"] = "Projects"
+                    st.rerun()
+            else:
+                st.info("No projects found yet.")
+
+            st.markdown("### What I'm doing now")
+            st.markdown(
+                """
+                <span class="pill">AI & ML</span>
+                <span class="pill">Statistics</span>
+                <span class="pill">Reproducible notebooks</span>
+                """,
+                unsafe_allow_html=True,
+            )
+            st.markdown(
+                '<div class="muted" style="margin-top:10px;">Hands-on mini projects, clean analysis, and short write-ups as I learn.</div>',
+                unsafe_allow_html=True,
+            )
+
+        with right:
+            img_path = ASSETS / "img" / "profile.png"
+            if img_path.exists():
+                show_profile_image(img_path)
+
+            quick_links(
+                email="sujashbharadwaj10@gmail.com",
+                github_url="https://github.com/SujashBharadwaj",
+                linkedin_url="https://www.linkedin.com/in/sujash-bharadwaj-14752827a/",
+            )
 
+    elif st.session_state["page"] == "Projects":
+        st.markdown("## Projects")
+        st.markdown('<div class="muted">Reports, dashboards, and interactive builds with downloadable outputs.</div>', unsafe_allow_html=True)
         st.markdown("")
-        st.markdown("### Latest article")
-        latest = posts[0] if posts else None
-        if latest:
-            card(latest["title"], latest["excerpt"], meta=latest["date"])
-            if st.button("Open article", key="open_latest"):
-                st.session_state["selected_post"] = str(latest["path"])
-                st.session_state["page"] = "Blog"
-                st.rerun()
-        else:
-            st.info("No blog posts found yet.")
 
-        st.markdown("### Latest project")
-        if projects:
-            card(projects[0]["title"], projects[0]["desc"])
-            if st.button("Open project", key="open_latest_project"):
-                st.session_state["selected_project"] = projects[0]["slug"]
-                st.session_state["page"] = "Projects"
-                st.rerun()
+        if not projects:
+            st.info("No projects found.")
         else:
-            st.info("No projects found yet.")
+            slugs = [p["slug"] for p in projects]
+            if st.session_state["selected_project"] not in slugs:
+                st.session_state["selected_project"] = projects[0]["slug"]
 
-        st.markdown("### What I'm doing now")
-        st.markdown(
-            """
-            <span class="pill">AI & ML</span>
-            <span class="pill">Statistics</span>
-            <span class="pill">Reproducible notebooks</span>
-            """,
-            unsafe_allow_html=True,
-        )
-        st.markdown(
-            '<div class="muted" style="margin-top:10px;">Hands-on mini projects, clean analysis, and short write-ups as I learn.</div>',
-            unsafe_allow_html=True,
-        )
+            st.markdown("### Featured")
+            grid_cols = st.columns(2, gap="medium")
+            for i, p in enumerate(projects):
+                meta = PROJECT_META.get(p["slug"], {})
+                eyebrow = meta.get("eyebrow", "Project")
+                tags = meta.get("tags", [])
+                chips = "".join([f"<span class='project-chip'>{t}</span>" for t in tags[:4]])
+
+                with grid_cols[i % 2]:
+                    st.markdown(
+                        f"""
+                        <div class="project-card">
+                          <div class="project-eyebrow">{eyebrow}</div>
+                          <div class="project-title">{p["title"]}</div>
+                          <div class="muted">{p["desc"]}</div>
+                          <div class="project-chips">{chips}</div>
+                        </div>
+                        """,
+                        unsafe_allow_html=True,
+                    )
+                    if st.button("Open project", key=f"open_project_{p['slug']}", use_container_width=True):
+                        st.session_state["selected_project"] = p["slug"]
+                        st.rerun()
 
-    with right:
-        img_path = ASSETS / "img" / "profile.png"
-        if img_path.exists():
-            st.image(str(img_path), use_container_width=True)
-
-        quick_links(
-            email="sujashbharadwaj10@gmail.com",
-            github_url="https://github.com/SujashBharadwaj",
-            linkedin_url="https://www.linkedin.com/in/sujash-bharadwaj-14752827a/",
-        )
+            st.markdown("")
+            titles = [p["title"] for p in projects]
+            slug_by_title = {p["title"]: p["slug"] for p in projects}
+            selected_title = next(p["title"] for p in projects if p["slug"] == st.session_state["selected_project"])
+            selected_title = st.selectbox(
+                "Quick jump",
+                titles,
+                index=titles.index(selected_title),
+                help="Use this if you want to jump directly to a project.",
+            )
 
-elif st.session_state["page"] == "Projects":
-    st.markdown("## Projects")
-    st.markdown('<div class="muted">Reports, dashboards, and interactive builds with downloadable outputs.</div>', unsafe_allow_html=True)
-    st.markdown("")
+            slug = slug_by_title[selected_title]
+            st.session_state["selected_project"] = slug
 
-    if not projects:
-        st.info("No projects found.")
-    else:
-        slugs = [p["slug"] for p in projects]
-        if st.session_state["selected_project"] not in slugs:
-            st.session_state["selected_project"] = projects[0]["slug"]
-
-        st.markdown("### Featured")
-        grid_cols = st.columns(2, gap="medium")
-        for i, p in enumerate(projects):
-            meta = PROJECT_META.get(p["slug"], {})
-            eyebrow = meta.get("eyebrow", "Project")
-            tags = meta.get("tags", [])
-            chips = "".join([f"<span class='project-chip'>{t}</span>" for t in tags[:4]])
-
-            with grid_cols[i % 2]:
+            desc = next((p["desc"] for p in projects if p["slug"] == slug), "")
+            meta = PROJECT_META.get(slug, {})
+            detail_tags = meta.get("tags", [])
+            detail_chips = "".join([f"<span class='project-chip'>{t}</span>" for t in detail_tags])
+            if desc:
                 st.markdown(
                     f"""
-                    <div class="project-card">
-                      <div class="project-eyebrow">{eyebrow}</div>
-                      <div class="project-title">{p["title"]}</div>
-                      <div class="muted">{p["desc"]}</div>
-                      <div class="project-chips">{chips}</div>
+                    <div class="card" style="margin-top:8px;">
+                      <div class="project-eyebrow">{meta.get("eyebrow", "Project")}</div>
+                      <div style="font-size:1.35rem;font-weight:800;">{selected_title}</div>
+                      <div class="muted" style="margin-top:8px;">{desc}</div>
+                      <div class="project-chips">{detail_chips}</div>
                     </div>
                     """,
                     unsafe_allow_html=True,
                 )
-                if st.button("Open project", key=f"open_project_{p['slug']}", use_container_width=True):
-                    st.session_state["selected_project"] = p["slug"]
-                    st.rerun()
+                st.markdown("")
 
-        st.markdown("")
-        titles = [p["title"] for p in projects]
-        slug_by_title = {p["title"]: p["slug"] for p in projects}
-        selected_title = next(p["title"] for p in projects if p["slug"] == st.session_state["selected_project"])
-        selected_title = st.selectbox(
-            "Quick jump",
-            titles,
-            index=titles.index(selected_title),
-            help="Use this if you want to jump directly to a project.",
-        )
+            embed_preview = st.toggle(
+                "Enable embedded preview",
+                value=False,
+                help="Some Chrome setups block embedded content. Keep this off to use download-only mode.",
+            )
+            use_legacy_project_page = st.toggle(
+                "Use legacy project HTML page",
+                value=True,
+                help="Render the original projects_static/<project>/index.html page, like the old setup.",
+            )
+            preview_modes = ["Native Streamlit PDF", "Embedded HTML (data URL)", "Blob URL (browser-safe fallback)"]
+            if pdfium is not None:
+                preview_modes.insert(0, "Page images (pre-rendered)")
+            if static_serving_enabled():
+                preview_modes.insert(0, "Streamed from static files (byte-range)")
+            preview_mode = st.selectbox(
+                "PDF preview mode",
+                preview_modes,
+                index=0,
+                disabled=not embed_preview,
+            )
 
-        slug = slug_by_title[selected_title]
-        st.session_state["selected_project"] = slug
+            pdfs, others = list_project_files(slug)
+            project_embed_html = read_project_embed_html(slug)
+            embed_height = None
+            if slug == "wall-jump-maze" and project_embed_html:
+                project_embed_html, embed_height = render_maze_controls(project_embed_html)
+
+            cols = st.columns([1.4, 1], gap="large")
+            with cols[0]:
+                if use_legacy_project_page and project_embed_html:
+                    show_project_embed(slug, project_embed_html, height=embed_height or 920, scrolling=True)
+                elif not embed_preview:
+                    st.info("Preview is disabled. Use the downloads on the right.")
+                elif pdfs:
+                    pdf_names = [p.name for p in pdfs]
+                    chosen = st.selectbox("View report", pdf_names, index=0)
+                    chosen_path = next(p for p in pdfs if p.name == chosen)
+                    if preview_mode.startswith("Page images"):
+                        mode = "Page images"
+                    elif preview_mode.startswith("Streamed"):
+                        mode = "Static URL"
+                    elif preview_mode.startswith("Native"):
+                        mode = "Native Streamlit PDF"
+                    elif preview_mode.startswith("Embedded"):
+                        mode = "Embedded HTML (data URL)"
+                    else:
+                        mode = "Blob URL"
+                    if mode == "Page images":
+                        render_pdf_page_browser(chosen_path)
+                    else:
+                        embed_pdf(chosen_path, height=860, mode=mode)
+                elif project_embed_html:
+                    show_project_embed(slug, project_embed_html, height=embed_height or 760, scrolling=False)
+                else:
+                    st.info("No project preview found.")
 
-        desc = next((p["desc"] for p in projects if p["slug"] == slug), "")
-        meta = PROJECT_META.get(slug, {})
-        detail_tags = meta.get("tags", [])
-        detail_chips = "".join([f"<span class='project-chip'>{t}</span>" for t in detail_tags])
-        if desc:
-            st.markdown(
-                f"""
-                <div class="card" style="margin-top:8px;">
-                  <div class="project-eyebrow">{meta.get("eyebrow", "Project")}</div>
-                  <div style="font-size:1.35rem;font-weight:800;">{selected_title}</div>
-                  <div class="muted" style="margin-top:8px;">{desc}</div>
-                  <div class="project-chips">{detail_chips}</div>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
-            st.markdown("")
+            with cols[1]:
+                st.markdown("### Downloads")
 
-        embed_preview = st.toggle(
-            "Enable embedded preview",
-            value=False,
-            help="Some Chrome setups block embedded content. Keep this off to use download-only mode.",
-        )
-        use_legacy_project_page = st.toggle(
-            "Use legacy project HTML page",
-            value=True,
-            help="Render the original projects_static/<project>/index.html page, like the old setup.",
-        )
-        preview_mode = st.selectbox(
-            "PDF preview mode",
-            ["Native Streamlit PDF", "Embedded HTML (data URL)", "Blob URL (browser-safe fallback)"],
-            index=0,
-            disabled=not embed_preview,
-        )
+                if project_embed_html:
+                    download_file(PROJECTS_DIR / slug / "index.html", label="Download game HTML")
 
-        pdfs, others = list_project_files(slug)
-        project_embed_html = read_project_embed_html(slug)
-
-        cols = st.columns([1.4, 1], gap="large")
-        with cols[0]:
-            if use_legacy_project_page and project_embed_html:
-                components.html(project_embed_html, height=920, scrolling=True)
-            elif not embed_preview:
-                st.info("Preview is disabled. Use the downloads on the right.")
-            elif project_embed_html:
-                components.html(project_embed_html, height=760, scrolling=False)
-            elif pdfs:
-                pdf_names = [p.name for p in pdfs]
-                chosen = st.selectbox("View report", pdf_names, index=0)
-                chosen_path = next(p for p in pdfs if p.name == chosen)
-                if preview_mode.startswith("Native"):
-                    mode = "Native Streamlit PDF"
-                elif preview_mode.startswith("Embedded"):
-                    mode = "Embedded HTML (data URL)"
-                else:
-                    mode = "Blob URL"
-                embed_pdf(chosen_path, height=860, mode=mode)
-            else:
-                st.info("No project preview found.")
-
-        with cols[1]:
-            st.markdown("### Downloads")
-
-            if project_embed_html:
-                project_html_path = PROJECTS_DIR / slug / "index.html"
-                st.download_button(
-                    label="Download game HTML",
-                    data=project_html_path.read_bytes(),
-                    file_name="index.html",
-                    mime="text/html",
-                    use_container_width=True,
-                )
+                if pdfs:
+                    for p in pdfs:
+                        download_file(p, label=f"Download {p.name}")
 
-            if pdfs:
-                for p in pdfs:
-                    st.download_button(
-                        label=f"Download {p.name}",
-                        data=p.read_bytes(),
-                        file_name=p.name,
-                        mime="application/pdf",
-                        use_container_width=True,
-                    )
+                if others:
+                    st.markdown("### Data / assets")
+                    for p in others:
+                        download_file(p, label=f"Download {p.name}")
 
-            if others:
-                st.markdown("### Data / assets")
-                for p in others:
-                    mime = "application/octet-stream"
-                    if p.suffix.lower() == ".xlsx":
-                        mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    elif p.suffix.lower() == ".csv":
-                        mime = "text/csv"
-                    elif p.suffix.lower() in [".png", ".jpg", ".jpeg"]:
-                        mime = f"image/{p.suffix.lower().lstrip('.')}"
-                    st.download_button(
-                        label=f"Download {p.name}",
-                        data=p.read_bytes(),
-                        file_name=p.name,
-                        mime=mime,
-                        use_container_width=True,
-                    )
+            tabular = [p for p in others if p.suffix.lower() in (".csv", ".xlsx")]
+            if tabular:
+                render_table_preview(tabular)
+                render_data_qa(slug, tabular)
 
-        if slug == "wall-jump-maze":
-            st.markdown("")
-            st.markdown("### Why I Built This")
-            st.markdown(
-                """
-                I wanted to add more interactive displays to my portfolio, and a Pac-Man-inspired mini game felt like a strong way to do it.
-                The goal was to challenge myself to build a clean browser game using only HTML, CSS, JavaScript, and the Canvas API,
-                then embed it inside Streamlit with `st.components.v1.html()`.
-
-                How it works:
-                - The maze is a 2D grid (`1` wall, `0` path, `2` pellet).
-                - You move tile-by-tile with arrow keys and collect pellets to increase score.
-                - A ghost moves through the maze, respects walls, and ends the run on collision.
-                - Press `Space` to activate a short wall-jump window (~300ms) that lets you phase through walls.
-                - Wall jump has a cooldown (~3s), so timing matters.
-                """
-            )
+            if slug == "commodity-equity-linkages":
+                render_rolling_betas()
+                render_granger()
 
-elif st.session_state["page"] == "Blog":
-    st.markdown("## Blog")
-    st.markdown('<div class="muted">Short learning notes and project logs.</div>', unsafe_allow_html=True)
-    st.markdown("")
+            if slug == "wall-jump-maze":
+                st.markdown("")
+                st.markdown("### Why I Built This")
+                st.markdown(
+                    """
+                    I wanted to add more interactive displays to my portfolio, and a Pac-Man-inspired mini game felt like a strong way to do it.
+                    The goal was to challenge myself to build a clean browser game using only HTML, CSS, JavaScript, and the Canvas API,
+                    then embed it inside Streamlit with `st.components.v1.html()`.
+
+                    How it works:
+                    - The maze is a 2D grid (`1` wall, `0` path, `2` pellet).
+                    - You move tile-by-tile with arrow keys and collect pellets to increase score.
+                    - A ghost moves through the maze, respects walls, and ends the run on collision.
+                    - New levels can be generated from a seed; Python precomputes the ghost's shortest-path move and distance for every pair of tiles, so each ghost step is a table lookup.
+                    - Press `Space` to activate a short wall-jump window (~300ms) that lets you phase through walls.
+                    - Wall jump has a cooldown (~3s), so timing matters.
+                    """
+                )
 
-    if not posts:
-        st.info("No posts found yet.")
-    else:
-        q = st.text_input("Search posts", placeholder="Type to search by title or content...")
-        filtered = posts
-        if q.strip():
-            qq = q.strip().lower()
-            filtered = [p for p in posts if qq in p["title"].lower() or qq in p["content"].lower()]
-
-        if not filtered:
-            st.info("No posts match your search.")
+    elif st.session_state["page"] == "Blog":
+        st.markdown("## Blog")
+        st.markdown('<div class="muted">Short learning notes and project logs.</div>', unsafe_allow_html=True)
+        st.markdown("")
+
+        if not posts:
+            st.info("No posts found yet.")
         else:
-            post_titles = [p["title"] for p in filtered]
-
-            default_idx = 0
-            if st.session_state["selected_post"]:
-                for i, p in enumerate(filtered):
-                    if str(p["path"]) == st.session_state["selected_post"]:
-                        default_idx = i
-                        break
-
-            selected = st.selectbox("Select a post", post_titles, index=default_idx)
-            post = next(p for p in filtered if p["title"] == selected)
-            st.session_state["selected_post"] = str(post["path"])
-
-            is_oee_post = (
-                "oee" in post["title"].lower()
-                or "overall equipment effectiveness" in post["title"].lower()
-                or post["path"].stem.lower().endswith("oee")
-                or "oee" in post["path"].stem.lower()
-            )
+            q = st.text_input("Search posts", placeholder='Type to search by title or content, "quotes" for exact phrases...')
+            filtered = posts
+            n_matches = len(posts)
+            if q.strip():
+                hits, n_matches = search_posts(search_index_for(posts), q)
+                filtered = [posts[i] for i, _ in hits]
+
+            if not filtered:
+                st.info("No posts match your search.")
+            else:
+                if q.strip():
+                    listed = f" (top {len(filtered)} listed)" if n_matches > len(filtered) else ""
+                    st.markdown(f"<div class='tiny'>{n_matches} matching post(s), best match first{listed}.</div>", unsafe_allow_html=True)
+                    for p in filtered[:5]:
+                        card(p["title"], highlight_snippet(p["content"], q), meta=p["date"])
+
+                post_titles = [p["title"] for p in filtered]
+
+                default_idx = 0
+                if st.session_state["selected_post"]:
+                    for i, p in enumerate(filtered):
+                        if str(p["path"]) == st.session_state["selected_post"]:
+                            default_idx = i
+                            break
+
+                selected = st.selectbox("Select a post", post_titles, index=default_idx)
+                post = next(p for p in filtered if p["title"] == selected)
+                st.session_state["selected_post"] = str(post["path"])
+
+                is_oee_post = (
+                    "oee" in post["title"].lower()
+                    or "overall equipment effectiveness" in post["title"].lower()
+                    or post["path"].stem.lower().endswith("oee")
+                    or "oee" in post["path"].stem.lower()
+                )
 
-            st.markdown(f"### {post['title']}")
-            meta_bits = []
-            if post["date"]:
-                meta_bits.append(post["date"])
-            if post.get("tags"):
-                meta_bits.append(" | ".join([f"`{t}`" for t in post["tags"]]))
-            if meta_bits:
-                st.markdown(f"<div class='tiny'>{' | '.join(meta_bits)}</div>", unsafe_allow_html=True)
-
-            st.markdown("---")
-
-            content = normalize_math(post["content"])
-            slug = re.sub(r"^\d{4}-\d{2}-\d{2}-", "", post["path"].stem.lower())
-            is_means_post = slug == "means-guide"
-            is_gd_post = slug == "gradient-descent"
-
-            # Replace the snippet section with interactive demo for OEE post
-            if is_oee_post and OEE_MARKER in content:
-                before, after = content.split(OEE_MARKER, 1)
-                st.markdown(before, unsafe_allow_html=True)
-                st.markdown("---")
-                render_oee_interactive()
+                st.markdown(f"### {post['title']}")
+                meta_bits = []
+                if post["date"]:
+                    meta_bits.append(post["date"])
+                if post.get("tags"):
+                    meta_bits.append(" | ".join([f"`{t}`" for t in post["tags"]]))
+                if meta_bits:
+                    st.markdown(f"<div class='tiny'>{' | '.join(meta_bits)}</div>", unsafe_allow_html=True)
 
-                # remove the old fenced python block if it immediately follows the marker in "after"
-                # (so the old snippet doesn't show under the demo)
-                after_clean = re.sub(r"^\s*```python[\s\S]*?```\s*", "", after, count=1).lstrip()
                 st.markdown("---")
-                st.markdown(after_clean, unsafe_allow_html=True)
-            elif is_means_post and "## Interactive playground" in content:
-                before, after = content.split("## Interactive playground", 1)
-                st.markdown(before, unsafe_allow_html=True)
-                st.markdown("---")
-                render_means_interactive()
-                if "## Takeaways" in after:
-                    _, tail = after.split("## Takeaways", 1)
+
+                content = responsive_markdown_images(normalize_math(post["content"]), post["path"].parent)
+                slug = re.sub(r"^\d{4}-\d{2}-\d{2}-", "", post["path"].stem.lower())
+                is_means_post = slug == "means-guide"
+                is_gd_post = slug == "gradient-descent"
+
+                # Replace the snippet section with interactive demo for OEE post
+                if is_oee_post and OEE_MARKER in content:
+                    before, after = content.split(OEE_MARKER, 1)
+                    st.markdown(before, unsafe_allow_html=True)
                     st.markdown("---")
-                    st.markdown("## Takeaways" + tail, unsafe_allow_html=True)
-            elif is_gd_post and "## Interactive playground (1-D, cubic only)" in content:
-                before, after = content.split("## Interactive playground (1-D, cubic only)", 1)
-                st.markdown(before, unsafe_allow_html=True)
-                st.markdown("---")
-                render_gradient_descent_interactive()
-                if "## Usage in machine learning" in after:
-                    _, tail = after.split("## Usage in machine learning", 1)
+                    render_oee_interactive()
                     st.markdown("---")
-                    st.markdown("## Usage in machine learning" + tail, unsafe_allow_html=True)
-            else:
-                # normal rendering for all other posts
-                st.markdown(content, unsafe_allow_html=True)
+                    render_oee_monte_carlo()
+                    st.markdown("---")
+                    render_oee_fleet()
+                    st.markdown("---")
+                    render_oee_downtime()
+                    st.markdown("---")
+                    render_oee_live()
+
+                    # remove the old fenced python block if it immediately follows the marker in "after"
+                    # (so the old snippet doesn't show under the demo)
+                    after_clean = re.sub(r"^\s*```python[\s\S]*?```\s*", "", after, count=1).lstrip()
+                    st.markdown("---")
+                    st.markdown(after_clean, unsafe_allow_html=True)
+                elif is_means_post and "## Interactive playground" in content:
+                    before, after = content.split("## Interactive playground", 1)
+                    st.markdown(before, unsafe_allow_html=True)
+                    st.markdown("---")
+                    render_means_interactive()
+                    if "## Takeaways" in after:
+                        _, tail = after.split("## Takeaways", 1)
+                        st.markdown("---")
+                        st.markdown("## Takeaways" + tail, unsafe_allow_html=True)
+                elif is_gd_post and "## Interactive playground (1-D, cubic only)" in content:
+                    before, after = content.split("## Interactive playground (1-D, cubic only)", 1)
+                    st.markdown(before, unsafe_allow_html=True)
+                    st.markdown("---")
+                    render_gradient_descent_interactive()
+                    if "## Usage in machine learning" in after:
+                        _, tail = after.split("## Usage in machine learning", 1)
+                        st.markdown("---")
+                        st.markdown("## Usage in machine learning" + tail, unsafe_allow_html=True)
+                else:
+                    # normal rendering for all other posts
+                    st.markdown(content, unsafe_allow_html=True)
 
-elif st.session_state["page"] == "About":
-    st.markdown("## About")
-    st.markdown("")
+    elif st.session_state["page"] == "About":
+        st.markdown("## About")
+        st.markdown("")
 
-    a1, a2 = st.columns([1, 2.2], gap="large")
-    with a1:
-        img_path = ASSETS / "img" / "profile.png"
-        if img_path.exists():
-            st.image(str(img_path), use_container_width=True)
+        a1, a2 = st.columns([1, 2.2], gap="large")
+        with a1:
+            img_path = ASSETS / "img" / "profile.png"
+            if img_path.exists():
+                show_profile_image(img_path)
 
-    with a2:
-        st.markdown(
-            """
-            <div class="card">
-              <div style="font-size: 1.5rem; font-weight: 900;">Hi, I'm Sujash.</div>
-              <div class="muted" style="margin-top: 10px; font-size: 1.1rem;">
-                I'm a final-year student at MIT-WPU (BSc(Hons) Applied Statistics & Data Analytics) and in my diploma term
-                for IITM BS in Data Science and Applications.
-              </div>
-              <div class="muted" style="margin-top: 10px; font-size: 1.1rem;">
-                I'm 22 (born 10 Jan 2004). I like machine learning, AI, math, and statistics.
-                I'm also self-studying bioinformatics and data science for biology.
-              </div>
-              <div class="muted" style="margin-top: 10px; font-size: 1.1rem;">
-                Outside work: F1 and cricket fan, I go karting and play cricket when I can.
-                I'm an avid music listener and still log hours on Age of Empires II DE.
-              </div>
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
+        with a2:
+            st.markdown(
+                """
+                <div class="card">
+                  <div style="font-size: 1.5rem; font-weight: 900;">Hi, I'm Sujash.</div>
+                  <div class="muted" style="margin-top: 10px; font-size: 1.1rem;">
+                    I'm a final-year student at MIT-WPU (BSc(Hons) Applied Statistics & Data Analytics) and in my diploma term
+                    for IITM BS in Data Science and Applications.
+                  </div>
+                  <div class="muted" style="margin-top: 10px; font-size: 1.1rem;">
+                    I'm 22 (born 10 Jan 2004). I like machine learning, AI, math, and statistics.
+                    I'm also self-studying bioinformatics and data science for biology.
+                  </div>
+                  <div class="muted" style="margin-top: 10px; font-size: 1.1rem;">
+                    Outside work: F1 and cricket fan, I go karting and play cricket when I can.
+                    I'm an avid music listener and still log hours on Age of Empires II DE.
+                  </div>
+                </div>
+                """,
+                unsafe_allow_html=True,
+            )
 
-        quick_links(
-            email="sujashbharadwaj10@gmail.com",
-            github_url="https://github.com/SujashBharadwaj",
-            linkedin_url="https://www.linkedin.com/in/sujash-bharadwaj-14752827a/",
-        )
+            quick_links(
+                email="sujashbharadwaj10@gmail.com",
+                github_url="https://github.com/SujashBharadwaj",
+                linkedin_url="https://www.linkedin.com/in/sujash-bharadwaj-14752827a/",
+            )
 
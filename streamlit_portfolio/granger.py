@@ -0,0 +1,106 @@
+"""
+Batched Granger-causality F tests for the commodity-equity linkages page.
+
+Lives outside Homepage.py so process-pool workers can import it (same
+reason as oee_sim.py). No SciPy: the F tail probability comes from a small
+vectorized incomplete-beta continued fraction.
+"""
+
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+
+_lgamma = np.frompyfunc(math.lgamma, 1, 1)
+
+
+def betainc_reg(a: np.ndarray, b: np.ndarray, x: np.ndarray, iters: int = 300) -> np.ndarray:
+    """Regularized incomplete beta I_x(a, b), elementwise (Lentz continued fraction)."""
+    a, b, x = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (a, b, x)))
+    x = np.clip(x, 0.0, 1.0)
+    flip = x > (a + 1) / (a + b + 2)
+    a, b, x = np.where(flip, b, a), np.where(flip, a, b), np.where(flip, 1 - x, x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ln_front = np.asarray(_lgamma(a + b) - _lgamma(a) - _lgamma(b), dtype=np.float64) + a * np.log(x) + b * np.log1p(-x)
+        tiny = 1e-300
+        c = np.ones_like(x)
+        d = 1 - (a + b) * x / (a + 1)
+        d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+        h = d.copy()
+        for m in range(1, iters + 1):
+            for num in (
+                m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+            ):
+                d = 1 + num * d
+                d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+                c = 1 + num / c
+                c = np.where(np.abs(c) < tiny, tiny, c)
+                h *= c * d
+            if np.all(np.abs(c * d - 1) < 1e-14):
+                break
+        out = np.exp(ln_front) * h / a
+    out = np.where(x <= 0, 0.0, np.where(x >= 1, 1.0, out))
+    return np.where(flip, 1 - out, out)
+
+
+def f_sf(f: np.ndarray, d1: np.ndarray, d2: np.ndarray) -> np.ndarray:
+    """P(F > f) for an F(d1, d2) variable."""
+    f = np.maximum(np.asarray(f, dtype=np.float64), 0.0)
+    d1, d2 = np.asarray(d1, dtype=np.float64), np.asarray(d2, dtype=np.float64)
+    return betainc_reg(d2 / 2, d1 / 2, d2 / (d2 + d1 * f))
+
+
+def lagged(a: np.ndarray, lag: int) -> np.ndarray:
+    """(series, days - lag, lag) matrix of a[:, t-1], ..., a[:, t-lag] for t = lag..days-1."""
+    t = a.shape[1]
+    return np.stack([a[:, lag - j : t - j] for j in range(1, lag + 1)], axis=-1)
+
+
+def granger_f(effect: np.ndarray, cause: np.ndarray, lag: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Does `cause` Granger-cause `effect` at this lag? effect is (E, days) and
+    cause is (C, days) returns, NaN where missing. Every (e, c) pair gets
+    the restricted regression (constant + own lags) and the unrestricted
+    one (plus the cause's lags), solved together as batched normal
+    equations. A day only counts for a pair when it and all its lags are
+    present in both series. Returns F, its p-value and the days used, each (E, C).
+    """
+    y = effect[:, lag:]
+    ylag, xlag = lagged(effect, lag), lagged(cause, lag)
+    ok_e = ~np.isnan(y) & ~np.isnan(ylag).any(axis=-1)
+    ok_c = ~np.isnan(xlag).any(axis=-1)
+    w = (ok_e[:, None, :] & ok_c[None, :, :]).astype(np.float64)  # (E, C, T)
+    y0 = np.nan_to_num(y)
+    yz = np.concatenate([np.ones(y.shape + (1,)), np.nan_to_num(ylag)], axis=-1)  # (E, T, 1 + lag)
+    xz = np.nan_to_num(xlag)  # (C, T, lag)
+
+    k_r = lag + 1
+    gram = np.empty(w.shape[:2] + (k_r + lag, k_r + lag))
+    gram[..., :k_r, :k_r] = np.einsum("ect,eta,etb->ecab", w, yz, yz, optimize=True)
+    gram[..., :k_r, k_r:] = np.einsum("ect,eta,ctb->ecab", w, yz, xz, optimize=True)
+    gram[..., k_r:, :k_r] = np.swapaxes(gram[..., :k_r, k_r:], -1, -2)
+    gram[..., k_r:, k_r:] = np.einsum("ect,cta,ctb->ecab", w, xz, xz, optimize=True)
+    rhs = np.concatenate(
+        [np.einsum("ect,eta,et->eca", w, yz, y0, optimize=True), np.einsum("ect,cta,et->eca", w, xz, y0, optimize=True)], axis=-1
+    )
+    yy = np.einsum("ect,et->ec", w, y0 * y0)
+    n = w.sum(axis=-1)
+
+    def rss(g: np.ndarray, r: np.ndarray) -> np.ndarray:
+        ridge = 1e-12 * np.eye(g.shape[-1]) * np.maximum(np.trace(g, axis1=-2, axis2=-1), 1.0)[..., None, None]
+        beta = np.linalg.solve(g + ridge, r[..., None])[..., 0]
+        return np.maximum(yy - (beta * r).sum(axis=-1), 0.0)
+
+    rss_r = rss(gram[..., :k_r, :k_r], rhs[..., :k_r])
+    rss_u = rss(gram, rhs)
+    d2 = n - (k_r + lag)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = np.where((d2 > 0) & (rss_u > 0), ((rss_r - rss_u) / lag) / (rss_u / d2), np.nan)
+    p = np.where(np.isnan(f), np.nan, f_sf(np.nan_to_num(f), np.full_like(f, lag), np.maximum(d2, 1)))
+    return f, p, n
+
+
+def granger_task(effect: np.ndarray, cause: np.ndarray, lags: Tuple[int, ...]) -> Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """One pool task: every pair in one window, for each lag asked for."""
+    return {lag: granger_f(effect, cause, lag) for lag in lags}
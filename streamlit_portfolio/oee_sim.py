@@ -0,0 +1,95 @@
+"""
+Vectorized OEE maths and the Monte Carlo shift simulator.
+
+Lives outside Homepage.py because process-pool workers have to import the
+functions they run, and a Streamlit script can't be imported that way.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Shifts per simulation chunk. Chunks (not workers) own the random streams,
+# so results depend only on the seed, never on the pool size.
+SIM_CHUNK = 50_000
+# OEE histogram resolution; percentiles are exact to 1 / SIM_BINS
+SIM_BINS = 10_000
+LOSS_BUCKETS = ["Availability", "Performance", "Quality"]
+
+
+def compute_oee_batch(planned: np.ndarray, downtime: np.ndarray, total: np.ndarray, good: np.ndarray, ideal_cycle: np.ndarray) -> Dict[str, np.ndarray]:
+    """compute_oee() over whole columns: same validity rule and [0, 1] clipping, row by row."""
+    planned = np.asarray(planned, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
+    good = np.asarray(good, dtype=np.float64)
+    run = planned - np.asarray(downtime, dtype=np.float64)
+    valid = (planned > 0) & (run > 0) & (total > 0) & (good >= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        availability = np.where(valid, np.clip(run / planned, 0.0, 1.0), 0.0)
+        performance = np.where(valid, np.clip(total * ideal_cycle / run, 0.0, 1.0), 0.0)
+        quality = np.where(valid, np.clip(good / total, 0.0, 1.0), 0.0)
+    return {
+        "availability": availability,
+        "performance": performance,
+        "quality": quality,
+        "oee": availability * performance * quality,
+        "valid": valid,
+    }
+
+
+@dataclass(frozen=True)
+class OeeScenario:
+    """
+    Shift distributions. Downtime is gamma (mean, CV), actual cycle time is
+    normal around its mean but never faster than 80% of ideal, and the scrap
+    rate is beta (mean, concentration) per shift.
+    """
+
+    planned_min: float = 480.0
+    downtime_mean_min: float = 45.0
+    downtime_cv: float = 0.6
+    ideal_cycle_sec: float = 22.0
+    cycle_mean_sec: float = 25.0
+    cycle_sd_sec: float = 2.0
+    scrap_mean: float = 0.04
+    scrap_concentration: float = 40.0
+
+
+def simulate_chunk(scenario: OeeScenario, seed: np.random.SeedSequence, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Draws n shifts and returns mergeable summaries: the OEE histogram
+    (SIM_BINS bins on [0, 1]), how often each loss bucket was the biggest,
+    and the sums of A, P, Q and OEE.
+    """
+    rng = np.random.default_rng(seed)
+    planned = np.full(n, scenario.planned_min * 60)
+    shape = 1 / max(scenario.downtime_cv, 1e-6) ** 2
+    downtime = np.minimum(rng.gamma(shape, scenario.downtime_mean_min * 60 / shape, n), planned)
+    cycle = np.maximum(rng.normal(scenario.cycle_mean_sec, scenario.cycle_sd_sec, n), 0.8 * scenario.ideal_cycle_sec)
+    total = np.floor((planned - downtime) / cycle)
+    mean = min(max(scenario.scrap_mean, 1e-6), 1 - 1e-6)
+    rate = rng.beta(mean * scenario.scrap_concentration, (1 - mean) * scenario.scrap_concentration, n)
+    good = total - rng.binomial(total.astype(np.int64), rate)
+
+    out = compute_oee_batch(planned, downtime, total, good, np.full(n, scenario.ideal_cycle_sec))
+    hist = np.bincount(np.minimum((out["oee"] * SIM_BINS).astype(np.int64), SIM_BINS - 1), minlength=SIM_BINS)
+    losses = np.stack([1 - out["availability"], 1 - out["performance"], 1 - out["quality"]])
+    biggest = np.bincount(losses.argmax(axis=0), minlength=len(LOSS_BUCKETS))
+    sums = np.array([out[k].sum() for k in ("availability", "performance", "quality", "oee")])
+    return hist, biggest, sums
+
+
+def chunk_plan(n_shifts: int, seed: int) -> List[Tuple[np.random.SeedSequence, int]]:
+    """One child seed per SIM_CHUNK shifts, spawned in a fixed order from the run's seed."""
+    sizes = [SIM_CHUNK] * (n_shifts // SIM_CHUNK)
+    if n_shifts % SIM_CHUNK:
+        sizes.append(n_shifts % SIM_CHUNK)
+    return list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+
+
+def histogram_percentiles(hist: np.ndarray, qs: List[float]) -> List[float]:
+    """Percentiles (0-100) read off an OEE histogram, at bin centres."""
+    cum = np.cumsum(hist)
+    idx = np.searchsorted(cum, np.asarray(qs) / 100 * cum[-1], side="left")
+    return list((np.minimum(idx, hist.size - 1) + 0.5) / hist.size)
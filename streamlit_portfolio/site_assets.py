@@ -0,0 +1,49 @@
+"""
+Build step for the app's stylesheet.
+
+build_stylesheet() runs inside the app (Homepage.py caches it on the
+file's mtime): it minifies assets/css/app.css. The fonts, Crimson Text and
+Oswald, come from Google Fonts; Homepage.py @imports GOOGLE_FONTS_CSS next
+to the stylesheet.
+
+`python site_assets.py` prints the minified stylesheet.
+"""
+
+import re
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).parent
+SITE_CSS = ROOT / "assets" / "css" / "app.css"
+GOOGLE_FONTS_CSS = "https://fonts.googleapis.com/css2?family=Crimson+Text:wght@400;600;700&family=Oswald:wght@400;600;700&display=swap"
+
+CSS_TOKEN_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|(\s+)|([^"'/\s]+|/)""", re.S)
+
+
+def minify_css(css: str) -> str:
+    """Drops comments and needless whitespace (strings are left alone). No renaming or rule merging."""
+    out: List[str] = []
+    pending_space = False
+    for quoted, comment, space, other in CSS_TOKEN_RE.findall(css):
+        if comment:
+            continue
+        if space:
+            pending_space = True
+            continue
+        tok = quoted or other
+        if pending_space and out and out[-1][-1] not in "{};:,>(" and tok[0] not in "{};:,>)!":
+            out.append(" ")
+        pending_space = False
+        if other and tok[0] == "}" and out and out[-1].endswith(";"):
+            out[-1] = out[-1][:-1]  # last declaration needs no semicolon
+        out.append(tok)
+    return "".join(out)
+
+
+def build_stylesheet() -> str:
+    """The app stylesheet, minified."""
+    return minify_css(SITE_CSS.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    print(build_stylesheet())
@@ -0,0 +1,6 @@
+"""Lets the unit tests import Homepage and its helper modules; the page itself only renders under __main__."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
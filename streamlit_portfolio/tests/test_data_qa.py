@@ -0,0 +1,59 @@
+"""Data-QA rules on sheets where the cache stored number columns as text."""
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+import Homepage as H
+
+RULES = {r["id"]: r for r in H.QA_RULES["EnergyEquitiesMI"]}
+
+
+@pytest.fixture
+def sheet():
+    # "n/a", "x" and "-" make Low, Close and Abs % Change text columns
+    return pa.table(
+        {
+            "Company": ["A", "A", "A", "B", "B"],
+            "Date": ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-01", "2024-01-02"],
+            "Low": ["1", "2", "n/a", "1", "1"],
+            "Open": [1.5, 1.0, 3.0, 2.0, 5.0],
+            "High": [2.0, 3.0, 4.0, 1.0, 6.0],
+            "Close": ["1.0", "1.5", "x", "2", "2.5"],
+            "Abs % Change": ["0.1", "0.01", "-", "0.2", "0.0"],
+            "ExceptionFlag": ["Y", "", "", "", "Y"],
+            H.SOURCE_ROW: pa.array([2, 3, 4, 5, 6], pa.int32()),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "rule, rows",
+    [
+        ("prices-positive", []),
+        ("open-within-range", [1, 3]),
+        ("close-within-range", [1, 3]),
+        ("close-daily-jump", [1, 4]),  # no jump into or out of the text cell
+        ("exception-flag-matches-move", [3, 4]),  # the "-" row is left to the type rules
+    ],
+)
+def test_text_cells_are_skipped_not_fatal(sheet, rule, rows):
+    pos, _ = H.qa_check(RULES[rule], sheet, {})
+    assert pos.tolist() == rows
+
+
+def test_qa_numeric_keeps_number_like_cells():
+    col = H.qa_numeric(pa.chunked_array([[" 1.5", "abc", None, "-2e3"]]))
+    assert col.to_pylist() == [1.5, None, None, -2000.0]
+    assert H.qa_numeric(pa.chunked_array([[True, False]])) is None
+
+
+def test_a_rule_that_cannot_run_is_reported(tmp_path, sheet):
+    H.qa_memo.clear()
+    H.write_arrow_atomic(sheet, tmp_path / "0.arrow")
+    meta = {"sheets": [{"name": "Master Sheet", "file": "0.arrow", "columns": sheet.column_names[:-1], "sha256": "s"}]}
+    broken = {"id": "bad-op", "check": "flagged_when", "sheets": "*", "flag": "ExceptionFlag", "source": "Open", "op": "~", "value": 1}
+    results, _ = H.run_qa([broken, RULES["open-within-range"]], tmp_path, meta)
+    assert results[0]["error"].startswith("KeyError") and results[0]["rows"].size == 0
+    assert results[1]["error"] == "" and results[1]["rows"].tolist() == [3, 5]
+    H.qa_memo.clear()
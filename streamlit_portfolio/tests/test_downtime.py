@@ -0,0 +1,83 @@
+"""Downtime interval engine: segment classification and range queries against a per-second scan."""
+
+import numpy as np
+import pytest
+
+import Homepage as H
+
+CLASSES = H.DOWNTIME_CATEGORIES + ["run"]
+
+
+def random_logs(seed, n_machines=3, horizon=400, n=60):
+    rng = np.random.default_rng(seed)
+    key = rng.integers(0, n_machines, n)
+    start = rng.integers(0, horizon, n)
+    end = start + rng.integers(-5, 60, n)  # some empty or inverted intervals, which are ignored
+    cat = rng.integers(0, len(H.DOWNTIME_CATEGORIES), n)
+    win_key = rng.integers(0, n_machines, 8)
+    win_start = rng.integers(0, horizon, 8)
+    win_end = win_start + rng.integers(0, 150, 8)
+    machines = [f"M{i}" for i in range(n_machines)]
+    return machines, key, start, end, cat, win_key, win_start, win_end
+
+
+def per_second(logs, horizon=600):
+    # Class of every one-second slot per machine: -1 outside windows, else the first active category or "run"
+    machines, key, start, end, cat, win_key, win_start, win_end = logs
+    slots = np.full((len(machines), horizon), -1)
+    for m in range(len(machines)):
+        for t in range(horizon):
+            if not any(k == m and s <= t < e for k, s, e in zip(win_key, win_start, win_end)):
+                continue
+            active = {c for k, s, e, c in zip(key, start, end, cat) if k == m and s <= t < e}
+            slots[m, t] = min(active) if active else len(H.DOWNTIME_CATEGORIES)
+    return slots
+
+
+def build(logs):
+    machines, key, start, end, cat, win_key, win_start, win_end = logs
+    f = lambda a: np.asarray(a, dtype=np.float64)
+    return H.build_downtime_index(machines, key, f(start), f(end), cat, win_key, f(win_start), f(win_end))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_totals_match_per_second_scan(seed):
+    logs = random_logs(seed)
+    slots = per_second(logs)
+    totals = build(logs).totals()
+    for m in range(len(logs[0])):
+        for c in range(len(CLASSES)):
+            assert totals[m, c] == (slots[m] == c).sum()
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_queries_match_per_second_scan(seed):
+    logs = random_logs(seed)
+    slots = per_second(logs)
+    index = build(logs)
+    rng = np.random.default_rng(100 + seed)
+    for _ in range(40):
+        m = int(rng.integers(len(logs[0])))
+        t1, t2 = sorted(rng.integers(0, 600, 2).tolist())
+        got = index.query(logs[0][m], t1, t2)
+        for c, name in enumerate(CLASSES):
+            assert got[name] == pytest.approx((slots[m, t1:t2] == c).sum()), (m, t1, t2, name)
+
+
+def test_oee_inputs_split_planned_stops_from_downtime():
+    machines = ["A"]
+    index = H.build_downtime_index(
+        machines,
+        np.array([0, 0, 0]),
+        np.array([10.0, 15.0, 50.0]),
+        np.array([30.0, 40.0, 60.0]),
+        np.array([H.DOWNTIME_CATEGORIES.index(c) for c in ("planned_maintenance", "breakdown", "minor_stop")]),
+        np.array([0]),
+        np.array([0.0]),
+        np.array([100.0]),
+    )
+    inputs = H.downtime_oee_inputs(index)
+    # 20 s of maintenance, 10 s of breakdown not hidden under it, 10 s of minor stops
+    assert inputs["planned_time_sec"][0] == 80.0
+    assert inputs["downtime_sec"][0] == 20.0
+    assert index.raw_s[0] == 55.0
@@ -0,0 +1,95 @@
+"""Gradient-descent sweep: the batched block engine against one scalar run per cell."""
+
+import numpy as np
+import pytest
+
+import Homepage as H
+
+
+def scalar_run(coeffs, x, alpha, max_steps, tol, round_steps):
+    # The stepping rules of gd_sweep_block, one trajectory at a time
+    a3, a2, a1, _ = coeffs
+    for step in range(max_steps + 1):
+        d = (3 * a3 * x + 2 * a2) * x + a1
+        if abs(d) < tol:
+            return step, H.GD_CONVERGED, x
+        if step == max_steps:
+            break
+        x_new = x - alpha * d
+        if round_steps:
+            x_new = float(np.round(x_new, 2))
+            if x_new == x:
+                return max_steps, H.GD_MAXED, x
+        x = x_new
+        if not abs(x) <= H.GD_DIVERGE_AT:
+            return step + 1, H.GD_DIVERGED, x
+    return max_steps, H.GD_MAXED, x
+
+
+@pytest.mark.parametrize("coeffs", [(0.0, 1.0, 0.0, 0.0), (0.3, -1.0, -0.5, 2.0), (1.0, 0.0, -3.0, 0.0)])
+@pytest.mark.parametrize("round_steps", [False, True])
+def test_block_matches_scalar_runs(coeffs, round_steps):
+    rng = np.random.default_rng(0)
+    x0 = np.round(rng.uniform(-3, 3, 300), 2)
+    alpha = rng.choice([0.001, 0.05, 0.3, 0.9, 1.0, 2.5], 300)
+    steps, status, final_x = H.gd_sweep_block(coeffs, x0.copy(), alpha.copy(), 150, 0.01, round_steps)
+    for i in range(x0.size):
+        s, code, x = scalar_run(coeffs, float(x0[i]), float(alpha[i]), 150, 0.01, round_steps)
+        assert (steps[i], status[i]) == (s, code), i
+        assert final_x[i] == x or (np.isnan(final_x[i]) and np.isnan(x)), i
+    assert {H.GD_CONVERGED, H.GD_DIVERGED, H.GD_MAXED} <= set(status.tolist())
+
+
+def test_sweep_grid_shape_blocking_and_diverged_cells(monkeypatch):
+    coeffs = (0.0, 1.0, -2.0, 1.0)  # (x - 1)^2
+    alphas = tuple(np.linspace(0.05, 1.2, 23).tolist())
+    x0s = tuple(np.linspace(-4, 4, 17).tolist())
+    whole = H.gd_sweep.__wrapped__(coeffs, alphas, x0s, 400, 0.001, False)
+    monkeypatch.setattr(H, "GD_SWEEP_BLOCK", 50)
+    blocked = H.gd_sweep.__wrapped__(coeffs, alphas, x0s, 400, 0.001, False)
+    for key in ("steps", "status"):
+        assert whole[key].shape == (len(x0s), len(alphas))
+        np.testing.assert_array_equal(whole[key], blocked[key])
+    np.testing.assert_array_equal(whole["f"], blocked["f"])
+
+    diverged = whole["status"] == H.GD_DIVERGED
+    start_at_min = np.asarray(x0s) == 1.0
+    assert (whole["status"][start_at_min] == H.GD_CONVERGED).all()
+    assert diverged[~start_at_min, -1].all()  # alpha > 1 overshoots further every step
+    assert np.isnan(whole["f"][diverged]).all()
+    converged = whole["status"] == H.GD_CONVERGED
+    assert converged.any()
+    assert np.all(whole["f"][converged] < 1e-6)
+
+
+def scalar_trace(coeffs, x, alpha, max_steps, tol, round_steps):
+    a3, a2, a1, _ = coeffs
+    xs = []
+    for _ in range(max_steps + 1):
+        xs.append(x)
+        d = 3 * a3 * x * x + 2 * a2 * x + a1
+        if abs(d) < tol:
+            break
+        x = x - alpha * d
+        if round_steps:
+            x = round(x, 2)
+        if not abs(x) <= H.GD_DIVERGE_AT:
+            return np.array(xs), True
+    return np.array(xs), False
+
+
+@pytest.mark.parametrize(
+    "coeffs, x0, alpha, round_steps",
+    [
+        ((0.0, 1.0, 0.0, 0.0), 2.0, 0.001, True),  # stuck: each step rounds back to 2.0
+        ((0.0, 1.0, 0.0, 0.0), 2.0, 1.0, False),  # exact 2-cycle between 2 and -2
+        ((0.0, 1.0, 0.0, 0.0), 2.0, 0.3, False),  # converges
+        ((0.0, 1.0, 0.0, 0.0), 2.0, 1.2, False),  # diverges
+        ((0.5, -1.0, -1.5, 0.0), -0.8, 0.9, True),
+    ],
+)
+def test_trace_cycle_shortcut_matches_stepping(coeffs, x0, alpha, round_steps):
+    trace = H.gd_trace.__wrapped__(coeffs, x0, alpha, 5000, 0.01, round_steps)
+    xs, diverged = scalar_trace(coeffs, x0, alpha, 5000, 0.01, round_steps)
+    np.testing.assert_array_equal(trace["x"], xs)
+    assert trace["diverged"] == diverged
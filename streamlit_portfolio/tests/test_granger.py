@@ -0,0 +1,93 @@
+"""Granger runner: batched F tests against per-pair least squares, the F tail, and the on-disk result cache."""
+
+import math
+
+import numpy as np
+import pytest
+
+import granger
+import Homepage as H
+
+
+def ols_rss(y, x):
+    beta, *_ = np.linalg.lstsq(x, y, rcond=None)
+    r = y - x @ beta
+    return float(r @ r)
+
+
+@pytest.mark.parametrize("lag", [1, 3])
+def test_granger_f_matches_lstsq(lag):
+    rng = np.random.default_rng(lag)
+    days = 160
+    cause = rng.normal(size=(3, days))
+    effect = rng.normal(size=(2, days))
+    effect[1, 1:] += 0.5 * cause[0, :-1]
+    effect[0, 17] = np.nan  # a gap drops every row that touches that day
+    cause[2, 40:43] = np.nan
+    f, p, n = granger.granger_f(effect, cause, lag)
+    for e in range(2):
+        for c in range(3):
+            rows = [
+                t
+                for t in range(lag, days)
+                if not np.isnan(effect[e, t - lag : t + 1]).any() and not np.isnan(cause[c, t - lag : t]).any()
+            ]
+            y = effect[e, rows]
+            own = np.column_stack([np.ones(len(rows))] + [effect[e, [t - j for t in rows]] for j in range(1, lag + 1)])
+            full = np.column_stack([own] + [cause[c, [t - j for t in rows]] for j in range(1, lag + 1)])
+            rss_r, rss_u = ols_rss(y, own), ols_rss(y, full)
+            d2 = len(rows) - full.shape[1]
+            assert n[e, c] == len(rows)
+            assert f[e, c] == pytest.approx(((rss_r - rss_u) / lag) / (rss_u / d2), rel=1e-6)
+    assert p[1, 0] < 1e-3  # the planted link
+    assert np.all((p >= 0) & (p <= 1))
+
+
+def f_sf_by_integration(x, d1, d2, steps=200_000):
+    # 1 - CDF, integrating the density in u = sqrt(t) so the t^(d1/2 - 1) factor stays finite at 0
+    log_norm = math.lgamma((d1 + d2) / 2) - math.lgamma(d1 / 2) - math.lgamma(d2 / 2) + (d1 / 2) * math.log(d1 / d2)
+    u = np.linspace(0.0, math.sqrt(x), steps + 1)
+    t = u * u
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dens = np.exp(log_norm + (d1 - 1) * np.log(u) - ((d1 + d2) / 2) * np.log1p(d1 * t / d2)) * 2
+    dens[0] = 2 * math.exp(log_norm) if d1 == 1 else 0.0
+    h = u[1] - u[0]
+    simpson = h / 3 * (dens[0] + dens[-1] + 4 * dens[1:-1:2].sum() + 2 * dens[2:-1:2].sum())
+    return 1.0 - simpson
+
+
+@pytest.mark.parametrize("d1, d2", [(1, 10), (2, 30), (3, 200), (5, 7), (10, 1000)])
+@pytest.mark.parametrize("x", [0.05, 0.7, 1.0, 2.5, 8.0])
+def test_f_sf_matches_numerical_integration(d1, d2, x):
+    assert granger.f_sf(np.array([x]), np.array([d1]), np.array([d2]))[0] == pytest.approx(f_sf_by_integration(x, d1, d2), abs=1e-7)
+
+
+def test_f_sf_edges():
+    assert granger.f_sf(np.array([0.0, -1.0]), np.array([2, 2]), np.array([9, 9])).tolist() == [1.0, 1.0]
+    assert granger.f_sf(np.array([1e9]), np.array([3]), np.array([50]))[0] < 1e-12
+
+
+def demo_store(days):
+    rng = np.random.default_rng(5)
+    dates = np.arange(np.datetime64("2021-01-01"), np.datetime64("2021-01-01") + np.timedelta64(days, "D"))
+    return {"dates": dates, "equities": ["A", "B"], "commodities": ["X"], "y": rng.normal(size=(days, 2)), "x": rng.normal(size=(days, 1))}
+
+
+def test_cache_keeps_both_directions_and_prunes_replaced_windows(tmp_path, monkeypatch):
+    monkeypatch.setattr(H, "GRANGER_CACHE_DIR", tmp_path)
+    run = H.granger_results.__wrapped__
+    data = demo_store(700)  # 2021 and 2022 full, 2023 short enough to be skipped
+    first = run(("k",), "Commodity → stock", 2, data)
+    assert first["windows"] == ["2021", "2022"] and first["computed"] == 2
+    run(("k",), "Stock → commodity", 1, data)
+    files = sorted(tmp_path.glob("*.parquet"))
+    assert len(files) == 2
+    shapes = {d: (data[e].shape[1], data[c].shape[1]) for d, (e, c) in H.GRANGER_DIRECTIONS.items()}
+    assert set(H.read_granger_file(files[0], shapes)) == {("Commodity → stock", 1), ("Commodity → stock", 2), ("Stock → commodity", 1)}
+    assert run(("k",), "Commodity → stock", 2, data)["computed"] == 0
+
+    grown = demo_store(700)
+    grown["y"][500] += 1.0  # a revised 2022 price: that window gets a new hash
+    again = run(("k2",), "Commodity → stock", 2, grown)
+    assert again["computed"] == 1
+    assert len(list(tmp_path.glob("*.parquet"))) == 2  # the old 2022 file is gone
@@ -0,0 +1,62 @@
+"""Wall-jump maze: ghost distance / next-hop tables against a per-target BFS."""
+
+from collections import deque
+
+import numpy as np
+import pytest
+
+import Homepage as H
+
+
+def bfs(grid, start):
+    rows, cols = grid.shape
+    dist = {start: 0}
+    todo = deque([start])
+    while todo:
+        x, y = todo.popleft()
+        for dx, dy in H.MAZE_DIRS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < cols and 0 <= ny < rows and grid[ny, nx] != 1 and (nx, ny) not in dist:
+                dist[(nx, ny)] = dist[(x, y)] + 1
+                todo.append((nx, ny))
+    return dist
+
+
+@pytest.mark.parametrize("cols, rows, seed", [(15, 15, 0), (21, 17, 3), (9, 25, 11)])
+def test_tables_match_brute_force_bfs(cols, rows, seed):
+    grid = H.generate_maze(cols, rows, seed)
+    t = H.maze_tables(grid)
+    open_tiles = [(x, y) for y in range(rows) for x in range(cols) if grid[y, x] != 1]
+    assert t["n"] == len(open_tiles)
+    tile_id = {xy: t["index"][xy[1] * cols + xy[0]] for xy in open_tiles}
+    assert sorted(tile_id.values()) == list(range(len(open_tiles)))
+
+    for target in open_tiles:
+        dist = bfs(grid, target)
+        ti = tile_id[target]
+        for (x, y), gi in tile_id.items():
+            assert t["dist"][gi, ti] == dist[(x, y)]
+            if (x, y) == target:
+                continue
+            # First move of a shortest path; ties go to the earliest direction in MAZE_DIRS
+            best = min(
+                d for d, (dx, dy) in enumerate(H.MAZE_DIRS) if dist.get((x + dx, y + dy), -1) == dist[(x, y)] - 1
+            )
+            assert t["hop"][gi, ti] == best, ((x, y), target)
+
+    for (x, y), gi in tile_id.items():
+        expected = sum(1 << d for d, (dx, dy) in enumerate(H.MAZE_DIRS) if (x + dx, y + dy) in tile_id)
+        assert t["moves"][y * cols + x] == expected
+
+
+def test_wall_tiles_map_to_a_nearest_open_tile():
+    grid = H.generate_maze(15, 15, 5)
+    t = H.maze_tables(grid)
+    rows, cols = grid.shape
+    pos = {int(t["index"][y * cols + x]): (x, y) for y in range(rows) for x in range(cols) if grid[y, x] != 1}
+    open_xy = np.array(list(pos.values()))
+    for y in range(rows):
+        for x in range(cols):
+            if grid[y, x] == 1:
+                nx, ny = pos[int(t["index"][y * cols + x])]
+                assert abs(nx - x) + abs(ny - y) == np.abs(open_xy - (x, y)).sum(axis=1).min()
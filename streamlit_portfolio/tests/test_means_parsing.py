@@ -0,0 +1,51 @@
+"""Means playground: null markers in typed input are reported, not turned into NaN."""
+
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP = Path(__file__).resolve().parents[1] / "Homepage.py"
+MEANS_POST = next((APP.parent / "posts").glob("*-means-guide.md"))
+
+
+def run_means(raw: str) -> AppTest:
+    at = AppTest.from_file(str(APP), default_timeout=120)
+    at.session_state["page"] = "Blog"
+    at.session_state["selected_post"] = str(MEANS_POST)
+    at.run()
+    at.text_area(key="means_values").set_value(raw).run()
+    assert not at.exception
+    return at
+
+
+@pytest.mark.parametrize(
+    "raw, tokens",
+    [
+        ("1, NA, 3", ["`NA`"]),
+        ("1, null, 3", ["`null`"]),
+        ("1, #N/A, 3", ["`#N/A`"]),
+        ("1, NA, null, #N/A, 3", ["`NA`", "`null`", "`#N/A`"]),
+    ],
+)
+def test_null_markers_are_reported(raw, tokens):
+    at = run_means(raw)
+    warning = next(w.value for w in at.warning if "malformed" in w.value)
+    assert f"Skipped {len(tokens)} malformed value(s)" in warning
+    for tok in tokens:
+        assert tok in warning
+    means = {row["Mean"]: float(row["Value"]) for row in at.table[0].value.to_dict("records")}
+    assert means["Arithmetic"] == pytest.approx(2.0)
+    assert means["Geometric"] == pytest.approx(3 ** 0.5)
+    assert means["Median"] == pytest.approx(2.0)
+
+
+def test_unicode_whitespace_separates_tokens():
+    # NBSP, thin space and ideographic space split tokens like ASCII spaces, and the
+    # reported location uses the same tokenization as the parser
+    at = run_means("1,\u00a0NA\u2009 2\n\u3000x 3")
+    warning = next(w.value for w in at.warning if "malformed" in w.value)
+    assert "`NA` (token 2, line 1, col 4)" in warning
+    assert "`x` (token 4, line 2, col 2)" in warning
+    means = {row["Mean"]: float(row["Value"]) for row in at.table[0].value.to_dict("records")}
+    assert means["Arithmetic"] == pytest.approx(2.0)
@@ -0,0 +1,66 @@
+"""Trimmed means: exact selection-based statistics, and QuantileSketch estimates within their reported bounds."""
+
+import numpy as np
+import pytest
+
+import Homepage as H
+
+SAMPLES = {
+    "lognormal": lambda rng, n: rng.lognormal(0.0, 1.5, n),
+    "normal": lambda rng, n: rng.normal(0.0, 1.0, n),
+    "sorted": lambda rng, n: np.sort(rng.uniform(0.0, 1.0, n)),
+    "ties": lambda rng, n: rng.integers(0, 5, n).astype(np.float64),
+}
+
+
+def exact(x, trim_pct):
+    out = H.compute_means_bundle_np(x, np.empty(0), trim_pct, 1.0)
+    return {name: out[name] for name in ("Median", "Trimmed", "Winsorized")}
+
+
+@pytest.mark.parametrize("k", [0, 1, 37])
+def test_trimmed_order_stats_match_a_full_sort(k):
+    x = np.random.default_rng(k).normal(size=1001)
+    s = np.sort(x)
+    mid_sum, lo, hi, median = H.trimmed_order_stats(x, k)
+    assert mid_sum == pytest.approx(s[k : x.size - k].sum())
+    assert median == s[500]
+    if k:
+        assert (lo, hi) == (s[k], s[x.size - k - 1])
+
+
+def test_small_input_is_exact():
+    x = np.random.default_rng(1).normal(size=500)
+    sketch = H.QuantileSketch(k=1024).update(x)
+    assert sketch.rank_err == 0 and sketch.retained() == x.size
+    for name, (est, bound) in sketch.robust_means(10.0).items():
+        assert bound == 0
+        assert est == pytest.approx(exact(x, 10.0)[name])
+
+
+@pytest.mark.parametrize("dist", sorted(SAMPLES))
+@pytest.mark.parametrize("trim_pct", [0.0, 5.0, 25.0])
+def test_estimates_stay_within_their_bounds(dist, trim_pct):
+    rng = np.random.default_rng(7)
+    x = SAMPLES[dist](rng, 200_000)
+    sketch = H.QuantileSketch(k=256)
+    for chunk in np.array_split(x, 13):
+        sketch.update(chunk)
+    assert sketch.n == x.size
+    assert sketch.retained() < 256 * 16
+    truth = exact(x, trim_pct)
+    for name, (est, bound) in sketch.robust_means(trim_pct).items():
+        assert abs(est - truth[name]) <= bound * (1 + 1e-9) + 1e-12, name
+
+
+def test_merged_sketches_keep_their_bounds():
+    rng = np.random.default_rng(3)
+    parts = [rng.lognormal(size=50_000) for _ in range(4)]
+    merged = H.QuantileSketch(k=256)
+    for part in parts:
+        merged.merge(H.QuantileSketch(k=256).update(part))
+    x = np.concatenate(parts)
+    assert merged.n == x.size
+    truth = exact(x, 10.0)
+    for name, (est, bound) in merged.robust_means(10.0).items():
+        assert abs(est - truth[name]) <= bound * (1 + 1e-9), name
@@ -0,0 +1,70 @@
+"""Blog post index and search: mtime-validated reloads, BM25 ranking, phrases and prefixes."""
+
+import os
+
+import pytest
+
+import Homepage as H
+
+POSTS = [
+    {"title": "Gradient descent notes", "tags": ["ml"], "content": "Step size and momentum for gradient descent."},
+    {"title": "Means guide", "tags": ["stats"], "content": "The harmonic mean and the gradient of a loss are unrelated."},
+    {"title": "Maze game", "tags": ["games"], "content": "Descent into the maze; gradient free pathfinding with BFS."},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return H.build_search_index(POSTS)
+
+
+def titles(index, query):
+    hits, _ = H.search_posts(index, query)
+    return [POSTS[d]["title"] for d, _ in hits]
+
+
+def test_every_term_must_match_and_title_hits_rank_first(index):
+    assert titles(index, "gradient descent") == ["Gradient descent notes", "Maze game"]
+    assert titles(index, "gradient harmonic") == ["Means guide"]
+    assert titles(index, "gradient nosuchword") == []
+
+
+def test_phrase_needs_adjacent_terms(index):
+    assert titles(index, '"gradient descent"') == ["Gradient descent notes"]
+    assert titles(index, '"descent gradient"') == []
+
+
+def test_last_bare_term_matches_as_prefix(index):
+    assert titles(index, "harm") == ["Means guide"]
+    assert titles(index, "harm stats") == []  # only the last term is a prefix
+    assert titles(index, '"harm"') == []
+
+
+def test_unclosed_quote_searches_its_words():
+    assert H.parse_query('"gradient des') == ([], ["gradient", "des"])
+    assert H.parse_query('"gradient descent" "mom') == ([["gradient", "descent"]], ["mom"])
+
+
+def test_total_counts_matches_beyond_the_limit(index):
+    hits, total = H.search_posts(index, "the", limit=1)
+    assert len(hits) == 1 and total == 2
+
+
+def test_load_posts_reparses_only_changed_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(H, "POSTS_DIR", tmp_path)
+    H.content_index.clear()
+    (tmp_path / "2024-01-01-a.md").write_text("---\ntitle: A\ntags: x, y\n---\nfirst", encoding="utf-8")
+    (tmp_path / "2024-02-01-b.md").write_text("second", encoding="utf-8")
+
+    first = H.load_posts()
+    assert [p["title"] for p in first] == ["2024 02 01 B", "A"]
+    assert first[1]["tags"] == ["x", "y"]
+    assert H.load_posts() is first
+
+    changed = tmp_path / "2024-02-01-b.md"
+    changed.write_text("---\ntitle: B\n---\nsecond, edited", encoding="utf-8")
+    os.utime(changed, ns=(changed.stat().st_atime_ns, changed.stat().st_mtime_ns + 10**9))
+    (tmp_path / "2024-01-01-a.md").unlink()
+    second = H.load_posts()
+    assert [p["title"] for p in second] == ["B"]
+    H.content_index.clear()
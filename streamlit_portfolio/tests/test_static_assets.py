@@ -0,0 +1,38 @@
+"""Site stylesheet and icon sprite: inlined or published under content-hashed names, and republished after static/ is cleaned."""
+
+import Homepage as H
+
+
+def test_stylesheet_inline_without_typed_static():
+    html = H.site_stylesheet(False)
+    assert html.startswith(f"<style>@import url('{H.GOOGLE_FONTS_CSS}');")
+    assert ".card{" in html and "/*" not in html
+
+
+def test_stylesheet_is_republished_after_cleanup(tmp_path, monkeypatch):
+    monkeypatch.setattr(H, "STATIC_DIR", tmp_path)
+    first = H.site_stylesheet(True)
+    url = first.split('@import url("', 1)[1].split('"', 1)[0]
+    name = url.rsplit("/", 1)[1]
+    assert url == H.static_path_url(f"assets/{name}")
+    published = tmp_path / "assets" / name
+    assert published.read_text(encoding="utf-8") == H.build_stylesheet()
+    published.unlink()
+    assert H.site_stylesheet(True) == first
+    assert published.exists()
+
+
+def test_icon_sprite_inline_without_typed_static():
+    sprite = H.icon_sprite(False)
+    assert sprite["href"] == "#"
+    assert sprite["html"].startswith('<svg width="0" height="0"') and "<!--" not in sprite["html"]
+
+
+def test_icon_sprite_is_republished_after_cleanup(tmp_path, monkeypatch):
+    monkeypatch.setattr(H, "STATIC_DIR", tmp_path)
+    href = H.icon_sprite(True)["href"]
+    published = tmp_path / "assets" / href.rsplit("/", 1)[1].rstrip("#")
+    assert published.read_bytes() == H.ICON_SPRITE.read_bytes()
+    published.unlink()
+    assert H.icon_sprite(True)["href"] == href
+    assert published.exists()